@@ -0,0 +1,119 @@
+"""Benchmark TextChunker against the original chunk_text
+
+Builds a synthetic text of short sentences and reports throughput of the
+original slicing loop, ``TextChunker`` offsets and strings, streaming from a
+file object, and token-counted chunks.
+
+Usage (from the project root):
+    python benchmarks/chunk_benchmark.py --size-mb 100
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.utils.text_chunker import TextChunker
+
+WORDS = (
+    "azure search index document blob storage query vector semantic field "
+    "score filter facet ranking chunk embedding metadata content language"
+).split()
+
+def legacy_chunk_text(text: str, chunk_size: int = 4000, overlap: int = 200) -> list:
+    """chunk_text as it was before utils/text_chunker, with the progress fix"""
+    if len(text) <= chunk_size:
+        return [text]
+    
+    chunks = []
+    start = 0
+    
+    while start < len(text):
+        end = start + chunk_size
+        
+        if end >= len(text):
+            chunks.append(text[start:])
+            break
+        
+        break_point = text.rfind('.', start, end)
+        if break_point == -1:
+            break_point = text.rfind(' ', start, end)
+        if break_point == -1:
+            break_point = end
+        
+        chunks.append(text[start:break_point])
+        next_start = break_point - overlap
+        start = next_start if next_start > start else break_point
+    
+    return chunks
+
+def build_text(size_mb: float, seed: int = 0) -> str:
+    """Sentences of 5 to 20 random words, ``size_mb`` characters in total"""
+    rng = random.Random(seed)
+    size = int(size_mb * 1024 * 1024)
+    sentences = []
+    total = 0
+    
+    while total < size:
+        words = rng.choices(WORDS, k=rng.randint(5, 20))
+        sentence = ' '.join(words).capitalize() + '.'
+        sentences.append(sentence)
+        total += len(sentence) + 1
+    
+    return ' '.join(sentences)[:size]
+
+def run_case(name: str, func, text_bytes: int, baseline: float = None) -> float:
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    
+    throughput = text_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0
+    speedup = f"{baseline / elapsed:6.2f}x" if baseline else "     -"
+    print(f"{name:<32} {elapsed:8.3f}s {throughput:10.1f} MB/s {speedup} {count:>9} chunks")
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=100, help="text size in MB")
+    parser.add_argument('--chunk-size', type=int, default=4000, help="chunk size in characters")
+    parser.add_argument('--overlap', type=int, default=200, help="overlap in characters")
+    args = parser.parse_args()
+    
+    text = build_text(args.size_mb)
+    text_bytes = len(text)
+    print(f"Text: {text_bytes / (1024 * 1024):.1f} MB, "
+          f"chunk_size={args.chunk_size}, overlap={args.overlap}")
+    
+    chunker = TextChunker(args.chunk_size, args.overlap)
+    # Roughly five characters per token for the synthetic words
+    token_chunker = TextChunker(args.chunk_size // 5, args.overlap // 5, unit='tokens')
+    
+    baseline = run_case(
+        "legacy chunk_text",
+        lambda: len(legacy_chunk_text(text, args.chunk_size, args.overlap)), text_bytes
+    )
+    run_case(
+        "TextChunker.iter_spans",
+        lambda: sum(1 for _ in chunker.iter_spans(text)), text_bytes, baseline
+    )
+    run_case(
+        "TextChunker.iter_chunks",
+        lambda: sum(1 for _ in chunker.iter_chunks(text)), text_bytes, baseline
+    )
+    run_case(
+        "TextChunker.iter_stream",
+        lambda: sum(1 for _ in chunker.iter_stream(io.StringIO(text))), text_bytes, baseline
+    )
+    run_case(
+        "TextChunker.iter_spans, tokens",
+        lambda: sum(1 for _ in token_chunker.iter_spans(text)), text_bytes, baseline
+    )
+    
+    streamed = [(start, end) for start, end, _ in chunker.iter_stream(io.StringIO(text), 64 * 1024)]
+    assert streamed == list(chunker.iter_spans(text)), "streamed chunks differ"
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark file hashing against the original calculate_file_hash
+
+Builds a synthetic corpus of random files and reports throughput of the
+original 4 KB md5 loop, ``hash_file`` with md5 and blake2b, memory-mapped
+reads, and the process-pool ``hash_files`` batch API.
+
+Usage (from the project root):
+    python benchmarks/hash_benchmark.py --files 200 --size-mb 8
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.utils.hashing import hash_file, hash_files, FAST_ALGORITHM
+
+def legacy_calculate_file_hash(file_path: str, algorithm: str = 'md5') -> str:
+    """calculate_file_hash as it was before utils/hashing"""
+    hash_algo = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            hash_algo.update(chunk)
+    return hash_algo.hexdigest()
+
+def build_corpus(directory: str, file_count: int, size_mb: float) -> list:
+    """Write ``file_count`` random files of ``size_mb`` each"""
+    size = int(size_mb * 1024 * 1024)
+    block = os.urandom(min(size, 1024 * 1024)) or b"x"
+    paths = []
+    
+    for index in range(file_count):
+        path = os.path.join(directory, f"file_{index:05d}.bin")
+        with open(path, 'wb') as f:
+            remaining = size
+            while remaining > 0:
+                f.write(block[:remaining])
+                remaining -= len(block)
+        paths.append(path)
+    
+    return paths
+
+def run_case(name: str, func, paths: list, total_bytes: int, baseline: float = None) -> float:
+    start = time.perf_counter()
+    func(paths)
+    elapsed = time.perf_counter() - start
+    
+    throughput = total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0
+    speedup = f"{baseline / elapsed:6.2f}x" if baseline else "     -"
+    print(f"{name:<32} {elapsed:8.3f}s {throughput:10.1f} MB/s {speedup}")
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200, help="number of files")
+    parser.add_argument('--size-mb', type=float, default=4, help="size of each file in MB")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size")
+    parser.add_argument('--dir', default=None, help="corpus directory (default: temp dir)")
+    args = parser.parse_args()
+    
+    directory = args.dir or tempfile.mkdtemp(prefix='hash_benchmark_')
+    os.makedirs(directory, exist_ok=True)
+    
+    try:
+        paths = build_corpus(directory, args.files, args.size_mb)
+        total_bytes = sum(os.path.getsize(path) for path in paths)
+        print(f"Corpus: {len(paths)} files, {total_bytes / (1024 * 1024):.1f} MB in {directory}")
+        print("(first case also warms the page cache)")
+        for path in paths:
+            legacy_calculate_file_hash(path)
+        
+        baseline = run_case(
+            "legacy md5, 4 KB reads",
+            lambda ps: [legacy_calculate_file_hash(p) for p in ps], paths, total_bytes
+        )
+        run_case(
+            "hash_file md5",
+            lambda ps: [hash_file(p, 'md5') for p in ps], paths, total_bytes, baseline
+        )
+        run_case(
+            f"hash_file {FAST_ALGORITHM}",
+            lambda ps: [hash_file(p, FAST_ALGORITHM) for p in ps], paths, total_bytes, baseline
+        )
+        run_case(
+            f"hash_file {FAST_ALGORITHM}, mmap",
+            lambda ps: [hash_file(p, FAST_ALGORITHM, use_mmap=True) for p in ps],
+            paths, total_bytes, baseline
+        )
+        run_case(
+            "hash_files md5, process pool",
+            lambda ps: hash_files(ps, 'md5', args.workers), paths, total_bytes, baseline
+        )
+        run_case(
+            f"hash_files {FAST_ALGORITHM}, process pool",
+            lambda ps: hash_files(ps, FAST_ALGORITHM, args.workers), paths, total_bytes, baseline
+        )
+        
+        sample = paths[0]
+        assert hash_file(sample) == legacy_calculate_file_hash(sample), "md5 mismatch"
+    finally:
+        if args.dir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
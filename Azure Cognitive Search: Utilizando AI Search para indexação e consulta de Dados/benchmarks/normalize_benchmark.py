@@ -0,0 +1,95 @@
+"""Benchmark text normalization against the original clean_text
+
+Builds synthetic documents, ASCII and accented, with and without control
+characters, and reports throughput of the original per-character loop,
+``normalize_text`` and the process-pool ``normalize_texts`` batch API.
+
+Usage (from the project root):
+    python benchmarks/normalize_benchmark.py --docs 2000 --words 2000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.utils.text_normalizer import normalize_text, normalize_texts
+
+ASCII_WORDS = "azure search index document blob storage query vector field score".split()
+ACCENTED_WORDS = "índice documento consulta semântico métrica pontuação busca".split()
+WHITESPACE = [' ', ' ', ' ', '  ', '\t', '\n', '\r\n', '\xa0']
+CONTROLS = ['\x00', '\x07', '\x1b', '\x0c']
+
+def legacy_clean_text(text: str) -> str:
+    """clean_text as it was before utils/text_normalizer"""
+    if not text:
+        return ""
+    
+    text = ' '.join(text.split())
+    text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
+    return text.strip()
+
+def build_documents(count: int, words: int, accented: bool, controls: bool,
+                    seed: int = 0) -> list:
+    """``count`` documents of ``words`` words with mixed whitespace"""
+    rng = random.Random(seed)
+    vocabulary = ASCII_WORDS + (ACCENTED_WORDS if accented else [])
+    documents = []
+    
+    for _ in range(count):
+        parts = []
+        for word in rng.choices(vocabulary, k=words):
+            if controls and rng.random() < 0.01:
+                word += rng.choice(CONTROLS)
+            parts.append(word)
+            parts.append(rng.choice(WHITESPACE))
+        documents.append(''.join(parts))
+    
+    return documents
+
+def run_case(name: str, func, documents: list, total_chars: int, baseline: float = None) -> float:
+    start = time.perf_counter()
+    func(documents)
+    elapsed = time.perf_counter() - start
+    
+    throughput = total_chars / (1024 * 1024) / elapsed if elapsed > 0 else 0
+    speedup = f"{baseline / elapsed:6.2f}x" if baseline else "     -"
+    print(f"  {name:<30} {elapsed:8.3f}s {throughput:10.1f} MB/s {speedup}")
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=2000, help="number of documents")
+    parser.add_argument('--words', type=int, default=2000, help="words per document")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size")
+    args = parser.parse_args()
+    
+    for accented in (False, True):
+        for controls in (False, True):
+            documents = build_documents(args.docs, args.words, accented, controls)
+            total_chars = sum(len(document) for document in documents)
+            print(f"{'accented' if accented else 'ascii'}, "
+                  f"{'with' if controls else 'no'} control characters: "
+                  f"{len(documents)} docs, {total_chars / (1024 * 1024):.1f} M chars")
+            
+            baseline = run_case(
+                "legacy clean_text",
+                lambda docs: [legacy_clean_text(doc) for doc in docs], documents, total_chars
+            )
+            run_case(
+                "normalize_text",
+                lambda docs: [normalize_text(doc) for doc in docs], documents, total_chars, baseline
+            )
+            run_case(
+                "normalize_texts, process pool",
+                lambda docs: normalize_texts(docs, max_workers=args.workers),
+                documents, total_chars, baseline
+            )
+            
+            expected = [legacy_clean_text(doc) for doc in documents]
+            assert normalize_texts(documents) == expected, "normalized text differs"
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+from array import array
+from typing import Dict, Any, Iterable, List, Tuple
+from ..utils.sqlite_store import SQLiteStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keys per SELECT, below SQLite's default limit on bound parameters
+_LOOKUP_BATCH = 500
+
+class EmbeddingCache(SQLiteStore):
+    """On-disk vectors keyed by chunk hash and embedding model
+    
+    Vectors are stored as packed float32, the precision of the index's
+    ``Collection(Edm.Single)`` fields. Use ``":memory:"`` for a cache that
+    lives only as long as the process.
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model_id TEXT NOT NULL,
+            chunk_hash TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            PRIMARY KEY (model_id, chunk_hash)
+        )
+        """,
+    )
+    
+    def __init__(self, db_path: str = ':memory:', commit_interval: int = 100):
+        super().__init__(db_path, commit_interval)
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0}
+    
+    def get_many(self, model_id: str, chunk_hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Get the cached vectors of the given chunks; misses are left out"""
+        chunk_hashes = list(dict.fromkeys(chunk_hashes))
+        vectors = {}
+        
+        with self._lock:
+            for index in range(0, len(chunk_hashes), _LOOKUP_BATCH):
+                batch = chunk_hashes[index:index + _LOOKUP_BATCH]
+                placeholders = ', '.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT chunk_hash, vector FROM embeddings "
+                    f"WHERE model_id = ? AND chunk_hash IN ({placeholders})",
+                    (model_id, *batch)
+                ).fetchall()
+                for chunk_hash, blob in rows:
+                    vectors[chunk_hash] = array('f', blob).tolist()
+            
+            self._stats['hits'] += len(vectors)
+            self._stats['misses'] += len(chunk_hashes) - len(vectors)
+        
+        return vectors
+    
+    def put_many(self, model_id: str, items: Iterable[Tuple[str, List[float]]]) -> None:
+        """Store ``(chunk_hash, vector)`` pairs"""
+        rows = [
+            (model_id, chunk_hash, array('f', vector).tobytes())
+            for chunk_hash, vector in items
+        ]
+        if not rows:
+            return
+        
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_id, chunk_hash, vector) "
+                "VALUES (?, ?, ?)",
+                rows
+            )
+            self._stats['writes'] += len(rows)
+            self._count_writes(len(rows))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and number of stored vectors"""
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+            lookups = self._stats['hits'] + self._stats['misses']
+            
+            return {
+                **self._stats,
+                'hit_ratio': (self._stats['hits'] / lookups) if lookups > 0 else 0,
+                'entries': entries
+            }
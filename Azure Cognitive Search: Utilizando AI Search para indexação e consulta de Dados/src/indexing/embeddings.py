@@ -0,0 +1,224 @@
+import re
+import math
+import time
+import hashlib
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, Any, List, Optional, Iterable, Iterator
+from ..utils.text_chunker import TextChunker
+from .embedding_cache import EmbeddingCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r'\w+')
+
+def hash_chunk(text: str) -> str:
+    """Cache key of a chunk's text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+class EmbeddingProvider(ABC):
+    """Turn batches of text into vectors
+    
+    Subclasses implement ``embed`` and set ``model_id`` so vectors from
+    different models or dimensions never share cache entries.
+    """
+    
+    model_id = 'base'
+    dimensions = 0
+    # Most texts sent in one ``embed`` call
+    max_batch_size = 16
+    
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Vectors of ``texts``, in order"""
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    """Deterministic local embeddings for offline runs and tests
+    
+    Lower-cased words are hashed into signed buckets of a fixed-size vector,
+    which is then L2-normalized, so texts sharing words get similar vectors.
+    Not a semantic model; it stands in for one with the same interface.
+    """
+    
+    max_batch_size = 256
+    
+    def __init__(self, dimensions: int = 1536):
+        if dimensions <= 0:
+            raise ValueError("dimensions must be positive")
+        self.dimensions = dimensions
+        self.model_id = f"hash-{dimensions}"
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_text(text) for text in texts]
+    
+    def _embed_text(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORDS.findall(text.lower()):
+            digest = int.from_bytes(
+                hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little'
+            )
+            # Low bit picks the sign so collisions tend to cancel out
+            vector[(digest >> 1) % self.dimensions] += -1.0 if digest & 1 else 1.0
+        
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+class EmbeddingPipeline:
+    """Chunk document content, embed the chunks and set vector fields
+    
+    Chunks of many documents are embedded together in batches of the
+    provider's ``max_batch_size``. With a cache, a chunk whose text was
+    embedded before by the same model is never sent again.
+    
+    ``pooling`` decides what a document split into several chunks becomes:
+    
+    - ``'mean'``: one document whose ``vector_field`` is the normalized mean
+      of the chunk vectors, so the index keeps one document per source.
+    - ``None``: one document per chunk, keyed ``"<key>-<chunk index>"``,
+      holding the chunk text and its vector, plus the source key in
+      ``parent_field``. Matches point at the passage that matched instead of
+      a blend of the whole document; the index needs a ``parent_field``.
+    """
+    
+    def __init__(self, provider: EmbeddingProvider,
+                 cache: Optional[EmbeddingCache] = None,
+                 chunker: Optional[TextChunker] = None,
+                 content_field: str = 'content',
+                 vector_field: str = 'content_vector',
+                 pooling: Optional[str] = 'mean',
+                 key_field: str = 'id',
+                 parent_field: str = 'parent_id'):
+        if pooling not in ('mean', None):
+            raise ValueError(f"Unsupported pooling: {pooling}")
+        self.provider = provider
+        self.cache = cache
+        self.chunker = chunker or TextChunker()
+        self.content_field = content_field
+        self.vector_field = vector_field
+        self.pooling = pooling
+        self.key_field = key_field
+        self.parent_field = parent_field
+        self._stats = {
+            'documents': 0, 'chunks': 0, 'cache_hits': 0, 'embedded': 0,
+            'provider_calls': 0, 'embed_seconds': 0.0
+        }
+    
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Vectors of ``texts``, reading and filling the cache"""
+        chunk_hashes = [hash_chunk(text) for text in texts]
+        model_id = self.provider.model_id
+        vectors = self.cache.get_many(model_id, chunk_hashes) if self.cache else {}
+        self._stats['chunks'] += len(texts)
+        self._stats['cache_hits'] += sum(1 for chunk_hash in chunk_hashes if chunk_hash in vectors)
+        
+        # Identical chunks, within the batch or cached, are embedded once
+        missing = {}
+        for chunk_hash, text in zip(chunk_hashes, texts):
+            if chunk_hash not in vectors:
+                missing.setdefault(chunk_hash, text)
+        
+        missing_hashes = list(missing)
+        batch_size = max(1, self.provider.max_batch_size)
+        for index in range(0, len(missing_hashes), batch_size):
+            batch = missing_hashes[index:index + batch_size]
+            
+            start = time.perf_counter()
+            embedded = self.provider.embed([missing[chunk_hash] for chunk_hash in batch])
+            self._stats['embed_seconds'] += time.perf_counter() - start
+            self._stats['provider_calls'] += 1
+            self._stats['embedded'] += len(batch)
+            
+            if len(embedded) != len(batch):
+                raise ValueError(
+                    f"Provider {model_id} returned {len(embedded)} vectors for {len(batch)} texts"
+                )
+            
+            # Rounded to float32 so fresh and cached vectors are identical
+            rounded = [array('f', vector).tolist() for vector in embedded]
+            vectors.update(zip(batch, rounded))
+            if self.cache:
+                self.cache.put_many(model_id, zip(batch, rounded))
+        
+        return [vectors[chunk_hash] for chunk_hash in chunk_hashes]
+    
+    def process_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Embed documents with content and return the documents to index
+        
+        With mean pooling, ``vector_field`` is set in place and the same
+        documents are returned. Without pooling, each document with content
+        is replaced by its chunk documents.
+        """
+        chunk_texts = []
+        # (document, index of its first chunk, chunk count)
+        owners = []
+        
+        for document in documents:
+            content = document.get(self.content_field)
+            start = len(chunk_texts)
+            if content:
+                chunk_texts.extend(self.chunker.iter_chunks(content))
+            owners.append((document, start, len(chunk_texts) - start))
+        
+        vectors = self.embed_texts(chunk_texts)
+        results = []
+        for document, start, count in owners:
+            if self.pooling is None and count:
+                results.extend(self._chunk_documents(
+                    document, chunk_texts[start:start + count], vectors[start:start + count]
+                ))
+                continue
+            
+            if count == 1:
+                document[self.vector_field] = vectors[start]
+            elif count > 1:
+                document[self.vector_field] = _mean_vector(vectors[start:start + count])
+            results.append(document)
+        
+        self._stats['documents'] += len(documents)
+        return results
+    
+    def _chunk_documents(self, document: Dict[str, Any], texts: List[str],
+                         vectors: List[List[float]]) -> List[Dict[str, Any]]:
+        """One copy of ``document`` per chunk, with its own key, text and vector"""
+        key = document.get(self.key_field)
+        chunks = []
+        for index, (text, vector) in enumerate(zip(texts, vectors)):
+            chunk = dict(document)
+            chunk[self.key_field] = f"{key}-{index}"
+            chunk[self.parent_field] = key
+            chunk[self.content_field] = text
+            chunk[self.vector_field] = vector
+            chunks.append(chunk)
+        return chunks
+    
+    def iter_documents(self, documents: Iterable[Dict[str, Any]],
+                       group_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Embed a stream of documents ``group_size`` at a time
+        
+        Suited to feeding ``IndexWriter.add_documents``; only one group is
+        held in memory.
+        """
+        group = []
+        for document in documents:
+            group.append(document)
+            if len(group) >= group_size:
+                yield from self.process_documents(group)
+                group = []
+        
+        if group:
+            yield from self.process_documents(group)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters of documents, chunks, cache hits and provider calls"""
+        stats = dict(self._stats)
+        stats['embed_seconds'] = round(stats['embed_seconds'], 3)
+        return stats
+
+def _mean_vector(vectors: List[List[float]]) -> List[float]:
+    """L2-normalized mean of equally sized vectors, as float32 values"""
+    mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+    norm = math.sqrt(sum(value * value for value in mean))
+    if norm:
+        mean = [value / norm for value in mean]
+    return array('f', mean).tolist()
@@ -5,6 +5,7 @@ from azure.search.documents.indexes.models import (
     ComplexField, CorsOptions
 )
 from azure.core.credentials import AzureKeyCredential
+from ..utils.retry import RetryPolicy, SDK_CLIENT_OPTIONS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,12 +13,15 @@ logger = logging.getLogger(__name__)
 class IndexManager:
     """Manage Azure Cognitive Search indexes"""
     
-    def __init__(self, service_name: str, admin_key: str):
+    def __init__(self, service_name: str, admin_key: str,
+                 retry_policy: Optional[RetryPolicy] = None):
         self.service_endpoint = f"https://{service_name}.search.windows.net"
         self.admin_client = SearchIndexClient(
             endpoint=self.service_endpoint,
-            credential=AzureKeyCredential(admin_key)
+            credential=AzureKeyCredential(admin_key),
+            **SDK_CLIENT_OPTIONS
         )
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
     
     def create_index(self, index_name: str, fields: List[Any]) -> Dict[str, Any]:
         """Create a new search index"""
@@ -34,7 +38,9 @@ class IndexManager:
                 cors_options=cors_options
             )
             
-            result = self.admin_client.create_index(index)
+            result = self.retry_policy.call(
+                'create_index', self.admin_client.create_index, index
+            )
             logger.info(f"Created index: {index_name}")
             
             return {
@@ -54,10 +60,15 @@ class IndexManager:
     def update_index(self, index_name: str, fields: List[Any]) -> Dict[str, Any]:
         """Update an existing index"""
         try:
-            existing_index = self.admin_client.get_index(index_name)
+            existing_index = self.retry_policy.call(
+                'get_index', self.admin_client.get_index, index_name
+            )
             existing_index.fields = fields
             
-            result = self.admin_client.create_or_update_index(existing_index)
+            result = self.retry_policy.call(
+                'create_or_update_index', self.admin_client.create_or_update_index,
+                existing_index
+            )
             logger.info(f"Updated index: {index_name}")
             
             return {
@@ -77,7 +88,9 @@ class IndexManager:
     def delete_index(self, index_name: str) -> Dict[str, Any]:
         """Delete an index"""
         try:
-            self.admin_client.delete_index(index_name)
+            self.retry_policy.call(
+                'delete_index', self.admin_client.delete_index, index_name
+            )
             logger.info(f"Deleted index: {index_name}")
             
             return {
@@ -96,8 +109,10 @@ class IndexManager:
     def list_indexes(self) -> List[str]:
         """List all indexes in the service"""
         try:
-            indexes = self.admin_client.list_indexes()
-            return [index.name for index in indexes]
+            return self.retry_policy.call(
+                'list_indexes',
+                lambda: [index.name for index in self.admin_client.list_indexes()]
+            )
         except Exception as e:
             logger.error(f"Error listing indexes: {e}")
             return []
@@ -105,7 +120,10 @@ class IndexManager:
     def get_index_statistics(self, index_name: str) -> Dict[str, Any]:
         """Get statistics for an index"""
         try:
-            stats = self.admin_client.get_index_statistics(index_name)
+            stats = self.retry_policy.call(
+                'get_index_statistics', self.admin_client.get_index_statistics,
+                index_name
+            )
             return {
                 'document_count': stats.document_count,
                 'storage_size': stats.storage_size
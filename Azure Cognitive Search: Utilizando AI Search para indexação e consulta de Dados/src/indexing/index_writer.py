@@ -0,0 +1,287 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Iterable, Set
+from azure.search.documents import SearchClient
+from azure.core.credentials import AzureKeyCredential
+from ..utils.helpers import load_settings
+from ..utils.retry import RetryPolicy, SDK_CLIENT_OPTIONS
+from ..search.result_cache import SearchResultCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-document statuses of a 207 response worth sending again: version
+# conflicts, index busy and throttling
+RETRYABLE_DOCUMENT_STATUS_CODES = {409, 422, 503}
+
+class IndexWriter:
+    """Push documents to a search index in buffered, parallel batches
+    
+    Documents are buffered and sent with ``merge_or_upload`` once
+    ``batch_size`` of them are waiting, or ``flush_interval`` seconds after
+    the oldest one was added. Up to ``max_workers`` batches are in flight at
+    once. Documents rejected in a 207 response with a retryable status are
+    resent on their own; the rest of the batch is not.
+    
+    With a ``result_cache``, cached results of the index are invalidated
+    after each batch that indexed documents; with ``invalidate_fields``,
+    only results whose filter references those fields are.
+    """
+    
+    def __init__(self, service_name: str, admin_key: str, index_name: str,
+                 key_field: str = 'id',
+                 search_client: Optional[Any] = None,
+                 settings: Optional[Dict[str, Any]] = None,
+                 batch_size: Optional[int] = None,
+                 max_workers: Optional[int] = None,
+                 flush_interval: Optional[float] = 5.0,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 result_cache: Optional[SearchResultCache] = None,
+                 invalidate_fields: Optional[Iterable[str]] = None):
+        # search_client allows a stand-in with merge_or_upload_documents
+        self.search_client = search_client or SearchClient(
+            endpoint=f"https://{service_name}.search.windows.net",
+            index_name=index_name,
+            credential=AzureKeyCredential(admin_key),
+            **SDK_CLIENT_OPTIONS
+        )
+        self.index_name = index_name
+        self.key_field = key_field
+        
+        self.settings = settings if settings is not None else load_settings()
+        indexing_settings = self.settings.get('indexing_settings', {})
+        self.batch_size = max(1, int(batch_size or indexing_settings.get('batch_size', 100)))
+        self.max_workers = max(1, int(max_workers or indexing_settings.get('parallel_threads', 4)))
+        self.flush_interval = flush_interval
+        self.retry_policy = retry_policy or RetryPolicy.from_settings(self.settings)
+        self.result_cache = result_cache
+        self.invalidate_fields = list(invalidate_fields) if invalidate_fields is not None else None
+        
+        self._buffer = []
+        # time.monotonic() when the oldest buffered document was added
+        self._buffer_started = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='index-writer'
+        )
+        self._in_flight: Set[Future] = set()
+        # Batches taken from the buffer and not yet in _in_flight, such as
+        # one the timer thread is submitting; flush() waits for them too
+        self._unsubmitted = 0
+        self._submitted = threading.Condition(self._lock)
+        self._failures = []
+        self._stats = {
+            'documents_added': 0, 'documents_indexed': 0, 'documents_failed': 0,
+            'documents_retried': 0, 'batches_sent': 0, 'send_seconds': 0.0
+        }
+        self._closed = False
+        
+        self._stop_timer = threading.Event()
+        self._timer_thread = None
+        if self.flush_interval:
+            self._timer_thread = threading.Thread(
+                target=self._flush_on_timer, name='index-writer-timer', daemon=True
+            )
+            self._timer_thread.start()
+    
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """Buffer documents, sending full batches as they fill up"""
+        if self._closed:
+            raise RuntimeError("IndexWriter is closed")
+        
+        for document in documents:
+            with self._lock:
+                if not self._buffer:
+                    self._buffer_started = time.monotonic()
+                self._buffer.append(document)
+                self._stats['documents_added'] += 1
+                batch = self._take_batch() if len(self._buffer) >= self.batch_size else None
+            
+            if batch:
+                self._submit(batch)
+    
+    def add_document(self, document: Dict[str, Any]) -> None:
+        """Buffer a single document"""
+        self.add_documents([document])
+    
+    def flush(self) -> Dict[str, Any]:
+        """Send buffered documents and wait for every batch in flight"""
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            self._submit(batch, block=False)
+        
+        with self._lock:
+            self._submitted.wait_for(lambda: self._unsubmitted == 0)
+            pending = list(self._in_flight)
+        wait(pending)
+        
+        return self.get_stats()
+    
+    def close(self) -> Dict[str, Any]:
+        """Flush, stop the timer and release the worker threads"""
+        if self._closed:
+            return self.get_stats()
+        
+        self._stop_timer.set()
+        if self._timer_thread is not None:
+            self._timer_thread.join()
+        
+        stats = self.flush()
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        return stats
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters of documents and batches, plus the buffer size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['buffered'] = len(self._buffer)
+            stats['in_flight'] = len(self._in_flight)
+        
+        stats['send_seconds'] = round(stats['send_seconds'], 3)
+        return stats
+    
+    def get_failures(self) -> List[Dict[str, Any]]:
+        """Documents that could not be indexed, with status and error"""
+        with self._lock:
+            return list(self._failures)
+    
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Empty the buffer; the caller holds the lock and submits the batch"""
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_started = None
+        if batch:
+            self._unsubmitted += 1
+        return batch
+    
+    def _submit(self, batch: List[Dict[str, Any]], block: bool = True) -> None:
+        """Send a batch on a worker thread
+        
+        With ``block``, waits while every worker is busy so the callers
+        cannot queue batches faster than the service accepts them.
+        """
+        try:
+            if block:
+                while True:
+                    with self._lock:
+                        pending = list(self._in_flight)
+                    if len(pending) < self.max_workers:
+                        break
+                    wait(pending, return_when=FIRST_COMPLETED)
+            
+            future = self._executor.submit(self._send_batch, batch)
+            with self._lock:
+                self._in_flight.add(future)
+        finally:
+            with self._lock:
+                self._unsubmitted -= 1
+                self._submitted.notify_all()
+        future.add_done_callback(self._batch_done)
+    
+    def _batch_done(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight.discard(future)
+        
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Unexpected error sending batch to {self.index_name}: {error}")
+    
+    def _send_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Send one batch, resending only documents rejected as retryable"""
+        documents = batch
+        attempt = 0
+        
+        while documents:
+            start = time.perf_counter()
+            try:
+                results = self.retry_policy.call(
+                    'merge_or_upload_documents',
+                    self.search_client.merge_or_upload_documents, documents=documents
+                )
+            except Exception as e:
+                logger.error(f"Error indexing {len(documents)} documents to {self.index_name}: {e}")
+                self._record_failures([
+                    self._failure(document, getattr(e, 'status_code', None), str(e))
+                    for document in documents
+                ])
+                return
+            finally:
+                with self._lock:
+                    self._stats['batches_sent'] += 1
+                    self._stats['send_seconds'] += time.perf_counter() - start
+            
+            by_key = {str(document.get(self.key_field)): document for document in documents}
+            retry = []
+            failures = []
+            indexed = 0
+            
+            for result in results:
+                if result.succeeded:
+                    indexed += 1
+                    continue
+                
+                document = by_key.get(str(result.key), {self.key_field: result.key})
+                if (result.status_code in RETRYABLE_DOCUMENT_STATUS_CODES
+                        and attempt < self.retry_policy.max_retries):
+                    retry.append(document)
+                else:
+                    failures.append(self._failure(document, result.status_code, result.error_message))
+            
+            with self._lock:
+                self._stats['documents_indexed'] += indexed
+                self._stats['documents_retried'] += len(retry)
+            self._record_failures(failures)
+            
+            if indexed and self.result_cache is not None:
+                self.result_cache.invalidate(self.index_name, self.invalidate_fields)
+            
+            if retry:
+                delay = self.retry_policy.get_delay(attempt)
+                logger.warning(
+                    f"Retrying {len(retry)} of {len(documents)} documents for "
+                    f"{self.index_name} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+            
+            documents = retry
+            attempt += 1
+    
+    def _failure(self, document: Dict[str, Any], status_code: Optional[int],
+                 error: Optional[str]) -> Dict[str, Any]:
+        return {
+            'key': document.get(self.key_field),
+            'status_code': status_code,
+            'error': error
+        }
+    
+    def _record_failures(self, failures: List[Dict[str, Any]]) -> None:
+        if not failures:
+            return
+        
+        with self._lock:
+            self._failures.extend(failures)
+            self._stats['documents_failed'] += len(failures)
+        
+        logger.error(f"{len(failures)} documents could not be indexed to {self.index_name}")
+    
+    def _flush_on_timer(self) -> None:
+        """Send the buffer once its oldest document is ``flush_interval`` old"""
+        # Check a few times per interval so the delay stays close to it
+        tick = max(0.05, self.flush_interval / 4)
+        while not self._stop_timer.wait(tick):
+            with self._lock:
+                due = self._buffer_started is not None and \
+                    time.monotonic() - self._buffer_started >= self.flush_interval
+                batch = self._take_batch() if due else None
+            
+            if batch:
+                self._submit(batch, block=False)
+    
+    def __enter__(self) -> 'IndexWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -1,100 +1,549 @@
 import os
+import time
 import asyncio
-from typing import List, Dict, Any, Optional
+import weakref
+import threading
+import concurrent.futures
+from typing import List, Dict, Any, Optional, Union, Iterable, AsyncIterable, AsyncIterator
+import aiohttp
+from azure.storage.blob import BlobBlock
 from azure.storage.blob.aio import BlobServiceClient
 from azure.core.exceptions import ResourceExistsError
+from azure.core.pipeline.transport import AioHttpTransport
+from ..utils.retry import RetryPolicy, SDK_CLIENT_OPTIONS
+from ..utils.concurrency import AdaptiveConcurrencyLimiter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of the path stream for upload workers
+_END_OF_STREAM = object()
+
 class AsyncBlobUploader:
     """Asynchronous blob uploader for better performance"""
     
-    def __init__(self, connection_string: str, container_name: str):
+    def __init__(self, connection_string: str, container_name: str,
+                 blob_service_client: Optional[Any] = None,
+                 large_file_threshold_mb: float = 64,
+                 block_size_mb: float = 8,
+                 max_block_concurrency: int = 4,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None):
         self.connection_string = connection_string
         self.container_name = container_name
+        # Externally managed client (e.g. the tests' AsyncLocalBlobServiceClient); not closed here
+        self.blob_service_client = blob_service_client
+        
+        # Files above the threshold are split into blocks staged concurrently
+        self.large_file_threshold_bytes = int(large_file_threshold_mb * 1024 * 1024)
+        self.block_size_bytes = int(block_size_mb * 1024 * 1024)
+        self.max_block_concurrency = max_block_concurrency
+        
+        # Shared backoff policy; failed blocks are retried individually
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        
+        # Optional AIMD limit on requests in flight, shared by files and blocks.
+        # Each attempt holds a slot, so backoff sleeps between retries do not
+        self.concurrency_limiter = concurrency_limiter
+        
+        # Set once the container is known to exist, so later calls skip the check
+        self._container_ready = False
     
     async def upload_files_async(self, file_paths: List[str], 
                                 max_concurrent: int = 5) -> List[Dict[str, Any]]:
         """Upload multiple files asynchronously"""
+        if self.blob_service_client is not None:
+            return await self._upload_files_with_client(
+                self.blob_service_client, file_paths, max_concurrent
+            )
+        
         async with BlobServiceClient.from_connection_string(
-            self.connection_string
+            self.connection_string, **SDK_CLIENT_OPTIONS
         ) as blob_service_client:
-            
-            await self._ensure_container_exists(blob_service_client)
-            
-            semaphore = asyncio.Semaphore(max_concurrent)
-            tasks = [
-                self._upload_single_file(blob_service_client, file_path, semaphore)
-                for file_path in file_paths
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle exceptions
-            processed_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    processed_results.append({
-                        'success': False,
-                        'file_path': file_paths[i],
-                        'error': str(result)
-                    })
+            return await self._upload_files_with_client(
+                blob_service_client, file_paths, max_concurrent
+            )
+    
+    async def _upload_files_with_client(self, blob_service_client,
+                                        file_paths: List[str],
+                                        max_concurrent: int) -> List[Dict[str, Any]]:
+        """Upload files using an open blob service client"""
+        await self._ensure_container_exists(blob_service_client)
+        
+        # With a limiter, it decides how many requests run; the semaphore
+        # only keeps the number of open files at the limiter's ceiling
+        if self.concurrency_limiter is not None:
+            max_concurrent = max(max_concurrent, self.concurrency_limiter.max_limit)
+        semaphore = asyncio.Semaphore(max_concurrent)
+        tasks = [
+            self._upload_single_file(blob_service_client, file_path, semaphore)
+            for file_path in file_paths
+        ]
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Handle exceptions
+        processed_results = []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                processed_results.append({
+                    'success': False,
+                    'file_path': file_paths[i],
+                    'error': str(result)
+                })
+            else:
+                processed_results.append(result)
+        
+        return processed_results
+    
+    async def upload_stream(self, file_paths: Union[Iterable[Any], AsyncIterable[Any]],
+                            num_workers: int = 5,
+                            queue_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Upload files from a (possibly unbounded) iterator, yielding results as they complete
+        
+        Accepts paths or ``os.DirEntry`` objects from a sync or async iterator.
+        A fixed number of workers consume a bounded queue, so memory stays flat
+        regardless of how many files are uploaded.
+        """
+        if self.blob_service_client is not None:
+            async for result in self._upload_stream_with_client(
+                self.blob_service_client, file_paths, num_workers, queue_size
+            ):
+                yield result
+            return
+        
+        async with BlobServiceClient.from_connection_string(
+            self.connection_string, **SDK_CLIENT_OPTIONS
+        ) as blob_service_client:
+            async for result in self._upload_stream_with_client(
+                blob_service_client, file_paths, num_workers, queue_size
+            ):
+                yield result
+    
+    async def _upload_stream_with_client(self, blob_service_client,
+                                         file_paths: Union[Iterable[Any], AsyncIterable[Any]],
+                                         num_workers: int,
+                                         queue_size: Optional[int]) -> AsyncIterator[Dict[str, Any]]:
+        """Run the producer/worker pipeline on an open blob service client"""
+        await self._ensure_container_exists(blob_service_client)
+        
+        queue_size = queue_size or num_workers * 2
+        path_queue = asyncio.Queue(maxsize=queue_size)
+        result_queue = asyncio.Queue(maxsize=queue_size)
+        producer_errors = []
+        
+        async def produce() -> None:
+            try:
+                if hasattr(file_paths, '__aiter__'):
+                    async for path in file_paths:
+                        await path_queue.put(os.fspath(path))
                 else:
-                    processed_results.append(result)
+                    for path in file_paths:
+                        await path_queue.put(os.fspath(path))
+            except Exception as e:
+                producer_errors.append(e)
+            
+            for _ in range(num_workers):
+                await path_queue.put(_END_OF_STREAM)
+        
+        async def work() -> None:
+            while True:
+                file_path = await path_queue.get()
+                if file_path is _END_OF_STREAM:
+                    await result_queue.put(_END_OF_STREAM)
+                    return
+                result = await self._upload_file(blob_service_client, file_path)
+                await result_queue.put(result)
+        
+        tasks = [asyncio.ensure_future(produce())]
+        tasks.extend(asyncio.ensure_future(work()) for _ in range(num_workers))
+        
+        try:
+            finished_workers = 0
+            while finished_workers < num_workers:
+                result = await result_queue.get()
+                if result is _END_OF_STREAM:
+                    finished_workers += 1
+                    continue
+                yield result
             
-            return processed_results
+            if producer_errors:
+                raise producer_errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
     
     async def _ensure_container_exists(self, blob_service_client) -> None:
         """Ensure container exists"""
-        try:
-            container_client = blob_service_client.get_container_client(
-                self.container_name
-            )
-            await container_client.create_container()
+        if self._container_ready:
+            return
+        
+        container_client = blob_service_client.get_container_client(
+            self.container_name
+        )
+        if await self.retry_policy.call_async(
+            'create_container', _create_container, container_client
+        ):
             logger.info(f"Created container: {self.container_name}")
-        except ResourceExistsError:
+        else:
             logger.info(f"Container {self.container_name} already exists")
+        self._container_ready = True
     
     async def _upload_single_file(self, blob_service_client, 
                                  file_path: str, semaphore) -> Dict[str, Any]:
         """Upload a single file with semaphore control"""
         async with semaphore:
-            try:
-                blob_name = os.path.basename(file_path)
-                blob_client = blob_service_client.get_blob_client(
-                    container=self.container_name,
-                    blob=blob_name
+            return await self._upload_file(blob_service_client, file_path)
+    
+    async def _upload_file(self, blob_service_client, file_path: str) -> Dict[str, Any]:
+        """Upload a single file, returning a result dict instead of raising"""
+        try:
+            blob_name = os.path.basename(file_path)
+            blob_client = blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            
+            file_size = os.path.getsize(file_path)
+            start_time = time.perf_counter()
+            block_count = 0
+            
+            if file_size > self.large_file_threshold_bytes:
+                block_count = await self._upload_in_blocks(
+                    blob_client, file_path, file_size
+                )
+            else:
+                await self.retry_policy.call_async(
+                    'upload_blob', self._limited(self._upload_whole_file, file_size),
+                    blob_client, file_path
+                )
+            
+            elapsed = time.perf_counter() - start_time
+            
+            logger.info(f"Successfully uploaded: {blob_name}")
+            return {
+                'success': True,
+                'file_path': file_path,
+                'blob_name': blob_name,
+                'url': blob_client.url,
+                'file_size': file_size,
+                'block_count': block_count,
+                'elapsed_seconds': elapsed,
+                'throughput_mbps': (file_size / 1024 / 1024 / elapsed) if elapsed > 0 else 0
+            }
+        
+        except Exception as e:
+            logger.error(f"Error uploading {file_path}: {e}")
+            return {
+                'success': False,
+                'file_path': file_path,
+                'error': str(e)
+            }
+    
+    async def _upload_whole_file(self, blob_client, file_path: str) -> None:
+        """Upload a file as a single unit (reopened on every attempt)"""
+        with open(file_path, 'rb') as data:
+            await blob_client.upload_blob(data, overwrite=True)
+    
+    async def _upload_in_blocks(self, blob_client, file_path: str,
+                                file_size: int) -> int:
+        """Stage a large file as concurrent blocks and commit the block list"""
+        block_count = (file_size + self.block_size_bytes - 1) // self.block_size_bytes
+        # Block ids must all have the same length within a blob
+        block_ids = [f"{index:08d}" for index in range(block_count)]
+        loop = asyncio.get_running_loop()
+        # Workers take the next block index when they finish one, so only
+        # max_block_concurrency blocks are read and in flight at any time
+        indexes = iter(range(block_count))
+        
+        async def stage_blocks() -> None:
+            for index in indexes:
+                offset = index * self.block_size_bytes
+                length = min(self.block_size_bytes, file_size - offset)
+                data = await loop.run_in_executor(
+                    None, _read_block, file_path, offset, length
                 )
                 
-                with open(file_path, 'rb') as data:
-                    await blob_client.upload_blob(data, overwrite=True)
-                
-                logger.info(f"Successfully uploaded: {blob_name}")
-                return {
-                    'success': True,
-                    'file_path': file_path,
-                    'blob_name': blob_name,
-                    'url': blob_client.url
-                }
-                
-            except Exception as e:
-                logger.error(f"Error uploading {file_path}: {e}")
-                return {
-                    'success': False,
-                    'file_path': file_path,
-                    'error': str(e)
-                }
+                await self.retry_policy.call_async(
+                    'stage_block', self._limited(blob_client.stage_block, length),
+                    block_id=block_ids[index], data=data, length=length
+                )
+        
+        workers = [
+            asyncio.ensure_future(stage_blocks())
+            for _ in range(min(self.max_block_concurrency, block_count))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except Exception:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        
+        await self.retry_policy.call_async(
+            'commit_block_list', self._limited(blob_client.commit_block_list),
+            [BlobBlock(block_id=block_id) for block_id in block_ids]
+        )
+        return block_count
+    
+    def _limited(self, func, size_bytes: int = 0):
+        """Wrap one request so each attempt waits for a limiter slot"""
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return func
+        
+        async def call(*args, **kwargs):
+            async with limiter.track(size_bytes):
+                return await func(*args, **kwargs)
+        
+        return call
+
+async def _create_container(container_client) -> bool:
+    """Create a container; False if it already exists, which is no failure"""
+    try:
+        await container_client.create_container()
+    except ResourceExistsError:
+        return False
+    return True
+
+def _read_block(file_path: str, offset: int, length: int) -> bytes:
+    """Read one block of a file"""
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+class PersistentBlobUploader:
+    """Long-lived uploader running on its own event loop thread
+    
+    Opened once and reused: one blob service client and one pooled aiohttp
+    session serve every call, so TLS connections are kept alive and the
+    container is checked only once. The sync methods are thread-safe and
+    work from code that already runs an event loop (notebooks, async web
+    views); the async methods can be awaited from any loop.
+    
+    Use it as a context manager or call ``close``, which cancels uploads
+    still running. If it is garbage collected while open, the loop thread,
+    client and session are released then.
+    """
+    
+    def __init__(self, connection_string: str, container_name: str,
+                 blob_service_client: Optional[Any] = None,
+                 max_connections: int = 100,
+                 **uploader_options):
+        self.connection_string = connection_string
+        self.container_name = container_name
+        # Externally managed client (e.g. the tests' AsyncLocalBlobServiceClient); not closed here
+        self.blob_service_client = blob_service_client
+        self.max_connections = max_connections
+        self.uploader_options = uploader_options
+        self.uploader = None
+        
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._owned_client = None
+        # Releases the loop thread, client and session on close or collection
+        self._finalizer = None
+        self._lock = threading.Lock()
+    
+    def open(self) -> 'PersistentBlobUploader':
+        """Start the loop thread, create the client and check the container"""
+        with self._lock:
+            if self._loop is not None:
+                return self
+            
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name='blob-uploader-loop', daemon=True
+            )
+            thread.start()
+            
+            try:
+                asyncio.run_coroutine_threadsafe(self._open_client(), loop).result()
+            except Exception:
+                self._stop_loop(loop, thread)
+                raise
+            
+            self._loop = loop
+            self._thread = thread
+            # Holds no reference to self, so an unclosed uploader can be collected
+            self._finalizer = weakref.finalize(
+                self, self._shutdown, loop, thread, self._owned_client, self._session
+            )
+        
+        return self
+    
+    def close(self) -> None:
+        """Cancel running uploads, close the client and session and stop
+        the loop thread; callers waiting on cancelled uploads get
+        ``CancelledError``"""
+        with self._lock:
+            if self._loop is None:
+                return
+            
+            try:
+                self._finalizer()
+            finally:
+                self._loop = None
+                self._thread = None
+                self._owned_client = None
+                self._session = None
+                self._finalizer = None
+    
+    def upload_files(self, file_paths: List[str],
+                     max_concurrent: int = 5) -> List[Dict[str, Any]]:
+        """Upload files, blocking the calling thread until they are done"""
+        return self._submit(
+            lambda: self.uploader.upload_files_async(file_paths, max_concurrent),
+            blocking=True
+        ).result()
+    
+    def upload_file(self, file_path: str) -> Dict[str, Any]:
+        """Upload one file, blocking the calling thread until it is done"""
+        return self._submit(
+            lambda: self.uploader._upload_file(self.uploader.blob_service_client, file_path),
+            blocking=True
+        ).result()
+    
+    def submit_file(self, file_path: str) -> concurrent.futures.Future:
+        """Start uploading one file and return a future of its result"""
+        return self._submit(
+            lambda: self.uploader._upload_file(self.uploader.blob_service_client, file_path)
+        )
+    
+    async def upload_files_async(self, file_paths: List[str],
+                                 max_concurrent: int = 5) -> List[Dict[str, Any]]:
+        """Upload files from any event loop without blocking it"""
+        return await asyncio.wrap_future(self._submit(
+            lambda: self.uploader.upload_files_async(file_paths, max_concurrent)
+        ))
+    
+    async def upload_file_async(self, file_path: str) -> Dict[str, Any]:
+        """Upload one file from any event loop without blocking it"""
+        return await asyncio.wrap_future(self.submit_file(file_path))
+    
+    def __enter__(self) -> 'PersistentBlobUploader':
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    async def __aenter__(self) -> 'PersistentBlobUploader':
+        await asyncio.get_running_loop().run_in_executor(None, self.open)
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+    
+    def _submit(self, make_coroutine, blocking: bool = False) -> concurrent.futures.Future:
+        """Schedule a coroutine on the uploader loop, opening it if needed"""
+        self.open()
+        if blocking and threading.current_thread() is self._thread:
+            raise RuntimeError("Use the async methods from the uploader's own loop")
+        return asyncio.run_coroutine_threadsafe(make_coroutine(), self._loop)
+    
+    async def _open_client(self) -> None:
+        """Create the client on the uploader loop and check the container"""
+        client = self.blob_service_client
+        if client is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+            client = BlobServiceClient.from_connection_string(
+                self.connection_string,
+                transport=AioHttpTransport(session=self._session, session_owner=False),
+                **SDK_CLIENT_OPTIONS
+            )
+            self._owned_client = client
+        
+        self.uploader = AsyncBlobUploader(
+            self.connection_string, self.container_name,
+            blob_service_client=client, **self.uploader_options
+        )
+        try:
+            await self.uploader._ensure_container_exists(client)
+        except Exception:
+            await self._close_client()
+            raise
+    
+    async def _close_client(self) -> None:
+        if self._owned_client is not None:
+            await self._owned_client.close()
+            self._owned_client = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    @staticmethod
+    def _shutdown(loop: asyncio.AbstractEventLoop, thread: threading.Thread,
+                  client: Optional[Any], session: Optional[aiohttp.ClientSession]) -> None:
+        """Cancel the loop's tasks, close the client and session, stop the loop"""
+        async def cancel_and_close() -> None:
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            # Resolves the futures returned to other threads as cancelled
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            if client is not None:
+                await client.close()
+            if session is not None:
+                await session.close()
+        
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_and_close(), loop).result()
+        finally:
+            PersistentBlobUploader._stop_loop(loop, thread)
+    
+    @staticmethod
+    def _stop_loop(loop: asyncio.AbstractEventLoop, thread: threading.Thread) -> None:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
 
 class BlobUploader:
-    """Synchronous wrapper for the async uploader"""
+    """Synchronous uploader backed by a persistent background loop
+    
+    Reuses one connection pool across calls and can be called from threads
+    or from code that already runs an event loop. Call ``close`` (or use it
+    as a context manager) to release the connections.
+    """
     
-    def __init__(self, connection_string: str, container_name: str):
-        self.async_uploader = AsyncBlobUploader(connection_string, container_name)
+    def __init__(self, connection_string: str, container_name: str, **options):
+        self.persistent_uploader = PersistentBlobUploader(
+            connection_string, container_name, **options
+        )
+        self._async_uploader = None
+    
+    @property
+    def async_uploader(self) -> AsyncBlobUploader:
+        """Standalone ``AsyncBlobUploader`` with the same settings
+        
+        For callers driving uploads from their own event loop, as before the
+        persistent loop existed; it opens a client per call.
+        """
+        if self._async_uploader is None:
+            persistent = self.persistent_uploader
+            self._async_uploader = AsyncBlobUploader(
+                persistent.connection_string, persistent.container_name,
+                blob_service_client=persistent.blob_service_client,
+                **persistent.uploader_options
+            )
+        return self._async_uploader
     
     def upload_files(self, file_paths: List[str], 
                     max_concurrent: int = 5) -> List[Dict[str, Any]]:
         """Upload files synchronously"""
-        return asyncio.run(
-            self.async_uploader.upload_files_async(file_paths, max_concurrent)
-        )
\ No newline at end of file
+        return self.persistent_uploader.upload_files(file_paths, max_concurrent)
+    
+    def close(self) -> None:
+        """Release the connection pool and the loop thread"""
+        self.persistent_uploader.close()
+    
+    def __enter__(self) -> 'BlobUploader':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
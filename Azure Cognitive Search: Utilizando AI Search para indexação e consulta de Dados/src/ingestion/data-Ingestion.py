@@ -1,38 +1,119 @@
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Optional, Iterator
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import ResourceExistsError
-from ..utils.helpers import get_file_metadata, validate_file_format
+from ..utils.helpers import (
+    get_file_metadata, validate_file_format, load_settings, format_file_size,
+    HashingReader
+)
 from ..utils.validators import DocumentValidator
+from ..utils.validation_cache import ValidationCache
+from ..utils.retry import RetryPolicy, SDK_CLIENT_OPTIONS
+from ..utils.metrics import StageTimer, summarize_timings
+from .ingestion_manifest import IngestionManifest
+from .dedup_index import DedupIndex
+from .ingestion_journal import IngestionJournal
 
 logger = logging.getLogger(__name__)
 
+def _create_container(container_client) -> bool:
+    """Create a container; False if it already exists, which is no failure"""
+    try:
+        container_client.create_container()
+    except ResourceExistsError:
+        return False
+    return True
+
 class DocumentIngestion:
     """Handle document ingestion to Azure Blob Storage"""
     
-    def __init__(self, storage_connection_string: str, container_name: str):
-        self.blob_service_client = BlobServiceClient.from_connection_string(storage_connection_string)
+    def __init__(self, storage_connection_string: str, container_name: str,
+                 blob_service_client: Optional[Any] = None,
+                 settings: Optional[Dict[str, Any]] = None,
+                 manifest_path: Optional[str] = None,
+                 streaming_upload: bool = False,
+                 dedup_index_path: Optional[str] = None,
+                 dedup_mode: str = 'skip',
+                 retry_policy: Optional[RetryPolicy] = None,
+                 validation_cache_path: Optional[str] = None,
+                 journal_path: Optional[str] = None):
+        # blob_service_client allows a local stand-in (e.g. the tests' LocalBlobServiceClient)
+        self.blob_service_client = blob_service_client or \
+            BlobServiceClient.from_connection_string(storage_connection_string, **SDK_CLIENT_OPTIONS)
         self.container_name = container_name
-        self.validator = DocumentValidator()
+        # Optional cache so unchanged files are not re-validated across runs
+        self.validation_cache = ValidationCache(validation_cache_path) \
+            if validation_cache_path else None
+        self.validator = DocumentValidator(cache=self.validation_cache)
+        
+        self.settings = settings if settings is not None else load_settings()
+        indexing_settings = self.settings.get('indexing_settings', {})
+        self.parallel_threads = max(1, int(indexing_settings.get('parallel_threads', 4)))
+        self.retry_policy = retry_policy or RetryPolicy.from_settings(self.settings)
+        # Algorithm of file_hash; changing it makes the manifest and dedup
+        # index see every file as new once
+        self.hash_algorithm = self.settings.get('document_processing', {}).get('hash_algorithm', 'md5')
+        
+        # Optional manifest enabling incremental batches
+        self.manifest = IngestionManifest(manifest_path) if manifest_path else None
+        
+        # Hash while uploading instead of in a separate pass, set metadata afterwards
+        self.streaming_upload = streaming_upload
+        
+        # Optional content-hash index; duplicates are skipped or aliased
+        if dedup_mode not in ('skip', 'alias'):
+            raise ValueError(f"Unsupported dedup mode: {dedup_mode}")
+        self.dedup_index = DedupIndex(dedup_index_path) if dedup_index_path else None
+        self.dedup_mode = dedup_mode
+        
+        # Optional journal so an interrupted batch resumes where it stopped
+        self.journal = IngestionJournal(journal_path) if journal_path else None
+        
         self._ensure_container_exists()
     
     def _ensure_container_exists(self) -> None:
         """Create container if it doesn't exist"""
-        try:
-            container_client = self.blob_service_client.get_container_client(self.container_name)
-            container_client.create_container()
+        container_client = self.blob_service_client.get_container_client(self.container_name)
+        if self.retry_policy.call('create_container', _create_container, container_client):
             logger.info(f"Created container: {self.container_name}")
-        except ResourceExistsError:
+        else:
             logger.info(f"Container {self.container_name} already exists")
     
-    def upload_document(self, file_path: str, blob_name: Optional[str] = None) -> Dict[str, Any]:
-        """Upload a single document to blob storage"""
+    def upload_document(self, file_path: str, blob_name: Optional[str] = None,
+                        metadata: Optional[Dict[str, Any]] = None,
+                        stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Upload a single document to blob storage
+        
+        ``metadata`` may be passed when it was already computed by the caller,
+        avoiding a second hashing pass over the file. Without it, streaming
+        uploads hash the bytes as they are sent. JSON and CSV files are still
+        content-validated first, in bounded memory and cached when there is a
+        validation cache. Deduplication needs the hash before uploading, so
+        it disables the streaming path. ``stat`` from a
+        directory scan is reused by validation and metadata extraction.
+        
+        Results carry ``timings``, the seconds spent in each stage
+        (validate, metadata, dedup, upload).
+        """
+        timer = StageTimer()
+        result = self._upload_document(file_path, blob_name, metadata, stat, timer)
+        result['timings'] = timer.timings
+        return result
+    
+    def _upload_document(self, file_path: str, blob_name: Optional[str],
+                         metadata: Optional[Dict[str, Any]],
+                         stat: Optional[os.stat_result],
+                         timer: StageTimer) -> Dict[str, Any]:
         if not blob_name:
             blob_name = os.path.basename(file_path)
         
+        streaming = self.streaming_upload and metadata is None and self.dedup_index is None
+        
         # Validate document
-        validation_result = self.validator.validate_document(file_path)
+        with timer('validate'):
+            validation_result = self.validator.validate_document(file_path, stat=stat)
         if not validation_result['is_valid']:
             return {
                 'success': False,
@@ -40,22 +121,55 @@ class DocumentIngestion:
                 'error': validation_result['errors']
             }
         
+        # Hash claimed in the dedup index until this upload is recorded
+        reserved_hash = None
         try:
+            if self.dedup_index is not None:
+                if metadata is None:
+                    with timer('metadata'):
+                        metadata = self._file_metadata(file_path, stat)
+                with timer('dedup'):
+                    duplicate = self.dedup_index.reserve(metadata.get('file_hash', ''))
+                if duplicate is not None:
+                    return self._handle_duplicate(file_path, blob_name, metadata, duplicate)
+                reserved_hash = metadata.get('file_hash', '')
+                # Whatever the blob held before must not be offered as a duplicate
+                self.dedup_index.discard_blob(blob_name)
+            
             blob_client = self.blob_service_client.get_blob_client(
                 container=self.container_name, 
                 blob=blob_name
             )
             
-            with open(file_path, 'rb') as data:
-                metadata = get_file_metadata(file_path)
-                blob_client.upload_blob(data, metadata=metadata, overwrite=True)
+            if streaming:
+                # Hashing happens while the bytes are sent
+                with timer('upload'):
+                    metadata = self.retry_policy.call(
+                        'upload_blob', self._upload_streaming, blob_client, file_path
+                    )
+            else:
+                if metadata is None:
+                    with timer('metadata'):
+                        metadata = self._file_metadata(file_path, stat)
+                with timer('upload'):
+                    self.retry_policy.call(
+                        'upload_blob', self._upload_file_blob, blob_client, file_path, metadata
+                    )
+            
+            if self.dedup_index is not None:
+                self.dedup_index.record(
+                    metadata.get('file_hash', ''), blob_name,
+                    metadata.get('file_size', 0), file_path
+                )
             
             logger.info(f"Successfully uploaded: {blob_name}")
             return {
                 'success': True,
                 'file_path': file_path,
                 'blob_name': blob_name,
-                'url': blob_client.url
+                'url': blob_client.url,
+                'file_size': metadata.get('file_size', 0),
+                'file_hash': metadata.get('file_hash', '')
             }
             
         except Exception as e:
@@ -65,31 +179,342 @@ class DocumentIngestion:
                 'file_path': file_path,
                 'error': str(e)
             }
+        finally:
+            if reserved_hash:
+                # No-op once recorded; otherwise lets waiting uploads proceed
+                self.dedup_index.release(reserved_hash)
+    
+    def _handle_duplicate(self, file_path: str, blob_name: str,
+                          metadata: Dict[str, Any],
+                          duplicate: Dict[str, Any]) -> Dict[str, Any]:
+        """Skip a duplicate file, or alias it with a server-side copy"""
+        result = {
+            'success': True,
+            'deduplicated': True,
+            'duplicate_of': duplicate['blob_name'],
+            'file_path': file_path,
+            'blob_name': duplicate['blob_name'],
+            'file_size': metadata.get('file_size', 0),
+            'file_hash': metadata.get('file_hash', '')
+        }
+        
+        if self.dedup_mode == 'alias' and blob_name != duplicate['blob_name']:
+            source_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=duplicate['blob_name']
+            )
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            # Copy inside the storage account instead of re-sending the bytes
+            self.dedup_index.discard_blob(blob_name)
+            self.retry_policy.call(
+                'start_copy_from_url', blob_client.start_copy_from_url,
+                source_client.url, metadata=metadata
+            )
+            result['blob_name'] = blob_name
+            result['url'] = blob_client.url
+            logger.info(f"Aliased duplicate {blob_name} -> {duplicate['blob_name']}")
+        else:
+            logger.info(f"Skipping duplicate of {duplicate['blob_name']}: {file_path}")
+        
+        return result
     
-    def process_documents_batch(self, directory_path: str) -> List[Dict[str, Any]]:
-        """Process multiple documents from a directory"""
+    def rebuild_dedup_index(self) -> int:
+        """Rebuild the dedup index from the container's blob metadata"""
+        if self.dedup_index is None:
+            raise ValueError("Deduplication is not enabled")
+        
+        container_client = self.blob_service_client.get_container_client(self.container_name)
+        return self.dedup_index.rebuild_from_container(container_client)
+    
+    def _upload_file_blob(self, blob_client, file_path: str,
+                          metadata: Dict[str, Any]) -> None:
+        """Upload a file with precomputed metadata (reopened on every attempt)"""
+        with open(file_path, 'rb') as data:
+            blob_client.upload_blob(data, metadata=metadata, overwrite=True)
+    
+    def _file_metadata(self, file_path: str,
+                       stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """File metadata with file_hash in the configured algorithm"""
+        return get_file_metadata(file_path, stat=stat, hash_algorithm=self.hash_algorithm)
+    
+    def _upload_streaming(self, blob_client, file_path: str) -> Dict[str, Any]:
+        """Upload a file in one read pass, hashing the bytes as they are sent"""
+        metadata = get_file_metadata(file_path, include_hash=False)
+        
+        with open(file_path, 'rb') as f:
+            reader = HashingReader(f, self.hash_algorithm)
+            blob_client.upload_blob(
+                reader, length=metadata['file_size'], overwrite=True
+            )
+        
+        metadata['file_hash'] = reader.hexdigest()
+        blob_client.set_blob_metadata(metadata)
+        return metadata
+    
+    def process_documents_batch(self, directory_path: str, parallel: bool = False,
+                                max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process multiple documents from a directory
+        
+        With ``parallel=True`` files are uploaded by a bounded thread pool sized
+        from ``indexing_settings.parallel_threads`` unless ``max_workers`` is given.
+        Results are then returned in completion order.
+        
+        With a journal, files completed by an earlier, interrupted run and
+        not modified since are not ingested again; their recorded results are
+        returned marked ``resumed``. Files that failed are retried. Call
+        ``finish_run`` once a run is complete.
+        """
+        if parallel:
+            return self._process_documents_parallel(
+                directory_path, max_workers or self.parallel_threads
+            )
+        
         results = []
         
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if validate_file_format(file_path):
-                    result = self.upload_document(file_path)
-                    results.append(result)
+        for entry in self._iter_document_entries(directory_path):
+            stat = self._entry_stat(entry)
+            resumed = self._resumed_result(entry.path, stat)
+            if resumed is not None:
+                results.append(resumed)
+                continue
+            
+            result = self.ingest_document(entry.path, stat=stat)
+            self._record_result(result, stat)
+            results.append(result)
+        
+        self._finish_batch(results)
+        return results
+    
+    def ingest_document(self, file_path: str,
+                        stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Upload a document unless the manifest shows it is unchanged
+        
+        Files whose size and mtime match the manifest are skipped without being
+        read. Files whose stat changed but whose hash did not are skipped
+        without being uploaded.
+        """
+        if self.manifest is None:
+            return self.upload_document(file_path, stat=stat)
+        
+        timer = StageTimer()
+        result = self._ingest_document(file_path, stat, timer)
+        result['timings'] = timer.merge(result.get('timings', {}))
+        return result
+    
+    def _ingest_document(self, file_path: str, stat: Optional[os.stat_result],
+                         timer: StageTimer) -> Dict[str, Any]:
+        try:
+            if stat is None:
+                stat = os.stat(file_path)
+        except OSError as e:
+            return {
+                'success': False,
+                'file_path': file_path,
+                'error': str(e)
+            }
+        
+        entry = self.manifest.get(file_path)
+        metadata = None
+        
+        if entry is not None:
+            if entry['file_size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                return self._skipped_result(file_path, entry, stat.st_size, 'unchanged')
+            
+            with timer('metadata'):
+                metadata = self._file_metadata(file_path, stat)
+            if metadata.get('file_hash') and metadata['file_hash'] == entry['file_hash']:
+                self.manifest.update_stat(file_path, stat.st_size, stat.st_mtime_ns)
+                return self._skipped_result(file_path, entry, stat.st_size, 'content_unchanged')
+        
+        result = self.upload_document(file_path, metadata=metadata, stat=stat)
+        if result['success'] and result.get('file_hash'):
+            self.manifest.record_upload(
+                file_path, stat.st_size, stat.st_mtime_ns,
+                result['file_hash'], result['blob_name']
+            )
+        
+        return result
+    
+    def _skipped_result(self, file_path: str, entry: Dict[str, Any],
+                        file_size: int, reason: str) -> Dict[str, Any]:
+        """Build the result of a file skipped by the manifest"""
+        logger.debug(f"Skipping {reason} file: {file_path}")
+        return {
+            'success': True,
+            'skipped': True,
+            'skip_reason': reason,
+            'file_path': file_path,
+            'blob_name': entry['blob_name'],
+            'file_size': file_size,
+            'file_hash': entry['file_hash']
+        }
+    
+    def _finish_batch(self, results: List[Dict[str, Any]]) -> None:
+        """Persist batch state and log skipped files"""
+        if self.dedup_index is not None:
+            self.dedup_index.flush()
+        if self.validation_cache is not None:
+            self.validation_cache.flush()
+        if self.journal is not None:
+            self.journal.flush()
+        
+        if self.manifest is None:
+            return
+        
+        self.manifest.flush()
+        skipped = [r for r in results if r.get('skipped')]
+        if skipped:
+            skipped_bytes = sum(r.get('file_size', 0) for r in skipped)
+            logger.info(
+                f"Skipped {len(skipped)} unchanged files "
+                f"({format_file_size(skipped_bytes)})"
+            )
+    
+    def _iter_document_entries(self, directory_path: str) -> Iterator[os.DirEntry]:
+        """Walk a directory and yield entries of files with a supported format
+        
+        Uses ``os.scandir`` directly so each entry's cached stat can be reused
+        by validation, the manifest and metadata extraction. Like ``os.walk``,
+        symlinked directories are not followed and unreadable ones are skipped.
+        """
+        directories = [directory_path]
+        while directories:
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError as e:
+                logger.warning(f"Cannot scan directory {directory}: {e}")
+                continue
+            
+            subdirectories = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                
+                if is_dir:
+                    if not entry.is_symlink():
+                        subdirectories.append(entry.path)
+                elif validate_file_format(entry.name):
+                    yield entry
                 else:
-                    logger.warning(f"Skipping unsupported file: {file_path}")
+                    logger.warning(f"Skipping unsupported file: {entry.path}")
+            
+            # Reversed so directories are visited in scan order, like os.walk
+            directories.extend(reversed(subdirectories))
+    
+    @staticmethod
+    def _entry_stat(entry: os.DirEntry) -> Optional[os.stat_result]:
+        """Stat of a scanned entry, or None to let the caller report the error"""
+        try:
+            return entry.stat()
+        except OSError:
+            return None
+    
+    def _process_documents_parallel(self, directory_path: str,
+                                    max_workers: int) -> List[Dict[str, Any]]:
+        """Upload documents with a bounded worker pool"""
+        results = []
+        # Keep a small window of pending futures so huge trees don't queue
+        # one future per file up front
+        max_pending = max_workers * 2
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            
+            for entry in self._iter_document_entries(directory_path):
+                stat = self._entry_stat(entry)
+                resumed = self._resumed_result(entry.path, stat)
+                if resumed is not None:
+                    results.append(resumed)
+                    continue
+                
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results.append(self._collect_result(future, *pending.pop(future)))
+                
+                future = executor.submit(self.ingest_document, entry.path, stat)
+                pending[future] = (entry.path, stat)
+            
+            for future in list(pending):
+                results.append(self._collect_result(future, *pending.pop(future)))
         
+        self._finish_batch(results)
         return results
     
-    def get_ingestion_stats(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate statistics from ingestion results"""
+    def _collect_result(self, future, file_path: str,
+                        stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Get a worker result, turning unexpected exceptions into a failed result"""
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Error processing {file_path}: {e}")
+            result = {
+                'success': False,
+                'file_path': file_path,
+                'error': str(e)
+            }
+        
+        self._record_result(result, stat)
+        return result
+    
+    def _resumed_result(self, file_path: str,
+                        stat: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+        """Result of an unchanged file the journal shows as completed, or None"""
+        if self.journal is None or not self.journal.is_completed(file_path, stat):
+            return None
+        
+        result = self.journal.get_result(file_path)
+        result['resumed'] = True
+        return result
+    
+    def _record_result(self, result: Dict[str, Any],
+                       stat: Optional[os.stat_result] = None) -> None:
+        if self.journal is not None:
+            self.journal.record(result, stat)
+    
+    def finish_run(self) -> None:
+        """Mark the journaled run complete, so the next batch starts afresh
+        
+        Unchanged files are still skipped by the manifest, if there is one.
+        """
+        if self.journal is not None:
+            self.journal.clear()
+    
+    def get_ingestion_stats(self, results: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate statistics from ingestion results
+        
+        Without ``results``, the journal's last result of every file is used,
+        which covers every run recorded in it.
+        """
+        if results is None:
+            if self.journal is None:
+                raise ValueError("Results are required when no journal is configured")
+            results = self.journal.results()
+        
         total_files = len(results)
         successful = sum(1 for r in results if r['success'])
         failed = total_files - successful
+        skipped = [r for r in results if r.get('skipped')]
+        deduplicated = [r for r in results if r.get('deduplicated')]
+        resumed = sum(1 for r in results if r.get('resumed'))
         
         return {
             'total_files': total_files,
             'successful': successful,
             'failed': failed,
-            'success_rate': (successful / total_files * 100) if total_files > 0 else 0
+            'success_rate': (successful / total_files * 100) if total_files > 0 else 0,
+            'skipped': len(skipped),
+            'skipped_bytes': sum(r.get('file_size', 0) for r in skipped),
+            'deduplicated': len(deduplicated),
+            'dedup_bytes_saved': sum(r.get('file_size', 0) for r in deduplicated),
+            'resumed': resumed,
+            'stages': summarize_timings(r for r in results if not r.get('resumed')),
+            'retry_stats': self.retry_policy.get_stats()
         }
\ No newline at end of file
@@ -0,0 +1,179 @@
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable
+from ..utils.sqlite_store import SQLiteStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DedupIndex(SQLiteStore):
+    """Persistent content-hash lookup used to avoid uploading duplicate files
+    
+    Maps the ``file_hash`` stored as blob metadata to the blob holding that
+    content. The index can be rebuilt in bulk from a container listing.
+    
+    Uploads ``reserve`` a hash first, so concurrent uploads of the same
+    content wait for the first one instead of repeating it, and call
+    ``discard_blob`` before overwriting a blob, so its old content is no
+    longer offered as a duplicate.
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS content_hashes (
+            file_hash TEXT PRIMARY KEY,
+            blob_name TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            source_path TEXT,
+            recorded_at TEXT NOT NULL
+        )
+        """,
+    )
+    
+    def __init__(self, db_path: str, commit_interval: int = 100):
+        super().__init__(db_path, commit_interval)
+        # file_hash -> Event set once the upload holding it records or releases it
+        self._reserved = {}
+    
+    def lookup(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the blob already holding content with this hash"""
+        if not file_hash:
+            return None
+        
+        with self._lock:
+            return self._lookup(file_hash)
+    
+    def reserve(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the blob holding this content, or claim the hash for an upload
+        
+        Returns None once the hash is claimed; the caller must then ``record``
+        or ``release`` it. While another upload holds the claim, waits for it.
+        """
+        if not file_hash:
+            return None
+        
+        while True:
+            with self._lock:
+                entry = self._lookup(file_hash)
+                if entry is not None:
+                    return entry
+                
+                pending = self._reserved.get(file_hash)
+                if pending is None:
+                    self._reserved[file_hash] = threading.Event()
+                    return None
+            
+            pending.wait()
+    
+    def release(self, file_hash: str) -> None:
+        """Give up a claim taken by ``reserve`` without recording a blob"""
+        with self._lock:
+            self._release(file_hash)
+    
+    def discard_blob(self, blob_name: str) -> None:
+        """Forget the content of a blob that is about to be overwritten"""
+        self._write("DELETE FROM content_hashes WHERE blob_name = ?", (blob_name,))
+    
+    def _lookup(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Entry of a hash; the caller holds the lock"""
+        row = self._connection.execute(
+            "SELECT blob_name, file_size, source_path, recorded_at "
+            "FROM content_hashes WHERE file_hash = ?",
+            (file_hash,)
+        ).fetchone()
+        
+        if row is None:
+            return None
+        
+        return {
+            'file_hash': file_hash,
+            'blob_name': row[0],
+            'file_size': row[1],
+            'source_path': row[2],
+            'recorded_at': row[3]
+        }
+    
+    def record(self, file_hash: str, blob_name: str, file_size: int,
+              source_path: Optional[str] = None) -> None:
+        """Record the blob holding content with this hash
+        
+        Any other hash recorded for the same blob is dropped, since the blob
+        no longer holds that content. A claim on the hash is released.
+        """
+        if not file_hash:
+            return
+        
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM content_hashes WHERE blob_name = ? AND file_hash != ?",
+                (blob_name, file_hash)
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO content_hashes "
+                "(file_hash, blob_name, file_size, source_path, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (file_hash, blob_name, file_size, source_path,
+                 datetime.now().isoformat())
+            )
+            self._count_writes()
+            self._release(file_hash)
+    
+    def rebuild_from_blobs(self, blobs: Iterable[Any], batch_size: int = 1000) -> int:
+        """Replace the index with the hashes found in blob listings
+        
+        ``blobs`` are blob properties with ``name``, ``size`` and ``metadata``
+        as returned by ``list_blobs(include=['metadata'])``. Blobs without a
+        ``file_hash`` metadata entry are ignored.
+        """
+        recorded_at = datetime.now().isoformat()
+        indexed = 0
+        
+        with self._lock:
+            self._connection.execute("DELETE FROM content_hashes")
+            
+            batch = []
+            for blob in blobs:
+                file_hash = (blob.metadata or {}).get('file_hash')
+                if not file_hash:
+                    continue
+                
+                batch.append((file_hash, blob.name, blob.size or 0, None, recorded_at))
+                if len(batch) >= batch_size:
+                    self._insert_batch(batch)
+                    indexed += len(batch)
+                    batch = []
+            
+            if batch:
+                self._insert_batch(batch)
+                indexed += len(batch)
+            
+            self._commit()
+        
+        logger.info(f"Rebuilt dedup index with {indexed} blobs")
+        return indexed
+    
+    def rebuild_from_container(self, container_client) -> int:
+        """Rebuild the index from a container's blob metadata"""
+        return self.rebuild_from_blobs(container_client.list_blobs(include=['metadata']))
+    
+    def count(self) -> int:
+        """Number of distinct content hashes tracked"""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM content_hashes"
+            ).fetchone()[0]
+    
+    def _release(self, file_hash: str) -> None:
+        """Wake uploads waiting on a claim; the caller holds the lock"""
+        pending = self._reserved.pop(file_hash, None)
+        if pending is not None:
+            pending.set()
+    
+    def _insert_batch(self, batch: list) -> None:
+        # First blob listed for a hash wins, like the first upload would
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO content_hashes "
+            "(file_hash, blob_name, file_size, source_path, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            batch
+        )
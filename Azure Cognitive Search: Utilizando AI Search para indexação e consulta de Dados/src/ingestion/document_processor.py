@@ -1,33 +1,190 @@
+import os
+import time
+import asyncio
+import hashlib
 import mimetypes
-from typing import Dict, Any, Optional
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait, as_completed
+)
+from typing import Dict, Any, Optional, List, Iterable, Iterator, AsyncIterator
 from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient as AsyncDocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
+from ..utils.retry import RetryPolicy, SDK_CLIENT_OPTIONS
+from ..utils.helpers import calculate_file_hash
+from .extraction_cache import ExtractionCache
+from .structured_parsers import (
+    get_structured_format, iter_structured_documents, parse_structured_file
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_ID = "prebuilt-document"
+
+WORD_MIME_TYPES = [
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+]
+
+def _get_document_kind(file_path: str) -> str:
+    """Classify a file as pdf, word, text, structured or generic"""
+    if get_structured_format(file_path) is not None:
+        return 'structured'
+    
+    mime_type, _ = mimetypes.guess_type(file_path)
+    
+    if mime_type == 'application/pdf':
+        return 'pdf'
+    elif mime_type in WORD_MIME_TYPES:
+        return 'word'
+    elif mime_type == 'text/plain':
+        return 'text'
+    return 'generic'
+
+def _build_table(table) -> List[Dict[str, Any]]:
+    """Convert a Form Recognizer table into a list of cell dicts"""
+    table_data = []
+    for cell in table.cells:
+        table_data.append({
+            'content': cell.content,
+            'row_index': cell.row_index,
+            'column_index': cell.column_index
+        })
+    return table_data
+
+def _iter_pdf_pages(result) -> Iterator[Dict[str, Any]]:
+    """Yield per-page text, tables and character offsets of an analysis
+    
+    Offsets are positions in the text obtained by concatenating the pages in
+    order, which is what ``assemble_page_text`` returns. Tables without a
+    bounding region are reported with the first page.
+    """
+    tables_by_page = {}
+    first_page = result.pages[0].page_number if result.pages else 1
+    for table in result.tables:
+        regions = getattr(table, 'bounding_regions', None)
+        page_number = regions[0].page_number if regions else first_page
+        tables_by_page.setdefault(page_number, []).append(_build_table(table))
+    
+    offset = 0
+    for page in result.pages:
+        text = _page_text(page)
+        yield {
+            'page_number': page.page_number,
+            'text': text,
+            'tables': tables_by_page.get(page.page_number, []),
+            'char_start': offset,
+            'char_end': offset + len(text)
+        }
+        offset += len(text)
+
+def _page_text(page) -> str:
+    """Text of one analysed page, a line per line"""
+    return "".join(line.content + "\n" for line in page.lines)
+
+def assemble_page_text(pages: Iterable[Dict[str, Any]]) -> str:
+    """Join page texts into the full document text in linear time"""
+    return "".join(page['text'] for page in pages)
+
+def _build_pdf_result(result, file_path: str) -> Dict[str, Any]:
+    """Build the PDF result dict from a Form Recognizer analysis"""
+    # Joined once; repeated += on every line is quadratic on large documents
+    content = assemble_page_text({'text': _page_text(page)} for page in result.pages)
+    tables = [_build_table(table) for table in result.tables]
+    
+    return {
+        'success': True,
+        'content': content,
+        'tables': tables,
+        'page_count': len(result.pages),
+        'file_path': file_path
+    }
+
+def _build_content_result(result, file_path: str) -> Dict[str, Any]:
+    """Build a content-only result dict from a Form Recognizer analysis"""
+    content = result.content if result.content else ""
+    
+    return {
+        'success': True,
+        'content': content,
+        'file_path': file_path
+    }
+
+def _get_cache_model(model_id: str, document_kind: str) -> str:
+    """Cache namespace of a model; PDF results differ in shape from others"""
+    return f"{model_id}:{document_kind}"
+
+def _cacheable_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip the path so a cached result can serve identical files anywhere"""
+    return {key: value for key, value in result.items() if key != 'file_path'}
+
+def _structured_output_path(output_dir: Optional[str], file_path: str) -> Optional[str]:
+    """JSON Lines file receiving the documents parsed from a structured file,
+    or None when documents are not spooled"""
+    if output_dir is None:
+        return None
+    # The path digest keeps same-named files from different folders apart
+    digest = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(output_dir, f"{os.path.basename(file_path)}-{digest}.jsonl")
+
+def _read_text_file(file_path: str) -> Dict[str, Any]:
+    """Build the result dict of a plain text file"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    return {
+        'success': True,
+        'content': content,
+        'file_path': file_path
+    }
+
 class DocumentProcessor:
     """Process different types of documents and extract content"""
     
-    def __init__(self, form_recognizer_endpoint: str, form_recognizer_key: str):
+    def __init__(self, form_recognizer_endpoint: str, form_recognizer_key: str,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 cache: Optional[ExtractionCache] = None):
         self.document_client = DocumentAnalysisClient(
             endpoint=form_recognizer_endpoint,
-            credential=AzureKeyCredential(form_recognizer_key)
+            credential=AzureKeyCredential(form_recognizer_key),
+            **SDK_CLIENT_OPTIONS
         )
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        # Results keyed by content hash and model id skip the remote call
+        self.cache = cache
+        self.model_id = DEFAULT_MODEL_ID
+        # Records grouped into each document of a JSON, CSV or XLSX file
+        self.rows_per_document = 1
+        # Opt-in directory, owned by the caller, where parsed structured
+        # documents are spooled; results then carry documents_path, not content
+        self.structured_output_dir = None
     
     def process_document(self, file_path: str) -> Dict[str, Any]:
-        """Process document and extract content based on file type"""
-        mime_type, _ = mimetypes.guess_type(file_path)
+        """Process document and extract content based on file type
+        
+        Results carry ``timings`` with the seconds spent in the process stage.
+        """
+        start = time.perf_counter()
+        result = self._process_document(file_path)
+        result['timings'] = {'process': time.perf_counter() - start}
+        return result
+    
+    def _process_document(self, file_path: str) -> Dict[str, Any]:
+        document_kind = _get_document_kind(file_path)
         
         try:
-            if mime_type == 'application/pdf':
-                return self._process_pdf(file_path)
-            elif mime_type in ['application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-                return self._process_word_document(file_path)
-            elif mime_type == 'text/plain':
+            if document_kind == 'text':
                 return self._process_text_file(file_path)
+            elif document_kind == 'structured':
+                return parse_structured_file(
+                    file_path, self.rows_per_document,
+                    output_path=_structured_output_path(self.structured_output_dir, file_path)
+                )
+            elif self.cache is not None:
+                return self._process_cached(file_path, document_kind)
             else:
-                return self._process_generic_document(file_path)
+                return self._process_remote(file_path, document_kind)
                 
         except Exception as e:
             logger.error(f"Error processing document {file_path}: {e}")
@@ -37,85 +194,292 @@ class DocumentProcessor:
                 'file_path': file_path
             }
     
+    def _process_remote(self, file_path: str, document_kind: str) -> Dict[str, Any]:
+        """Process a document with Form Recognizer"""
+        if document_kind == 'pdf':
+            return self._process_pdf(file_path)
+        elif document_kind == 'word':
+            return self._process_word_document(file_path)
+        else:
+            return self._process_generic_document(file_path)
+    
+    def _process_cached(self, file_path: str, document_kind: str) -> Dict[str, Any]:
+        """Serve a document from the extraction cache, analysing it on a miss"""
+        content_hash = calculate_file_hash(file_path, 'sha256')
+        cache_model = _get_cache_model(self.model_id, document_kind)
+        
+        if content_hash:
+            cached = self.cache.get(content_hash, cache_model)
+            if cached is not None:
+                return {**cached, 'file_path': file_path}
+        
+        result = self._process_remote(file_path, document_kind)
+        if content_hash and result.get('success'):
+            self.cache.put(content_hash, cache_model, _cacheable_result(result))
+        
+        return result
+    
+    def process_documents(self, file_paths: Iterable[str],
+                          max_in_flight: int = 8) -> List[Dict[str, Any]]:
+        """Process many documents concurrently, in completion order"""
+        return list(self.iter_process_documents(file_paths, max_in_flight))
+    
+    def iter_process_documents(self, file_paths: Iterable[str],
+                               max_in_flight: int = 8) -> Iterator[Dict[str, Any]]:
+        """Yield document results as their analyses finish
+        
+        At most ``max_in_flight`` analyses are submitted or polling at a time;
+        each worker thread spends nearly all of its time waiting on the
+        remote poller.
+        """
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            pending = set()
+            
+            for file_path in file_paths:
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                
+                pending.add(executor.submit(self.process_document, file_path))
+            
+            for future in as_completed(pending):
+                yield future.result()
+    
+    def iter_structured_documents(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """Parse a JSON, CSV or XLSX file locally and yield its documents
+        
+        Rows are read in constant memory; each document holds up to
+        ``rows_per_document`` typed records and their text ``content``.
+        """
+        return iter_structured_documents(file_path, self.rows_per_document)
+    
+    def process_structured_files(self, file_paths: Iterable[str],
+                                 max_workers: Optional[int] = None,
+                                 process_pool_threshold_mb: float = 16) -> List[Dict[str, Any]]:
+        """Parse JSON, CSV and XLSX files locally, in input order
+        
+        Files of at least ``process_pool_threshold_mb`` are parsed in a
+        process pool so large files use every core; smaller ones are parsed
+        inline. With ``structured_output_dir`` set, documents are spooled to
+        each result's ``documents_path`` (see ``read_structured_documents``)
+        and only a summary comes back from the workers.
+        """
+        file_paths = list(file_paths)
+        threshold = process_pool_threshold_mb * 1024 * 1024
+        results = [None] * len(file_paths)
+        large_files = []
+        
+        for index, file_path in enumerate(file_paths):
+            try:
+                is_large = os.path.getsize(file_path) >= threshold
+            except OSError:
+                is_large = False
+            
+            if is_large:
+                large_files.append(index)
+            else:
+                results[index] = parse_structured_file(
+                    file_path, self.rows_per_document,
+                    output_path=_structured_output_path(self.structured_output_dir, file_path)
+                )
+        
+        if large_files:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        parse_structured_file, file_paths[index], self.rows_per_document,
+                        None, _structured_output_path(self.structured_output_dir, file_paths[index])
+                    ): index
+                    for index in large_files
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        
+        return results
+    
+    def iter_pdf_pages(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """Analyse a PDF and yield one result per page
+        
+        Each item has ``page_number``, ``text``, ``tables`` and the
+        ``char_start``/``char_end`` offsets of the page in the full text, so
+        chunking and indexing can start without assembling the document.
+        """
+        result = self._analyze_document(file_path, self.model_id)
+        yield from _iter_pdf_pages(result)
+    
+    def _analyze_document(self, file_path: str, model_id: str = DEFAULT_MODEL_ID):
+        """Run a Form Recognizer analysis, retrying throttled requests"""
+        return self.retry_policy.call(
+            'analyze_document', self._begin_and_wait, file_path, model_id
+        )
+    
+    def _begin_and_wait(self, file_path: str, model_id: str):
+        """Submit a document and block until its analysis completes"""
+        with open(file_path, 'rb') as f:
+            poller = self.document_client.begin_analyze_document(model_id, f)
+            return poller.result()
+    
     def _process_pdf(self, file_path: str) -> Dict[str, Any]:
         """Process PDF document using Form Recognizer"""
-        with open(file_path, 'rb') as f:
-            poller = self.document_client.begin_analyze_document(
-                "prebuilt-document", f
-            )
-            result = poller.result()
-        
-        content = ""
-        tables = []
-        
-        for page in result.pages:
-            for line in page.lines:
-                content += line.content + "\n"
-        
-        for table in result.tables:
-            table_data = []
-            for cell in table.cells:
-                table_data.append({
-                    'content': cell.content,
-                    'row_index': cell.row_index,
-                    'column_index': cell.column_index
-                })
-            tables.append(table_data)
-        
-        return {
-            'success': True,
-            'content': content,
-            'tables': tables,
-            'page_count': len(result.pages),
-            'file_path': file_path
-        }
+        result = self._analyze_document(file_path, self.model_id)
+        return _build_pdf_result(result, file_path)
     
     def _process_word_document(self, file_path: str) -> Dict[str, Any]:
         """Process Word document"""
-        with open(file_path, 'rb') as f:
-            poller = self.document_client.begin_analyze_document(
-                "prebuilt-document", f
-            )
-            result = poller.result()
-        
-        content = result.content if result.content else ""
-        
-        return {
-            'success': True,
-            'content': content,
-            'file_path': file_path
-        }
+        result = self._analyze_document(file_path, self.model_id)
+        return _build_content_result(result, file_path)
     
     def _process_text_file(self, file_path: str) -> Dict[str, Any]:
         """Process plain text file"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return {
-            'success': True,
-            'content': content,
-            'file_path': file_path
-        }
+        return _read_text_file(file_path)
     
     def _process_generic_document(self, file_path: str) -> Dict[str, Any]:
         """Process generic document using Form Recognizer"""
         try:
-            with open(file_path, 'rb') as f:
-                poller = self.document_client.begin_analyze_document(
-                    "prebuilt-document", f
-                )
-                result = poller.result()
-            
-            content = result.content if result.content else ""
-            
+            result = self._analyze_document(file_path, self.model_id)
+            return _build_content_result(result, file_path)
+        except Exception as e:
             return {
-                'success': True,
-                'content': content,
+                'success': False,
+                'error': f"Unable to process document type: {str(e)}",
                 'file_path': file_path
             }
+
+class AsyncDocumentProcessor:
+    """Asynchronous document processor built on the aio Form Recognizer client"""
+    
+    def __init__(self, form_recognizer_endpoint: str, form_recognizer_key: str,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 cache: Optional[ExtractionCache] = None):
+        self.document_client = AsyncDocumentAnalysisClient(
+            endpoint=form_recognizer_endpoint,
+            credential=AzureKeyCredential(form_recognizer_key),
+            **SDK_CLIENT_OPTIONS
+        )
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        self.cache = cache
+        self.model_id = DEFAULT_MODEL_ID
+        self.rows_per_document = 1
+        self.structured_output_dir = None
+    
+    async def close(self) -> None:
+        """Close the underlying client"""
+        await self.document_client.close()
+    
+    async def __aenter__(self) -> 'AsyncDocumentProcessor':
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+    
+    async def process_document(self, file_path: str) -> Dict[str, Any]:
+        """Process document and extract content based on file type
+        
+        Results carry ``timings`` with the seconds spent in the process stage.
+        """
+        start = time.perf_counter()
+        result = await self._process_document(file_path)
+        result['timings'] = {'process': time.perf_counter() - start}
+        return result
+    
+    async def _process_document(self, file_path: str) -> Dict[str, Any]:
+        document_kind = _get_document_kind(file_path)
+        loop = asyncio.get_running_loop()
+        
+        try:
+            if document_kind == 'text':
+                return await loop.run_in_executor(None, _read_text_file, file_path)
+            elif document_kind == 'structured':
+                return await loop.run_in_executor(
+                    None, parse_structured_file, file_path, self.rows_per_document,
+                    None, _structured_output_path(self.structured_output_dir, file_path)
+                )
+            
+            content_hash = None
+            cache_model = _get_cache_model(self.model_id, document_kind)
+            if self.cache is not None:
+                content_hash = await loop.run_in_executor(
+                    None, calculate_file_hash, file_path, 'sha256'
+                )
+                # SQLite and zlib work stays off the loop, like the hashing
+                cached = await loop.run_in_executor(
+                    None, self.cache.get, content_hash, cache_model
+                ) if content_hash else None
+                if cached is not None:
+                    return {**cached, 'file_path': file_path}
+            
+            result = await self._analyze_document(file_path, self.model_id)
+            if document_kind == 'pdf':
+                processed = _build_pdf_result(result, file_path)
+            else:
+                processed = _build_content_result(result, file_path)
+            
+            if content_hash:
+                await loop.run_in_executor(
+                    None, self.cache.put, content_hash, cache_model, _cacheable_result(processed)
+                )
+            return processed
+        
         except Exception as e:
+            logger.error(f"Error processing document {file_path}: {e}")
+            error = str(e)
+            if document_kind == 'generic':
+                error = f"Unable to process document type: {error}"
             return {
                 'success': False,
-                'error': f"Unable to process document type: {str(e)}",
+                'error': error,
                 'file_path': file_path
-            }
\ No newline at end of file
+            }
+    
+    async def process_documents(self, file_paths: Iterable[str],
+                                max_in_flight: int = 16) -> List[Dict[str, Any]]:
+        """Process many documents concurrently, in completion order"""
+        return [
+            result async for result in self.iter_process_documents(file_paths, max_in_flight)
+        ]
+    
+    async def iter_process_documents(self, file_paths: Iterable[str],
+                                     max_in_flight: int = 16) -> AsyncIterator[Dict[str, Any]]:
+        """Yield document results as their analyses finish, with at most
+        ``max_in_flight`` analyses outstanding"""
+        pending = set()
+        
+        try:
+            for file_path in file_paths:
+                if len(pending) >= max_in_flight:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        yield task.result()
+                
+                pending.add(asyncio.ensure_future(self.process_document(file_path)))
+            
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def iter_pdf_pages(self, file_path: str) -> AsyncIterator[Dict[str, Any]]:
+        """Analyse a PDF and yield one result per page (see DocumentProcessor)"""
+        result = await self._analyze_document(file_path, self.model_id)
+        for page in _iter_pdf_pages(result):
+            yield page
+    
+    async def _analyze_document(self, file_path: str, model_id: str = DEFAULT_MODEL_ID):
+        """Run a Form Recognizer analysis, retrying throttled requests"""
+        return await self.retry_policy.call_async(
+            'analyze_document', self._begin_and_wait, file_path, model_id
+        )
+    
+    async def _begin_and_wait(self, file_path: str, model_id: str):
+        """Submit a document and wait for its analysis to complete"""
+        with open(file_path, 'rb') as f:
+            poller = await self.document_client.begin_analyze_document(model_id, f)
+            return await poller.result()
@@ -0,0 +1,163 @@
+import json
+import time
+import zlib
+from typing import Dict, Any, Optional
+from ..utils.sqlite_store import SQLiteStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ExtractionCache(SQLiteStore):
+    """On-disk LRU cache of document extraction results
+    
+    Entries are keyed by content hash and model id, stored as zlib-compressed
+    JSON, and evicted least-recently-used first once the compressed total
+    exceeds ``max_size_mb``.
+    
+    Hits refresh their LRU position in memory; the access times are written
+    every ``commit_interval`` hits and on ``put``, ``flush`` and ``close``,
+    so reads do not commit.
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS extractions (
+            cache_key TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_extractions_last_access "
+        "ON extractions (last_access)"
+    )
+    
+    def __init__(self, db_path: str, max_size_mb: float = 512,
+                 compression_level: int = 6, commit_interval: int = 100):
+        super().__init__(db_path, commit_interval)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.compression_level = compression_level
+        # cache_key -> last access time not yet written
+        self._pending_access = {}
+        
+        self._total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM extractions"
+        ).fetchone()[0]
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+    
+    @staticmethod
+    def make_key(content_hash: str, model_id: str) -> str:
+        """Build the cache key of a document analysed with a model"""
+        return f"{model_id}:{content_hash}"
+    
+    def get(self, content_hash: str, model_id: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result, refreshing its LRU position"""
+        cache_key = self.make_key(content_hash, model_id)
+        
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM extractions WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            
+            self._pending_access[cache_key] = time.time()
+            if len(self._pending_access) >= self.commit_interval:
+                self._write_access_times()
+                self._commit()
+            self._stats['hits'] += 1
+        
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+    
+    def put(self, content_hash: str, model_id: str, value: Dict[str, Any]) -> None:
+        """Store a result and evict old entries beyond the size limit"""
+        cache_key = self.make_key(content_hash, model_id)
+        payload = zlib.compress(
+            json.dumps(value, ensure_ascii=False).encode('utf-8'),
+            self.compression_level
+        )
+        
+        if len(payload) > self.max_size_bytes:
+            logger.warning(f"Extraction result too large to cache: {cache_key}")
+            return
+        
+        with self._lock:
+            # Eviction below must see the latest access times
+            self._write_access_times()
+            previous = self._connection.execute(
+                "SELECT size_bytes FROM extractions WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            if previous is not None:
+                self._total_size -= previous[0]
+            
+            self._connection.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(cache_key, payload, size_bytes, last_access) VALUES (?, ?, ?, ?)",
+                (cache_key, payload, len(payload), time.time())
+            )
+            self._total_size += len(payload)
+            self._stats['writes'] += 1
+            
+            self._evict()
+            self._commit()
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._pending_access = {}
+            self._connection.execute("DELETE FROM extractions")
+            self._commit()
+            self._total_size = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT COUNT(*) FROM extractions"
+            ).fetchone()[0]
+            lookups = self._stats['hits'] + self._stats['misses']
+            
+            return {
+                **self._stats,
+                'hit_ratio': (self._stats['hits'] / lookups) if lookups > 0 else 0,
+                'entries': entries,
+                'size_bytes': self._total_size,
+                'max_size_bytes': self.max_size_bytes
+            }
+    
+    def _before_commit(self) -> None:
+        self._write_access_times()
+    
+    def _write_access_times(self) -> None:
+        """Apply buffered access times; the caller holds the lock and commits"""
+        if not self._pending_access:
+            return
+        self._connection.executemany(
+            "UPDATE extractions SET last_access = ? WHERE cache_key = ?",
+            [(accessed, cache_key) for cache_key, accessed in self._pending_access.items()]
+        )
+        self._pending_access = {}
+    
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until under the size limit"""
+        while self._total_size > self.max_size_bytes:
+            rows = self._connection.execute(
+                "SELECT cache_key, size_bytes FROM extractions "
+                "ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_size = 0
+                break
+            
+            for cache_key, size_bytes in rows:
+                if self._total_size <= self.max_size_bytes:
+                    break
+                self._connection.execute(
+                    "DELETE FROM extractions WHERE cache_key = ?", (cache_key,)
+                )
+                self._total_size -= size_bytes
+                self._stats['evictions'] += 1
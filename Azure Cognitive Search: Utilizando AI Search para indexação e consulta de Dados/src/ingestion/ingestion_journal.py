@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IngestionJournal:
+    """Append-only JSON Lines log of ingestion results for resuming runs
+    
+    Each processed file appends one line with its result; the last line for
+    a path wins. Lines are buffered and written every ``flush_interval``
+    records or ``flush_seconds`` seconds, without an fsync per file, so a
+    crash loses at most the unwritten tail and those files are simply
+    ingested again. A line torn by a crash is dropped when the journal is
+    reopened.
+    
+    Entries carry the file's size and mtime when it was recorded; a file
+    changed since then no longer counts as completed. ``clear`` marks the
+    run finished so the next one starts from an empty journal.
+    """
+    
+    def __init__(self, journal_path: str, flush_interval: int = 100,
+                 flush_seconds: float = 5.0):
+        journal_dir = os.path.dirname(journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = []
+        self._last_flush = time.monotonic()
+        
+        self._load()
+        self._file = open(journal_path, 'a', encoding='utf-8')
+    
+    def is_completed(self, file_path: str, stat: Optional[os.stat_result] = None) -> bool:
+        """Whether the file's last result was a success and it is unchanged since
+        
+        ``stat`` saves a system call when the caller already has it.
+        """
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+        if entry is None or entry['status'] != 'completed':
+            return False
+        
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return False
+        return entry.get('file_size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+    
+    def get_result(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Last recorded result of a file"""
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+        return dict(entry['result']) if entry is not None else None
+    
+    def record(self, result: Dict[str, Any], stat: Optional[os.stat_result] = None) -> None:
+        """Append the result of one file, with its stat (read now if not given)"""
+        file_path = os.path.abspath(result['file_path'])
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                pass
+        
+        entry = {
+            'file_path': file_path,
+            'status': 'completed' if result.get('success') else 'failed',
+            'file_size': stat.st_size if stat is not None else None,
+            'mtime_ns': stat.st_mtime_ns if stat is not None else None,
+            'recorded_at': datetime.now().isoformat(),
+            'result': result
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        
+        with self._lock:
+            self._entries[file_path] = entry
+            self._pending.append(line)
+            if (len(self._pending) >= self.flush_interval
+                    or time.monotonic() - self._last_flush >= self.flush_seconds):
+                self._write_pending()
+    
+    def results(self) -> List[Dict[str, Any]]:
+        """Last result of every file in the journal"""
+        with self._lock:
+            return [dict(entry['result']) for entry in self._entries.values()]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Counts of completed and failed files"""
+        with self._lock:
+            completed = sum(1 for entry in self._entries.values() if entry['status'] == 'completed')
+            return {
+                'files': len(self._entries),
+                'completed': completed,
+                'failed': len(self._entries) - completed,
+                'unwritten': len(self._pending)
+            }
+    
+    def flush(self, fsync: bool = False) -> None:
+        """Write buffered lines; ``fsync`` also forces them to disk"""
+        with self._lock:
+            self._write_pending()
+            if fsync:
+                os.fsync(self._file.fileno())
+    
+    def clear(self) -> None:
+        """Forget every entry and empty the file, ending the current run"""
+        with self._lock:
+            self._entries = {}
+            self._pending = []
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._last_flush = time.monotonic()
+        logger.info(f"Cleared ingestion journal {self.journal_path}")
+    
+    def close(self) -> None:
+        """Write buffered lines, sync and close the journal"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write_pending()
+            os.fsync(self._file.fileno())
+            self._file.close()
+    
+    def __enter__(self) -> 'IngestionJournal':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _write_pending(self) -> None:
+        """Write buffered lines; the caller holds the lock"""
+        if self._pending:
+            self._file.write('\n'.join(self._pending) + '\n')
+            self._file.flush()
+            self._pending = []
+        self._last_flush = time.monotonic()
+    
+    def _load(self) -> None:
+        """Replay an existing journal, truncating a torn last line"""
+        if not os.path.exists(self.journal_path):
+            return
+        
+        valid_size = 0
+        with open(self.journal_path, 'rb') as f:
+            for raw_line in f:
+                if not raw_line.endswith(b'\n'):
+                    logger.warning(f"Dropping incomplete last line of {self.journal_path}")
+                    break
+                
+                valid_size += len(raw_line)
+                try:
+                    entry = json.loads(raw_line)
+                    self._entries[entry['file_path']] = entry
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping corrupt line in {self.journal_path}: {e}")
+        
+        if valid_size < os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, valid_size)
+        
+        if self._entries:
+            stats = self.get_stats()
+            logger.info(
+                f"Resuming from {self.journal_path}: {stats['completed']} completed, "
+                f"{stats['failed']} failed"
+            )
@@ -0,0 +1,85 @@
+import os
+from datetime import datetime
+from typing import Dict, Any, Optional
+from ..utils.sqlite_store import SQLiteStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IngestionManifest(SQLiteStore):
+    """Persistent record of uploaded files used for incremental ingestion
+    
+    Maps each source path to the size, mtime, content hash and blob name seen
+    at its last successful upload. Writes are committed in batches of
+    ``commit_interval`` to keep per-file overhead low.
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS manifest (
+            file_path TEXT PRIMARY KEY,
+            file_size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            blob_name TEXT NOT NULL,
+            uploaded_at TEXT NOT NULL
+        )
+        """,
+    )
+    
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry for a file"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT file_size, mtime_ns, file_hash, blob_name, uploaded_at "
+                "FROM manifest WHERE file_path = ?",
+                (self._normalize_path(file_path),)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        return {
+            'file_path': file_path,
+            'file_size': row[0],
+            'mtime_ns': row[1],
+            'file_hash': row[2],
+            'blob_name': row[3],
+            'uploaded_at': row[4]
+        }
+    
+    def record_upload(self, file_path: str, file_size: int, mtime_ns: int,
+                      file_hash: str, blob_name: str,
+                      uploaded_at: Optional[str] = None) -> None:
+        """Record a successful upload"""
+        uploaded_at = uploaded_at or datetime.now().isoformat()
+        self._write(
+            "INSERT OR REPLACE INTO manifest "
+            "(file_path, file_size, mtime_ns, file_hash, blob_name, uploaded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self._normalize_path(file_path), file_size, mtime_ns,
+             file_hash, blob_name, uploaded_at)
+        )
+    
+    def update_stat(self, file_path: str, file_size: int, mtime_ns: int) -> None:
+        """Refresh the stored stat of a file whose content did not change"""
+        self._write(
+            "UPDATE manifest SET file_size = ?, mtime_ns = ? WHERE file_path = ?",
+            (file_size, mtime_ns, self._normalize_path(file_path))
+        )
+    
+    def remove(self, file_path: str) -> None:
+        """Remove a file from the manifest"""
+        self._write(
+            "DELETE FROM manifest WHERE file_path = ?",
+            (self._normalize_path(file_path),)
+        )
+    
+    def count(self) -> int:
+        """Number of files tracked by the manifest"""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+    
+    @staticmethod
+    def _normalize_path(file_path: str) -> str:
+        return os.path.abspath(file_path)
@@ -0,0 +1,259 @@
+import os
+import re
+import csv
+import json
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from typing import Dict, Any, Callable, Optional, List, Iterator, Tuple
+from ..utils.json_stream import iter_json_documents
+import logging
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+STRUCTURED_FORMATS = {
+    '.json': 'json',
+    '.jsonl': 'json',
+    '.csv': 'csv',
+    '.xlsx': 'xlsx'
+}
+
+# Leading zeros are kept as text so codes like "007" survive
+_NUMBER_PATTERN = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?')
+_BOOLEAN_VALUES = {'true': True, 'false': False}
+_CSV_DELIMITERS = ',;\t|'
+
+def get_structured_format(file_path: str) -> Optional[str]:
+    """Get json, csv or xlsx for files parsed locally, None otherwise"""
+    return STRUCTURED_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+def coerce_value(value: str) -> Any:
+    """Convert a CSV cell to None, bool, int or float where it is unambiguous"""
+    text = value.strip()
+    if not text:
+        return None
+    
+    lowered = text.lower()
+    if lowered in _BOOLEAN_VALUES:
+        return _BOOLEAN_VALUES[lowered]
+    
+    if _NUMBER_PATTERN.fullmatch(text):
+        if '.' in text or 'e' in lowered:
+            return float(text)
+        return int(text)
+    
+    return value
+
+def format_record(record: Dict[str, Any]) -> str:
+    """Render a record as "field: value" lines for full-text indexing"""
+    lines = []
+    for key, value in record.items():
+        if value is None:
+            continue
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False)
+        lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+def _field_names(header: List[Any], width: int) -> List[str]:
+    """Header names, with column_<n> for blank or missing headers"""
+    names = []
+    for index in range(width):
+        name = header[index] if index < len(header) else None
+        name = str(name).strip() if name is not None else ''
+        names.append(name or f"column_{index + 1}")
+    return names
+
+def _iter_json_records(file_path: str) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for value in iter_json_documents(f):
+            yield None, value if isinstance(value, dict) else {'value': value}
+
+def _iter_csv_records(file_path: str) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        # The header is the most regular line to guess the delimiter from
+        header_line = f.readline()
+        f.seek(0)
+        delimiter = max(_CSV_DELIMITERS, key=header_line.count)
+        
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        
+        names = _field_names(header, len(header))
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            if len(row) > len(names):
+                names = _field_names(header, len(row))
+            yield None, {
+                name: coerce_value(cell) for name, cell in zip(names, row)
+            }
+
+def _excel_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+def _iter_xlsx_records(file_path: str) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    if openpyxl is None:
+        raise ImportError("openpyxl is required to parse .xlsx files")
+    
+    # Read-only mode streams rows instead of loading the whole workbook
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            
+            names = _field_names(list(header), len(header))
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                if len(row) > len(names):
+                    names = _field_names(list(header), len(row))
+                yield sheet.title, {
+                    name: _excel_value(value) for name, value in zip(names, row)
+                }
+    finally:
+        workbook.close()
+
+_RECORD_READERS = {
+    'json': _iter_json_records,
+    'csv': _iter_csv_records,
+    'xlsx': _iter_xlsx_records
+}
+
+def iter_structured_documents(file_path: str,
+                              rows_per_document: int = 1) -> Iterator[Dict[str, Any]]:
+    """Yield documents of up to ``rows_per_document`` typed records
+    
+    Records are read incrementally, so memory is bounded by one document
+    rather than by the file. A JSON array yields one record per item; JSON
+    Lines one per line. Workbook documents never span sheets.
+    """
+    file_format = get_structured_format(file_path)
+    if file_format is None:
+        raise ValueError(f"Unsupported structured format: {file_path}")
+    
+    document_index = 0
+    records = []
+    current_sheet = None
+    
+    def build_document() -> Dict[str, Any]:
+        document = {
+            'file_path': file_path,
+            'document_index': document_index,
+            'records': records,
+            'content': "\n\n".join(format_record(record) for record in records)
+        }
+        if current_sheet is not None:
+            document['sheet'] = current_sheet
+        return document
+    
+    for sheet, record in _RECORD_READERS[file_format](file_path):
+        if records and (len(records) >= rows_per_document or sheet != current_sheet):
+            yield build_document()
+            document_index += 1
+            records = []
+        current_sheet = sheet
+        records.append(record)
+    
+    if records:
+        yield build_document()
+
+def parse_structured_file(file_path: str, rows_per_document: int = 1,
+                          sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          output_path: Optional[str] = None) -> Dict[str, Any]:
+    """Parse a structured file into a process_document result
+    
+    By default the result has the usual ``content``, the text of every
+    document, plus ``document_count`` and ``record_count``. With a ``sink``
+    and/or an ``output_path``, documents are instead consumed as they are
+    read: each is passed to ``sink`` and/or appended to ``output_path`` as a
+    JSON line, so memory stays bounded by one document, and the result holds
+    only counts (and ``documents_path``), which keeps it cheap to send back
+    from a process pool worker. Module-level so it can run in one.
+    """
+    collect_content = sink is None and output_path is None
+    contents = []
+    document_count = 0
+    record_count = 0
+    content_length = 0
+    
+    try:
+        output = None
+        if output_path is not None:
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            output = open(output_path, 'w', encoding='utf-8')
+        
+        try:
+            for document in iter_structured_documents(file_path, rows_per_document):
+                document_count += 1
+                record_count += len(document['records'])
+                content_length += len(document['content'])
+                if collect_content:
+                    contents.append(document['content'])
+                if output is not None:
+                    output.write(json.dumps(document, ensure_ascii=False, default=str) + '\n')
+                if sink is not None:
+                    sink(document)
+        finally:
+            if output is not None:
+                output.close()
+        
+        result = {'success': True}
+        if collect_content:
+            result['content'] = "\n\n".join(contents)
+        result.update({
+            'document_count': document_count,
+            'record_count': record_count,
+            'content_length': content_length,
+            'file_path': file_path
+        })
+        if output_path is not None:
+            result['documents_path'] = output_path
+        return result
+    
+    except Exception as e:
+        logger.error(f"Error parsing structured file {file_path}: {e}")
+        return {
+            'success': False,
+            'error': str(e),
+            'file_path': file_path
+        }
+
+@contextmanager
+def spool_structured_file(file_path: str, rows_per_document: int = 1,
+                          spool_dir: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Parse a structured file to a temporary JSON Lines spool
+    
+    Yields the ``parse_structured_file`` summary; its ``documents_path``
+    (see ``read_structured_documents``) is deleted when the block exits.
+    """
+    fd, output_path = tempfile.mkstemp(prefix='structured-', suffix='.jsonl', dir=spool_dir)
+    os.close(fd)
+    try:
+        yield parse_structured_file(file_path, rows_per_document, output_path=output_path)
+    finally:
+        try:
+            os.remove(output_path)
+        except FileNotFoundError:
+            pass
+
+def read_structured_documents(documents_path: str) -> Iterator[Dict[str, Any]]:
+    """Read back, one at a time, the documents written by parse_structured_file"""
+    with open(documents_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,288 @@
+import re
+import copy
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional, FrozenSet
+import logging
+
+logger = logging.getLogger(__name__)
+
+# String literals are dropped before looking for field names in a filter
+_FILTER_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_FILTER_NAMES = re.compile(r"[A-Za-z_]\w*(?:/\w+)*")
+# ...except the field list of search.ismatch('text', 'field1,field2')
+_ISMATCH_FIELDS = re.compile(r"search\.ismatch(?:scoring)?\(\s*'(?:[^']|'')*'\s*,\s*'([^']*)'")
+
+class SearchResultCache:
+    """LRU cache of search results with per-entry TTLs and a memory bound
+    
+    Results are stored as their JSON encoding, which is what ``max_bytes``
+    counts and what makes every ``get`` return a fresh copy. Keys combine
+    the index, the operation and a canonical form of the search parameters
+    (``QueryBuilder.build_search_params()`` with ``top``/``skip`` added), so
+    the same query built in a different order shares an entry.
+    
+    Entries can be invalidated per index, or only the filtered ones whose
+    filter references given fields; unfiltered entries may match any new
+    document, so they are always dropped. ``IndexWriter`` invalidates after
+    each batch it indexes.
+    
+    ``get_or_compute`` and its async twin coalesce concurrent misses of a
+    key: one caller computes the value while the others wait for a copy of
+    it, counted as hits and as ``coalesced``. Thread-safe; async callers
+    only wait for computations running on their own loop.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # key -> (payload, expires_at, index_name, filter_fields); filter_fields
+        # is None for unfiltered entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Bumped by invalidations so values computed before one are not stored
+        self._generation = 0
+        # key -> Future of the computation in progress; async ones per loop
+        self._computing = {}
+        self._computing_async = {}
+        self._stats = {
+            'hits': 0, 'misses': 0, 'coalesced': 0, 'expired': 0, 'evictions': 0,
+            'invalidations': 0, 'uncacheable': 0
+        }
+    
+    @staticmethod
+    def make_key(index_name: str, operation: str, search_params: Dict[str, Any]) -> str:
+        """Cache key of a query, paging included; ``None`` parameters are left out"""
+        params = {name: value for name, value in search_params.items() if value is not None}
+        canonical = json.dumps(
+            [index_name, operation, params],
+            sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+        )
+        # A digest keeps the keys of long queries small
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value of a key, or None if missing or expired"""
+        with self._lock:
+            payload = self._lookup(key)
+            self._stats['hits' if payload is not None else 'misses'] += 1
+        
+        return json.loads(payload) if payload is not None else None
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any], index_name: str,
+                       filter_expr: Optional[str] = None, ttl: Optional[float] = None) -> Any:
+        """Cached value of a key, computing and storing it on a miss
+        
+        Threads missing the same key while it is computed wait for that
+        computation instead of repeating it; if it raises, they raise too.
+        """
+        with self._lock:
+            payload = self._lookup(key)
+            if payload is not None:
+                self._stats['hits'] += 1
+                return json.loads(payload)
+            
+            pending = self._computing.get(key)
+            if pending is None:
+                future = self._computing[key] = Future()
+                generation = self._generation
+                self._stats['misses'] += 1
+            else:
+                self._stats['hits'] += 1
+                self._stats['coalesced'] += 1
+        
+        if pending is not None:
+            return copy.deepcopy(pending.result())
+        
+        try:
+            value = compute()
+            self._store(key, value, index_name, filter_expr, ttl, generation)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # A snapshot, in case the caller changes its value before waiters copy it
+            future.set_result(copy.deepcopy(value))
+        finally:
+            with self._lock:
+                del self._computing[key]
+        return value
+    
+    async def get_or_compute_async(self, key: str, compute: Callable[[], Awaitable[Any]],
+                                   index_name: str, filter_expr: Optional[str] = None,
+                                   ttl: Optional[float] = None) -> Any:
+        """``get_or_compute`` for coroutines; waiting does not block the loop"""
+        computing_key = (asyncio.get_running_loop(), key)
+        while True:
+            with self._lock:
+                payload = self._lookup(key)
+                if payload is not None:
+                    self._stats['hits'] += 1
+                    return json.loads(payload)
+                
+                pending = self._computing_async.get(computing_key)
+                if pending is None:
+                    future = self._computing_async[computing_key] = \
+                        asyncio.get_running_loop().create_future()
+                    generation = self._generation
+                    self._stats['misses'] += 1
+                else:
+                    self._stats['hits'] += 1
+                    self._stats['coalesced'] += 1
+            
+            if pending is None:
+                break
+            try:
+                return copy.deepcopy(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                # The computing task was cancelled, not this one: try again
+                if not pending.cancelled():
+                    raise
+        
+        try:
+            value = await compute()
+            self._store(key, value, index_name, filter_expr, ttl, generation)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marks the exception retrieved when nobody was waiting
+            future.exception()
+            raise
+        else:
+            # A snapshot, in case the caller changes its value before waiters copy it
+            future.set_result(copy.deepcopy(value))
+        finally:
+            with self._lock:
+                del self._computing_async[computing_key]
+        return value
+    
+    def put(self, key: str, value: Any, index_name: str,
+            filter_expr: Optional[str] = None, ttl: Optional[float] = None) -> bool:
+        """Store a value; returns False if it is not JSON or too large
+        
+        Pass no ``filter_expr`` for results that any indexed document may
+        change, such as counts, so every invalidation of the index drops them.
+        """
+        return self._store(key, value, index_name, filter_expr, ttl)
+    
+    def _store(self, key: str, value: Any, index_name: str, filter_expr: Optional[str],
+               ttl: Optional[float], generation: Optional[int] = None) -> bool:
+        """``put``, skipped if an invalidation happened since ``generation``"""
+        try:
+            payload = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            with self._lock:
+                self._stats['uncacheable'] += 1
+            return False
+        
+        size = len(payload) + len(key)
+        if size > self.max_bytes:
+            with self._lock:
+                self._stats['uncacheable'] += 1
+            return False
+        
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        filter_fields = filter_field_names(filter_expr) if filter_expr else None
+        
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, expires_at, index_name, filter_fields)
+            self._bytes += size
+            
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+        
+        return True
+    
+    def invalidate(self, index_name: Optional[str] = None,
+                   fields: Optional[Iterable[str]] = None) -> int:
+        """Drop entries of an index (all indexes if None)
+        
+        With ``fields``, filtered entries are dropped only if their filter
+        references one of them; unfiltered entries are always dropped.
+        Returns the number of entries removed.
+        """
+        fields = set(fields) if fields is not None else None
+        
+        with self._lock:
+            stale = [
+                key for key, (_, _, entry_index, filter_fields) in self._entries.items()
+                if (index_name is None or entry_index == index_name)
+                and (fields is None or filter_fields is None
+                     or not fields.isdisjoint(filter_fields))
+            ]
+            for key in stale:
+                self._remove(key)
+            self._stats['invalidations'] += len(stale)
+            self._generation += 1
+        
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached results for {index_name or 'all indexes'}")
+        return len(stale)
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratio, entry count and memory use"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_ratio': (self._stats['hits'] / lookups) if lookups > 0 else 0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+    
+    def _lookup(self, key: str) -> Optional[bytes]:
+        """Payload of a live entry, refreshing its LRU position; the caller
+        holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        payload, expires_at, _, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self._stats['expired'] += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        return payload
+    
+    def _remove(self, key: str) -> None:
+        """Remove one entry; the caller holds the lock"""
+        payload, _, _, _ = self._entries.pop(key)
+        self._bytes -= len(payload) + len(key)
+
+def filter_field_names(filter_expr: Optional[str]) -> FrozenSet[str]:
+    """Top-level field names an OData filter may reference
+    
+    Errs on the side of including too much (operators, lambda variables),
+    which only makes field invalidation drop a few more entries.
+    """
+    if not filter_expr:
+        return frozenset()
+    
+    names = _FILTER_NAMES.findall(_FILTER_STRINGS.sub(' ', filter_expr))
+    for field_list in _ISMATCH_FIELDS.findall(filter_expr):
+        names.extend(field.strip() for field in field_list.split(','))
+    return frozenset(name.split('/', 1)[0] for name in names)
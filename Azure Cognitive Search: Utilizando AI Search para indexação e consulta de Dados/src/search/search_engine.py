@@ -1,7 +1,14 @@
-from typing import Dict, Any, List, Optional, Union
+import hashlib
+from array import array
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Union
+import aiohttp
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.search.documents.models import VectorizedQuery
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import AioHttpTransport
+from ..utils.retry import RetryPolicy, SDK_CLIENT_OPTIONS
+from .result_cache import SearchResultCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,154 +16,115 @@ logger = logging.getLogger(__name__)
 class IntelligentSearch:
     """Intelligent search engine with advanced capabilities"""
     
-    def __init__(self, service_name: str, query_key: str, index_name: str):
+    def __init__(self, service_name: str, query_key: str, index_name: str,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 result_cache: Optional[SearchResultCache] = None):
         self.service_endpoint = f"https://{service_name}.search.windows.net"
         self.search_client = SearchClient(
             endpoint=self.service_endpoint,
             index_name=index_name,
-            credential=AzureKeyCredential(query_key)
+            credential=AzureKeyCredential(query_key),
+            **SDK_CLIENT_OPTIONS
         )
         self.index_name = index_name
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        # Optional cache of successful results, keyed by index and parameters
+        self.result_cache = result_cache
+    
+    def _search(self, operation: str, **search_params):
+        """Run a search and fetch its results, retrying throttled requests
+        
+        Results are paged lazily, so they are materialized inside the retried
+        call. Returns the pager (for counts and facets) and the result items.
+        """
+        def run():
+            results = self.search_client.search(**search_params)
+            return results, list(results)
+        
+        return self.retry_policy.call(operation, run)
+    
+    def _cached(self, operation: str, key_params: Dict[str, Any],
+                filter_expr: Optional[str], fetch: Callable[[], Any]) -> Any:
+        """Result of ``fetch``, served from the result cache when there is one
+        
+        Concurrent misses of the same query share a single ``fetch``; its
+        errors propagate to every caller and are not cached.
+        """
+        if self.result_cache is None:
+            return fetch()
+        key = self.result_cache.make_key(self.index_name, operation, key_params)
+        return self.result_cache.get_or_compute(key, fetch, self.index_name, filter_expr)
     
     def simple_search(self, query: str, top: int = 50) -> Dict[str, Any]:
         """Perform a simple text search"""
+        search_params = {'search_text': query, 'top': top, 'include_total_count': True}
+        
+        def fetch():
+            results, items = self._search('simple_search', **search_params)
+            return _simple_result(query, results.get_count(), items)
+        
         try:
-            results = self.search_client.search(
-                search_text=query,
-                top=top,
-                include_total_count=True
-            )
-            
-            documents = []
-            for result in results:
-                doc = dict(result)
-                documents.append(doc)
-            
-            return {
-                'success': True,
-                'query': query,
-                'total_count': results.get_count(),
-                'documents': documents,
-                'facets': {}
-            }
+            return self._cached('simple_search', search_params, None, fetch)
             
         except Exception as e:
             logger.error(f"Error in simple search: {e}")
-            return {
-                'success': False,
-                'query': query,
-                'error': str(e),
-                'documents': [],
-                'total_count': 0
-            }
+            return _error_result(query, e)
     
     def advanced_search(self, query: str, filters: Optional[str] = None,
                        facets: Optional[List[str]] = None, 
                        order_by: Optional[List[str]] = None,
                        top: int = 50, skip: int = 0) -> Dict[str, Any]:
         """Perform advanced search with filters and facets"""
-        try:
-            search_params = {
-                'search_text': query,
-                'filter': filters,
-                'order_by': order_by,
-                'top': top,
-                'skip': skip,
-                'include_total_count': True,
-                'highlight_fields': ['content', 'title'],
-                'highlight_pre_tag': '<mark>',
-                'highlight_post_tag': '</mark>'
-            }
-            
-            if facets:
-                search_params['facets'] = facets
-            
-            results = self.search_client.search(**search_params)
-            
-            documents = []
-            for result in results:
-                doc = dict(result)
-                # Add highlights if available
-                if hasattr(result, '@search.highlights'):
-                    doc['highlights'] = result['@search.highlights']
-                documents.append(doc)
+        search_params = _advanced_search_params(query, filters, facets, order_by, top, skip)
+        
+        def fetch():
+            results, items = self._search('advanced_search', **search_params)
             
             facet_results = {}
             if facets and hasattr(results, 'get_facets'):
                 facet_results = results.get_facets()
             
-            return {
-                'success': True,
-                'query': query,
-                'filters': filters,
-                'total_count': results.get_count(),
-                'documents': documents,
-                'facets': facet_results,
-                'page_info': {
-                    'top': top,
-                    'skip': skip,
-                    'has_more': results.get_count() > (skip + len(documents))
-                }
-            }
+            return _advanced_result(query, filters, top, skip, results.get_count(), items, facet_results)
+        
+        try:
+            return self._cached('advanced_search', search_params, filters, fetch)
             
         except Exception as e:
             logger.error(f"Error in advanced search: {e}")
-            return {
-                'success': False,
-                'query': query,
-                'error': str(e),
-                'documents': [],
-                'total_count': 0
-            }
+            return _error_result(query, e)
     
     def semantic_search(self, query: str, vector: List[float],
                        top: int = 50) -> Dict[str, Any]:
         """Perform semantic search using vectors"""
-        try:
-            vector_query = VectorizedQuery(
-                vector=vector,
-                k_nearest_neighbors=top,
-                fields="content_vector"
-            )
-            
-            results = self.search_client.search(
+        def fetch():
+            results, items = self._search(
+                'semantic_search',
                 search_text=query,
-                vector_queries=[vector_query],
+                vector_queries=[_vector_query(vector, top)],
                 top=top,
                 include_total_count=True
             )
-            
-            documents = []
-            for result in results:
-                doc = dict(result)
-                # Add semantic score if available
-                if hasattr(result, '@search.score'):
-                    doc['semantic_score'] = result['@search.score']
-                documents.append(doc)
-            
-            return {
-                'success': True,
-                'query': query,
-                'search_type': 'semantic',
-                'total_count': results.get_count(),
-                'documents': documents
-            }
+            return _semantic_result(query, results.get_count(), items)
+        
+        try:
+            # Keyed on a digest of the vector; serializing it would cost more
+            # than the lookup saves
+            return self._cached(
+                'semantic_search',
+                {'search_text': query, 'vector': _vector_digest(vector), 'top': top},
+                None, fetch
+            )
             
         except Exception as e:
             logger.error(f"Error in semantic search: {e}")
-            return {
-                'success': False,
-                'query': query,
-                'error': str(e),
-                'documents': [],
-                'total_count': 0
-            }
+            return _error_result(query, e)
     
     def suggest(self, query: str, suggester_name: str = "sg",
                top: int = 5) -> List[str]:
         """Get search suggestions"""
         try:
-            results = self.search_client.suggest(
+            results = self.retry_policy.call(
+                'suggest', self.search_client.suggest,
                 search_text=query,
                 suggester_name=suggester_name,
                 top=top
@@ -173,7 +141,8 @@ class IntelligentSearch:
                     mode: str = "oneTermWithContext") -> List[str]:
         """Get autocomplete suggestions"""
         try:
-            results = self.search_client.autocomplete(
+            results = self.retry_policy.call(
+                'autocomplete', self.search_client.autocomplete,
                 search_text=query,
                 suggester_name=suggester_name,
                 autocomplete_mode=mode
@@ -189,7 +158,9 @@ class IntelligentSearch:
     def get_document(self, key: str) -> Optional[Dict[str, Any]]:
         """Get a specific document by key"""
         try:
-            result = self.search_client.get_document(key=key)
+            result = self.retry_policy.call(
+                'get_document', self.search_client.get_document, key=key
+            )
             return dict(result)
         except Exception as e:
             logger.error(f"Error getting document {key}: {e}")
@@ -197,14 +168,309 @@ class IntelligentSearch:
     
     def count_documents(self, filters: Optional[str] = None) -> int:
         """Count documents matching filters"""
+        search_params = {'search_text': "*", 'filter': filters, 'top': 0, 'include_total_count': True}
+        
+        def fetch():
+            results, _ = self._search('count_documents', **search_params)
+            return results.get_count()
+        
         try:
-            results = self.search_client.search(
-                search_text="*",
-                filter=filters,
-                top=0,
+            # Unfiltered as far as the cache goes: any new document may change it
+            return self._cached('count_documents', search_params, None, fetch)
+        except Exception as e:
+            logger.error(f"Error counting documents: {e}")
+            return 0
+
+class AsyncIntelligentSearch:
+    """Asyncio counterpart of ``IntelligentSearch`` returning the same dicts
+    
+    Queries share one pooled aiohttp session, so a single instance can keep
+    hundreds of them in flight without a thread each. Pass ``session`` to
+    share a pool across several indexes; it is then left open on ``close``.
+    The client is created on first use, inside the running loop; use
+    ``async with`` or call ``close`` when done.
+    """
+    
+    def __init__(self, service_name: str, query_key: str, index_name: str,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 max_connections: int = 200,
+                 result_cache: Optional[SearchResultCache] = None):
+        self.service_endpoint = f"https://{service_name}.search.windows.net"
+        self.index_name = index_name
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        self.result_cache = result_cache
+        self.max_connections = max_connections
+        self._credential = AzureKeyCredential(query_key)
+        self._session = session
+        self._owns_session = session is None
+        self.search_client = None
+    
+    async def open(self) -> 'AsyncIntelligentSearch':
+        """Create the pooled session and client; later calls do nothing"""
+        if self.search_client is not None:
+            return self
+        
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+        self.search_client = AsyncSearchClient(
+            endpoint=self.service_endpoint,
+            index_name=self.index_name,
+            credential=self._credential,
+            transport=AioHttpTransport(session=self._session, session_owner=False),
+            **SDK_CLIENT_OPTIONS
+        )
+        return self
+    
+    async def close(self) -> None:
+        """Close the client and, unless it was passed in, the session"""
+        if self.search_client is not None:
+            await self.search_client.close()
+            self.search_client = None
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def __aenter__(self) -> 'AsyncIntelligentSearch':
+        return await self.open()
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+    
+    async def _search(self, operation: str, **search_params):
+        """Async ``IntelligentSearch._search``: the pager and its result items"""
+        await self.open()
+        
+        async def run():
+            results = await self.search_client.search(**search_params)
+            return results, [result async for result in results]
+        
+        return await self.retry_policy.call_async(operation, run)
+    
+    async def _cached(self, operation: str, key_params: Dict[str, Any],
+                      filter_expr: Optional[str],
+                      fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async ``IntelligentSearch._cached``: one ``fetch`` per concurrent miss"""
+        if self.result_cache is None:
+            return await fetch()
+        key = self.result_cache.make_key(self.index_name, operation, key_params)
+        return await self.result_cache.get_or_compute_async(key, fetch, self.index_name, filter_expr)
+    
+    async def simple_search(self, query: str, top: int = 50) -> Dict[str, Any]:
+        """Perform a simple text search"""
+        search_params = {'search_text': query, 'top': top, 'include_total_count': True}
+        
+        async def fetch():
+            results, items = await self._search('simple_search', **search_params)
+            return _simple_result(query, await results.get_count(), items)
+        
+        try:
+            return await self._cached('simple_search', search_params, None, fetch)
+            
+        except Exception as e:
+            logger.error(f"Error in simple search: {e}")
+            return _error_result(query, e)
+    
+    async def advanced_search(self, query: str, filters: Optional[str] = None,
+                              facets: Optional[List[str]] = None,
+                              order_by: Optional[List[str]] = None,
+                              top: int = 50, skip: int = 0) -> Dict[str, Any]:
+        """Perform advanced search with filters and facets"""
+        search_params = _advanced_search_params(query, filters, facets, order_by, top, skip)
+        
+        async def fetch():
+            results, items = await self._search('advanced_search', **search_params)
+            
+            facet_results = {}
+            if facets:
+                facet_results = await results.get_facets()
+            
+            return _advanced_result(query, filters, top, skip, await results.get_count(), items, facet_results)
+        
+        try:
+            return await self._cached('advanced_search', search_params, filters, fetch)
+            
+        except Exception as e:
+            logger.error(f"Error in advanced search: {e}")
+            return _error_result(query, e)
+    
+    async def semantic_search(self, query: str, vector: List[float],
+                              top: int = 50) -> Dict[str, Any]:
+        """Perform semantic search using vectors"""
+        async def fetch():
+            results, items = await self._search(
+                'semantic_search',
+                search_text=query,
+                vector_queries=[_vector_query(vector, top)],
+                top=top,
                 include_total_count=True
             )
-            return results.get_count()
+            return _semantic_result(query, await results.get_count(), items)
+        
+        try:
+            # Keyed on a digest of the vector; serializing it would cost more
+            # than the lookup saves
+            return await self._cached(
+                'semantic_search',
+                {'search_text': query, 'vector': _vector_digest(vector), 'top': top},
+                None, fetch
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in semantic search: {e}")
+            return _error_result(query, e)
+    
+    async def suggest(self, query: str, suggester_name: str = "sg",
+                      top: int = 5) -> List[str]:
+        """Get search suggestions"""
+        try:
+            await self.open()
+            results = await self.retry_policy.call_async(
+                'suggest', self.search_client.suggest,
+                search_text=query,
+                suggester_name=suggester_name,
+                top=top
+            )
+            return [result['@@search.text'] for result in results]
+            
+        except Exception as e:
+            logger.error(f"Error getting suggestions: {e}")
+            return []
+    
+    async def autocomplete(self, query: str, suggester_name: str = "sg",
+                           mode: str = "oneTermWithContext") -> List[str]:
+        """Get autocomplete suggestions"""
+        try:
+            await self.open()
+            results = await self.retry_policy.call_async(
+                'autocomplete', self.search_client.autocomplete,
+                search_text=query,
+                suggester_name=suggester_name,
+                autocomplete_mode=mode
+            )
+            return [result['text'] for result in results]
+            
+        except Exception as e:
+            logger.error(f"Error getting autocomplete: {e}")
+            return []
+    
+    async def get_document(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a specific document by key"""
+        try:
+            await self.open()
+            result = await self.retry_policy.call_async(
+                'get_document', self.search_client.get_document, key=key
+            )
+            return dict(result)
+        except Exception as e:
+            logger.error(f"Error getting document {key}: {e}")
+            return None
+    
+    async def count_documents(self, filters: Optional[str] = None) -> int:
+        """Count documents matching filters"""
+        search_params = {'search_text': "*", 'filter': filters, 'top': 0, 'include_total_count': True}
+        
+        async def fetch():
+            results, _ = await self._search('count_documents', **search_params)
+            return await results.get_count()
+        
+        try:
+            # Unfiltered as far as the cache goes: any new document may change it
+            return await self._cached('count_documents', search_params, None, fetch)
         except Exception as e:
             logger.error(f"Error counting documents: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+def _advanced_search_params(query: str, filters: Optional[str],
+                            facets: Optional[List[str]],
+                            order_by: Optional[List[str]],
+                            top: int, skip: int) -> Dict[str, Any]:
+    """Search parameters of an advanced search"""
+    search_params = {
+        'search_text': query,
+        'filter': filters,
+        'order_by': order_by,
+        'top': top,
+        'skip': skip,
+        'include_total_count': True,
+        'highlight_fields': ['content', 'title'],
+        'highlight_pre_tag': '<mark>',
+        'highlight_post_tag': '</mark>'
+    }
+    
+    if facets:
+        search_params['facets'] = facets
+    return search_params
+
+def _vector_digest(vector: List[float]) -> str:
+    """Digest of a query vector's float64 bytes, for result cache keys"""
+    return hashlib.blake2b(array('d', vector).tobytes(), digest_size=16).hexdigest()
+
+def _vector_query(vector: List[float], top: int) -> VectorizedQuery:
+    return VectorizedQuery(
+        vector=vector,
+        k_nearest_neighbors=top,
+        fields="content_vector"
+    )
+
+def _simple_result(query: str, total_count: int, items: List[Any]) -> Dict[str, Any]:
+    return {
+        'success': True,
+        'query': query,
+        'total_count': total_count,
+        'documents': [dict(result) for result in items],
+        'facets': {}
+    }
+
+def _advanced_result(query: str, filters: Optional[str], top: int, skip: int,
+                     total_count: int, items: List[Any],
+                     facet_results: Dict[str, Any]) -> Dict[str, Any]:
+    documents = []
+    for result in items:
+        doc = dict(result)
+        # Add highlights if available
+        if hasattr(result, '@search.highlights'):
+            doc['highlights'] = result['@search.highlights']
+        documents.append(doc)
+    
+    return {
+        'success': True,
+        'query': query,
+        'filters': filters,
+        'total_count': total_count,
+        'documents': documents,
+        'facets': facet_results,
+        'page_info': {
+            'top': top,
+            'skip': skip,
+            'has_more': total_count > (skip + len(documents))
+        }
+    }
+
+def _semantic_result(query: str, total_count: int, items: List[Any]) -> Dict[str, Any]:
+    documents = []
+    for result in items:
+        doc = dict(result)
+        # Add semantic score if available
+        if hasattr(result, '@search.score'):
+            doc['semantic_score'] = result['@search.score']
+        documents.append(doc)
+    
+    return {
+        'success': True,
+        'query': query,
+        'search_type': 'semantic',
+        'total_count': total_count,
+        'documents': documents
+    }
+
+def _error_result(query: str, error: Exception) -> Dict[str, Any]:
+    return {
+        'success': False,
+        'query': query,
+        'error': str(error),
+        'documents': [],
+        'total_count': 0
+    }
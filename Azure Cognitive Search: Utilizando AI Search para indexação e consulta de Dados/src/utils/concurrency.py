@@ -0,0 +1,206 @@
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Any, Iterable, Optional
+from azure.core.exceptions import HttpResponseError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Statuses the service uses to ask clients to slow down
+THROTTLE_STATUS_CODES = {429, 503}
+
+# Requests smaller than this are timed as if they were this large
+_MIN_LATENCY_BYTES = 1024 * 1024
+
+# Weight of each sample in the moving latency baselines
+_BASELINE_WEIGHT = 0.1
+
+def _size_bucket(size_bytes: int) -> int:
+    """Latency bucket of a request: 0 up to 1 MB, then one per doubling"""
+    return ((max(size_bytes, 1) - 1) // _MIN_LATENCY_BYTES).bit_length()
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit for async requests, like TCP congestion control
+    
+    Each ``limit`` healthy requests completed while the limit was in full use
+    raise it by one. A throttling response (429/503), a timeout or a latency
+    spike cuts it by ``decrease_factor``, at most once per window: signals
+    from requests started before the last cut are counted but not acted on.
+    
+    Latency is measured per MB (requests under 1 MB count as 1 MB) against
+    a moving baseline kept per size bucket (up to 1 MB, then one per
+    doubling), so small requests, dominated by round trips, never set the
+    bar for large ones. A sample above ``latency_tolerance`` times its
+    bucket's baseline is a spike. Every sample, spikes included, moves the
+    baseline, so after a lasting latency shift it catches up and the limit
+    recovers. Not thread-safe: use it from a single event loop.
+    """
+    
+    def __init__(self, initial_limit: int = 5, min_limit: int = 1,
+                 max_limit: int = 64, decrease_factor: float = 0.5,
+                 latency_tolerance: float = 2.0,
+                 throttle_status_codes: Optional[Iterable[int]] = None,
+                 history_size: int = 100):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.throttle_status_codes = set(throttle_status_codes or THROTTLE_STATUS_CODES)
+        
+        self.limit = initial_limit
+        self._in_flight = 0
+        self._waiters = deque()
+        # Bumped on every decrease; requests remember the epoch they started in
+        self._epoch = 0
+        self._healthy_in_window = 0
+        # Whether the limit was reached since the last change
+        self._saturated = False
+        # Size bucket -> moving average of seconds per MB
+        self._baselines = {}
+        
+        self._decisions = deque(maxlen=history_size)
+        self._stats = {
+            'completed': 0, 'throttled': 0, 'timeouts': 0, 'latency_spikes': 0,
+            'errors': 0, 'increases': 0, 'decreases': 0, 'max_limit_reached': initial_limit
+        }
+    
+    def track(self, size_bytes: int = 0) -> '_LimiterSlot':
+        """``async with limiter.track(size):`` holds a slot for one request"""
+        return _LimiterSlot(self, size_bytes)
+    
+    async def acquire(self) -> int:
+        """Wait for a free slot; returns the epoch to pass to ``release``"""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # A slot handed over just before the cancellation is given back
+                if waiter.done() and not waiter.cancelled():
+                    self._in_flight -= 1
+                    self._wake_waiters()
+                raise
+        
+        if self._in_flight >= self.limit:
+            self._saturated = True
+        return self._epoch
+    
+    def release(self, epoch: int, elapsed: float, size_bytes: int = 0,
+                error: Optional[BaseException] = None) -> None:
+        """Free a slot and adjust the limit from the request's outcome"""
+        self._in_flight -= 1
+        
+        if error is None:
+            self._stats['completed'] += 1
+            self._on_success(
+                epoch, _size_bucket(size_bytes),
+                elapsed / (max(size_bytes, _MIN_LATENCY_BYTES) / _MIN_LATENCY_BYTES)
+            )
+        elif self._is_throttle(error):
+            self._stats['throttled'] += 1
+            self._decrease(epoch, f"throttled ({getattr(error, 'status_code', None)})")
+        elif isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            self._stats['timeouts'] += 1
+            self._decrease(epoch, 'timeout')
+        elif not isinstance(error, asyncio.CancelledError):
+            # Other failures say nothing about load; they just earn no increase
+            self._stats['errors'] += 1
+        
+        self._wake_waiters()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Current limit, counters and the most recent limit changes"""
+        return {
+            'limit': self.limit,
+            'in_flight': self._in_flight,
+            'waiting': len(self._waiters),
+            'baseline_seconds_per_mb': {
+                f"<={1 << bucket}MB": round(baseline, 6)
+                for bucket, baseline in sorted(self._baselines.items())
+            },
+            **self._stats,
+            'decisions': list(self._decisions)
+        }
+    
+    def _on_success(self, epoch: int, bucket: int, latency: float) -> None:
+        baseline = self._baselines.get(bucket)
+        self._baselines[bucket] = latency if baseline is None else \
+            baseline + (latency - baseline) * _BASELINE_WEIGHT
+        
+        if baseline is not None and latency > baseline * self.latency_tolerance:
+            self._stats['latency_spikes'] += 1
+            self._decrease(epoch, f"latency {latency:.3f}s/MB over baseline {baseline:.3f}s/MB")
+            return
+        
+        self._healthy_in_window += 1
+        if self._healthy_in_window >= self.limit and self._saturated and self.limit < self.max_limit:
+            self._change_limit(self.limit + 1, 'increase', 'healthy window at full concurrency')
+            self._stats['increases'] += 1
+    
+    def _decrease(self, epoch: int, reason: str) -> None:
+        if epoch != self._epoch:
+            return
+        
+        self._epoch += 1
+        new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        if new_limit < self.limit:
+            self._stats['decreases'] += 1
+            self._change_limit(new_limit, 'decrease', reason)
+        else:
+            self._healthy_in_window = 0
+            self._saturated = False
+    
+    def _change_limit(self, new_limit: int, action: str, reason: str) -> None:
+        logger.debug(f"Concurrency {action} {self.limit} -> {new_limit}: {reason}")
+        self._decisions.append({
+            'time': time.time(),
+            'action': action,
+            'from': self.limit,
+            'to': new_limit,
+            'reason': reason
+        })
+        self.limit = new_limit
+        self._stats['max_limit_reached'] = max(self._stats['max_limit_reached'], new_limit)
+        self._healthy_in_window = 0
+        self._saturated = False
+    
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+    
+    def _is_throttle(self, error: BaseException) -> bool:
+        return isinstance(error, HttpResponseError) and \
+            error.status_code in self.throttle_status_codes
+
+class _LimiterSlot:
+    """Async context manager holding one limiter slot for one request"""
+    
+    __slots__ = ('limiter', 'size_bytes', 'epoch', 'start')
+    
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter, size_bytes: int):
+        self.limiter = limiter
+        self.size_bytes = size_bytes
+        self.epoch = 0
+        self.start = 0.0
+    
+    async def __aenter__(self) -> '_LimiterSlot':
+        self.epoch = await self.limiter.acquire()
+        self.start = time.perf_counter()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.limiter.release(
+            self.epoch, time.perf_counter() - self.start, self.size_bytes, exc_value
+        )
@@ -0,0 +1,172 @@
+import os
+import re
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTITY_PATTERNS = {
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'url': r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
+    'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+}
+
+# Entity types whose matches can lie inside a match of the key type;
+# re.findall of their own pattern reports them too
+_NESTED_TYPES = {'url': ('email', 'phone'), 'email': ('phone',)}
+
+# Containers first, so a match at some offset is the one holding the others
+_SCAN_ORDER = ('url', 'email', 'phone')
+
+# Text right after a match of the key type that can let another entity run
+# past its end: a word character or an email's "|" after a URL, a URL
+# after an email ending in "http" or "https"
+_OVERRUN = {
+    'url': re.compile(r'[\w|]'),
+    'email': re.compile(r'://')
+}
+
+# Characters an entity can start with
+_FIRST_CHARS = r'[\w.%+-]'
+
+# No entity contains whitespace, so a stream can be cut after any of these
+_STREAM_BREAKS = ' \n\t\r'
+
+def _iter_matches(entity_type: str, pattern: re.Pattern, text: str,
+                  pos: int, endpos: int) -> Iterator[Tuple[int, str, str]]:
+    """``(offset, entity_type, value)`` of each match, for merging by offset"""
+    for match in pattern.finditer(text, pos, endpos):
+        yield match.start(), entity_type, match.group()
+
+class EntityExtractor:
+    """Find emails, URLs and phone numbers in one pass over the text
+    
+    The patterns are compiled once into a single alternation with a named
+    group per type. Results match ``re.findall`` of each pattern, including
+    entities inside one another, such as a phone number inside a URL: the
+    span of each URL or email match is scanned again for the types it can
+    hold.
+    """
+    
+    def __init__(self, entity_types: Optional[Iterable[str]] = None,
+                 max_stream_tail: int = 64 * 1024):
+        self.entity_types = list(ENTITY_PATTERNS if entity_types is None else entity_types)
+        self.max_stream_tail = max_stream_tail
+        self._patterns = {
+            entity_type: re.compile(ENTITY_PATTERNS[entity_type])
+            for entity_type in _SCAN_ORDER if entity_type in self.entity_types
+        }
+        # Every entity starts with one of _FIRST_CHARS; the lookahead skips
+        # other positions before the alternatives are tried
+        self._combined = re.compile(f"(?={_FIRST_CHARS})(?:" + '|'.join(
+            f"(?P<{entity_type}>{ENTITY_PATTERNS[entity_type]})"
+            for entity_type in self._patterns
+        ) + ')') if self._patterns else None
+        self._nested = {
+            entity_type: [(nested, self._patterns[nested])
+                          for nested in _NESTED_TYPES[entity_type] if nested in self._patterns]
+            for entity_type in self._patterns if entity_type in _NESTED_TYPES
+        }
+    
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Entities found in ``text`` by type; unknown types map to []"""
+        entities = {entity_type: [] for entity_type in self.entity_types}
+        
+        for entity_type, value, _ in self.iter_entities(text):
+            entities[entity_type].append(value)
+        
+        return entities
+    
+    def iter_entities(self, text: str, pos: int = 0,
+                      endpos: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+        """Yield ``(entity_type, value, offset)`` in text order"""
+        if self._combined is None:
+            return
+        endpos = len(text) if endpos is None else endpos
+        # Where re.findall of each pattern resumes
+        next_pos = dict.fromkeys(self._patterns, pos)
+        
+        for match in self._combined.finditer(text, pos, endpos):
+            entity_type = match.lastgroup
+            start, end = match.span()
+            yield entity_type, match.group(), start
+            next_pos[entity_type] = end
+            
+            overrun = _OVERRUN.get(entity_type)
+            if overrun and end < endpos and overrun.match(text, end, endpos):
+                # An entity may start inside this one and end past it; scan
+                # the rest of the text with each pattern on its own
+                scans = [
+                    _iter_matches(other, pattern, text,
+                                  end if other == entity_type else max(start, next_pos[other]), endpos)
+                    for other, pattern in self._patterns.items()
+                ]
+                for offset, other, value in heapq.merge(*scans):
+                    yield other, value, offset
+                return
+            
+            nested = self._nested.get(entity_type)
+            if not nested:
+                continue
+            found = [
+                (inner.start(), nested_type, inner.group())
+                for nested_type, pattern in nested
+                for inner in pattern.finditer(text, start, end)
+            ]
+            found.sort()
+            for offset, nested_type, value in found:
+                yield nested_type, value, offset
+                next_pos[nested_type] = offset + len(value)
+    
+    def iter_stream(self, chunks: Iterable[str]) -> Iterator[Tuple[str, str, int]]:
+        """Yield ``(entity_type, value, offset)`` from text split in chunks
+        
+        Offsets are relative to the start of the stream. Text after the last
+        whitespace of the buffer is held back until the next chunk, so
+        entities cut by a chunk boundary are still found whole. Text with no
+        whitespace for ``max_stream_tail`` characters is scanned as is.
+        """
+        buffer = ''
+        # Stream offset of buffer[0]
+        offset = 0
+        
+        for chunk in chunks:
+            buffer += chunk
+            cut = max(buffer.rfind(char) for char in _STREAM_BREAKS)
+            if cut == -1:
+                if len(buffer) < self.max_stream_tail:
+                    continue
+                # Keep the last character for word boundaries
+                cut = len(buffer) - 1
+            
+            # The break character is scanned too so word boundaries match
+            for entity_type, value, start in self.iter_entities(buffer, 0, cut + 1):
+                yield entity_type, value, offset + start
+            
+            buffer = buffer[cut:]
+            offset += cut
+        
+        for entity_type, value, start in self.iter_entities(buffer):
+            yield entity_type, value, offset + start
+    
+    def extract_many(self, texts: Iterable[str], max_workers: Optional[int] = None,
+                     process_pool_threshold_mb: float = 16) -> List[Dict[str, List[str]]]:
+        """Extract entities from many texts, in input order
+        
+        Batches of at least ``process_pool_threshold_mb`` characters are
+        spread across a process pool; smaller ones are scanned inline, where
+        pickling the texts would cost more than the scan.
+        """
+        texts = list(texts)
+        max_workers = max_workers or os.cpu_count() or 1
+        total_size = sum(len(text) for text in texts)
+        
+        if (max_workers == 1 or len(texts) <= 1
+                or total_size < process_pool_threshold_mb * 1024 * 1024):
+            return [self.extract(text) for text in texts]
+        
+        batch_size = max(1, len(texts) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.extract, texts, chunksize=batch_size))
@@ -0,0 +1,91 @@
+import os
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fastest hashlib algorithm on 64-bit CPUs. md5 stays the default for
+# compatibility with file_hash values already stored as blob metadata; set
+# document_processing.hash_algorithm to this for new containers
+FAST_ALGORITHM = 'blake2b'
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Files at least this large are hashed from a memory map
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+def hash_file(file_path: str, algorithm: str = 'md5',
+              chunk_size: int = DEFAULT_CHUNK_SIZE,
+              use_mmap: Optional[bool] = None) -> str:
+    """Hash a file with large reads into a reused buffer
+    
+    ``use_mmap`` defaults to mapping files of at least ``MMAP_THRESHOLD``
+    bytes. Errors are raised; see ``calculate_file_hash`` for the lenient
+    variant.
+    """
+    hash_algo = hashlib.new(algorithm)
+    
+    with open(file_path, 'rb', buffering=0) as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = file_size >= MMAP_THRESHOLD
+        
+        if use_mmap and file_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    # memoryview slices hash the map in place, without
+                    # copying; hashlib drops the GIL during each update
+                    for offset in range(0, file_size, chunk_size):
+                        hash_algo.update(view[offset:offset + chunk_size])
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                hash_algo.update(view[:count])
+    
+    return hash_algo.hexdigest()
+
+def _hash_file_or_empty(file_path: str, algorithm: str, chunk_size: int) -> str:
+    """Process pool worker; returns "" for unreadable files"""
+    try:
+        return hash_file(file_path, algorithm, chunk_size)
+    except OSError as e:
+        logger.error(f"Error calculating hash for {file_path}: {e}")
+        return ""
+
+def hash_files(file_paths: Iterable[str], algorithm: str = 'md5',
+               max_workers: Optional[int] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, str]:
+    """Hash many files across a process pool
+    
+    Returns a dict of path to hex digest, with "" for files that could not be
+    read. Paths are sent to workers in batches so small files do not pay a
+    round trip each.
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        return {}
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(file_paths) == 1:
+        return {
+            file_path: _hash_file_or_empty(file_path, algorithm, chunk_size)
+            for file_path in file_paths
+        }
+    
+    batch_size = max(1, len(file_paths) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        digests = executor.map(
+            _hash_file_or_empty, file_paths,
+            [algorithm] * len(file_paths), [chunk_size] * len(file_paths),
+            chunksize=batch_size
+        )
+        return dict(zip(file_paths, digests))
@@ -1,17 +1,29 @@
 import os
 import mimetypes
 import hashlib
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import json
 import logging
+from functools import lru_cache
+from .hashing import hash_file
+from .text_normalizer import normalize_text
+from .entity_extractor import EntityExtractor
 
 logger = logging.getLogger(__name__)
 
-def get_file_metadata(file_path: str) -> Dict[str, Any]:
-    """Extract metadata from a file"""
+def get_file_metadata(file_path: str, include_hash: bool = True,
+                      stat: Optional[os.stat_result] = None,
+                      hash_algorithm: str = 'md5') -> Dict[str, Any]:
+    """Extract metadata from a file
+    
+    Pass ``include_hash=False`` when the hash is computed elsewhere (e.g. while
+    streaming the file) to avoid an extra read of the whole file, and a
+    ``stat`` the caller already has to avoid statting it again.
+    """
     try:
-        stat = os.stat(file_path)
+        if stat is None:
+            stat = os.stat(file_path)
         mime_type, _ = mimetypes.guess_type(file_path)
         
         metadata = {
@@ -20,10 +32,12 @@ def get_file_metadata(file_path: str) -> Dict[str, Any]:
             'file_type': get_file_extension(file_path),
             'mime_type': mime_type or 'application/octet-stream',
             'created_date': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-            'modified_date': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            'file_hash': calculate_file_hash(file_path)
+            'modified_date': datetime.fromtimestamp(stat.st_mtime).isoformat()
         }
         
+        if include_hash:
+            metadata['file_hash'] = calculate_file_hash(file_path, hash_algorithm)
+        
         return metadata
         
     except Exception as e:
@@ -49,18 +63,44 @@ def validate_file_format(file_path: str,
 def calculate_file_hash(file_path: str, algorithm: str = 'md5') -> str:
     """Calculate file hash for deduplication"""
     try:
-        hash_algo = hashlib.new(algorithm)
-        
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_algo.update(chunk)
-        
-        return hash_algo.hexdigest()
+        return hash_file(file_path, algorithm)
         
     except Exception as e:
         logger.error(f"Error calculating hash for {file_path}: {e}")
         return ""
 
+class HashingReader:
+    """Read-only file wrapper that hashes bytes as they are read
+    
+    Lets a consumer such as ``upload_blob`` stream a file while its hash is
+    computed in the same pass. The wrapper is not seekable so every byte is
+    read exactly once and in order.
+    """
+    
+    def __init__(self, file_obj, algorithm: str = 'md5'):
+        self.file_obj = file_obj
+        self.hash_algo = hashlib.new(algorithm)
+        self.bytes_read = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.file_obj.read(size)
+        if data:
+            self.hash_algo.update(data)
+            self.bytes_read += len(data)
+        return data
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return False
+    
+    def tell(self) -> int:
+        return self.bytes_read
+    
+    def hexdigest(self) -> str:
+        return self.hash_algo.hexdigest()
+
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
     # Remove or replace invalid characters
@@ -135,20 +175,18 @@ def parse_date_string(date_str: str) -> Optional[datetime]:
     return None
 
 def clean_text(text: str) -> str:
-    """Clean and normalize text content"""
-    if not text:
-        return ""
-    
-    # Remove extra whitespace
-    text = ' '.join(text.split())
+    """Clean and normalize text content
     
-    # Remove control characters
-    text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
-    
-    return text.strip()
+    See ``text_normalizer.normalize_texts`` for batches of documents.
+    """
+    return normalize_text(text)
 
 def chunk_text(text: str, chunk_size: int = 4000, overlap: int = 200) -> List[str]:
-    """Split text into overlapping chunks"""
+    """Split text into overlapping chunks
+    
+    See ``text_chunker.TextChunker`` for offset-based, streaming and
+    sentence-aware chunking.
+    """
     if len(text) <= chunk_size:
         return [text]
     
@@ -168,10 +206,10 @@ def chunk_text(text: str, chunk_size: int = 4000, overlap: int = 200) -> List[st
             break_point = end
         
         chunks.append(text[start:break_point])
-        start = break_point - overlap
         
-        if start < 0:
-            start = 0
+        # Step back for the overlap, but always move forward
+        next_start = break_point - overlap
+        start = next_start if next_start > start else break_point
     
     return chunks
 
@@ -211,6 +249,21 @@ def create_directory_if_not_exists(directory: str) -> bool:
         logger.error(f"Error creating directory {directory}: {e}")
         return False
 
+def load_settings(settings_path: Optional[str] = None) -> Dict[str, Any]:
+    """Load application settings from config/settings.json"""
+    if settings_path is None:
+        settings_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            '..', '..', 'config', 'settings.json'
+        )
+    
+    try:
+        with open(settings_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not load settings from {settings_path}: {e}")
+        return {}
+
 def get_environment_variable(var_name: str, default: Any = None, 
                            required: bool = False) -> Any:
     """Get environment variable with validation"""
@@ -246,22 +299,13 @@ def validate_azure_connection_string(connection_string: str) -> bool:
     return all(part in connection_string for part in required_parts)
 
 def extract_entities_from_text(text: str, entity_types: List[str]) -> Dict[str, List[str]]:
-    """Simple entity extraction (placeholder for more sophisticated NLP)"""
-    # This is a simple implementation - in production, use Azure Cognitive Services
-    import re
-    
-    entities = {entity_type: [] for entity_type in entity_types}
-    
-    if 'email' in entity_types:
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        entities['email'] = re.findall(email_pattern, text)
-    
-    if 'url' in entity_types:
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        entities['url'] = re.findall(url_pattern, text)
+    """Simple entity extraction (placeholder for more sophisticated NLP)
     
-    if 'phone' in entity_types:
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        entities['phone'] = re.findall(phone_pattern, text)
-    
-    return entities
\ No newline at end of file
+    See ``entity_extractor.EntityExtractor`` for batches and streamed text.
+    """
+    # This is a simple implementation - in production, use Azure Cognitive Services
+    return _get_entity_extractor(tuple(entity_types)).extract(text)
+
+@lru_cache(maxsize=32)
+def _get_entity_extractor(entity_types: Tuple[str, ...]) -> EntityExtractor:
+    return EntityExtractor(entity_types)
\ No newline at end of file
@@ -0,0 +1,248 @@
+import re
+import json
+from typing import Any, Iterator, Optional, TextIO
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# One JSON token: punctuation, string, number or literal. NaN and the
+# infinities are literals too, since json.load accepts them
+_TOKEN = re.compile(r'''
+    (?P<punct>[{}\[\]:,])
+  | (?P<string>"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*")
+  | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+  | (?P<literal>true|false|null|NaN|Infinity|-Infinity)
+''', re.VERBOSE)
+
+# Text that may still grow into a valid string or number with more input
+_STRING_PREFIX = re.compile(
+    r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{0,4})?[^"\\\x00-\x1f]*)*'
+)
+_NUMBER_TAIL = re.compile(r'[-+0-9.eE]*')
+_LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity')
+
+# Error for a token that cannot follow the parser state
+_EXPECTED_MESSAGES = {
+    'value': "Expecting value",
+    'value_or_close': "Expecting value",
+    'key': "Expecting property name enclosed in double quotes",
+    'key_or_close': "Expecting property name enclosed in double quotes",
+    'colon': "Expecting ':' delimiter",
+    'comma_or_close': "Expecting ',' delimiter",
+    'done': "Extra data"
+}
+
+class JsonStreamError(json.JSONDecodeError):
+    """Decode error located by absolute character offset in the stream"""
+    
+    def __init__(self, msg: str, pos: int):
+        ValueError.__init__(self, f"{msg}: char {pos}")
+        self.msg = msg
+        self.doc = ''
+        self.pos = pos
+        self.lineno = None
+        self.colno = None
+    
+    def __reduce__(self):
+        return self.__class__, (self.msg, self.pos)
+
+class _JsonBuffer:
+    """Sliding text window over a file for incremental JSON decoding"""
+    
+    def __init__(self, file_obj: TextIO, chunk_size: int):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        # Characters dropped from the front of the buffer so far
+        self.offset = 0
+        self.eof = False
+    
+    def read_more(self, size: Optional[int] = None) -> None:
+        """Drop consumed text and append the next chunk of the file"""
+        chunk = self.file_obj.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return
+        
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+    
+    def peek_char(self) -> Optional[str]:
+        """Skip whitespace and return the next character, or None at EOF"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return None
+            self.read_more()
+    
+    def advance(self, count: int = 1) -> None:
+        self.pos += count
+    
+    def decode_value(self) -> Any:
+        """Decode the next complete JSON value, reading more text as needed"""
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number or literal ending at the buffer edge may continue,
+                # as may a number cut inside its fraction or exponent ("-12.")
+                if self.eof or (
+                    end < len(self.buffer) and not (
+                        isinstance(value, (int, float)) and not isinstance(value, bool)
+                        and _NUMBER_TAIL.match(self.buffer, end).end() == len(self.buffer)
+                    )
+                ):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise self.error(e.msg, e.pos)
+            
+            # Grow geometrically so a large value is not re-parsed many times
+            self.read_more(max(self.chunk_size, len(self.buffer) - self.pos))
+    
+    def error(self, message: str, pos: Optional[int] = None) -> JsonStreamError:
+        """Build a decode error reporting the absolute character offset"""
+        pos = self.pos if pos is None else pos
+        return JsonStreamError(message, self.offset + pos)
+
+def iter_json_documents(file_obj: TextIO, chunk_size: int = 64 * 1024,
+                        allow_multiple: bool = True) -> Iterator[Any]:
+    """Incrementally decode a JSON file
+    
+    A top-level array yields its items one at a time. Otherwise each top-level
+    value is yielded, which also covers JSON Lines files unless
+    ``allow_multiple`` is False. Memory is bounded by the largest item rather
+    than by the file.
+    """
+    reader = _JsonBuffer(file_obj, chunk_size)
+    first = reader.peek_char()
+    if first is None:
+        raise reader.error("Expecting value")
+    
+    if first == '[':
+        reader.advance()
+        if reader.peek_char() == ']':
+            reader.advance()
+        else:
+            while True:
+                reader.peek_char()
+                yield reader.decode_value()
+                
+                delimiter = reader.peek_char()
+                if delimiter == ',':
+                    reader.advance()
+                elif delimiter == ']':
+                    reader.advance()
+                    break
+                else:
+                    raise reader.error("Expecting ',' delimiter")
+    else:
+        yield reader.decode_value()
+        while allow_multiple and reader.peek_char() is not None:
+            yield reader.decode_value()
+    
+    if reader.peek_char() is not None:
+        raise reader.error("Extra data")
+
+def _token_may_continue(buffer: str, pos: int, match: Optional[re.Match]) -> bool:
+    """Whether the token at ``pos`` may be cut off by the end of the window"""
+    if match is not None:
+        if match.lastgroup != 'number':
+            return False
+        return _NUMBER_TAIL.match(buffer, match.end()).end() == len(buffer)
+    
+    char = buffer[pos]
+    if char == '"':
+        return _STRING_PREFIX.match(buffer, pos).end() == len(buffer)
+    rest = buffer[pos:]
+    if char == '-' and '-Infinity'.startswith(rest):
+        return True
+    if char == '-' or char.isdigit():
+        return _NUMBER_TAIL.match(buffer, pos).end() == len(buffer)
+    return any(literal.startswith(rest) for literal in _LITERALS)
+
+def validate_json_stream(file_obj: TextIO, chunk_size: int = 64 * 1024,
+                         allow_multiple: bool = False) -> None:
+    """Check JSON syntax without building any Python objects
+    
+    Tokens are matched against a sliding window and checked by a small state
+    machine, so memory is bounded by the longest single token. Raises
+    ``JsonStreamError`` at the first syntax error.
+    """
+    reader = _JsonBuffer(file_obj, chunk_size)
+    # Open containers, '[' or '{'
+    stack = []
+    # 'value', 'value_or_close', 'key', 'key_or_close', 'colon',
+    # 'comma_or_close' or 'done'
+    expect = 'value'
+    
+    while True:
+        char = reader.peek_char()
+        if char is None:
+            if expect != 'done':
+                raise reader.error("Expecting value" if not stack else "Unterminated container")
+            return
+        
+        if expect == 'done':
+            if not allow_multiple:
+                raise reader.error("Extra data")
+            expect = 'value'
+        
+        if (char == '{' or char == '[') and expect in ('value', 'value_or_close'):
+            # Containers that fit in the window are checked by the C decoder;
+            # larger ones are descended into token by token
+            try:
+                end = reader.decoder.raw_decode(reader.buffer, reader.pos)[1]
+            except json.JSONDecodeError:
+                end = None
+            if end is not None:
+                reader.advance(end - reader.pos)
+                expect = 'comma_or_close' if stack else 'done'
+                continue
+        
+        match = _TOKEN.match(reader.buffer, reader.pos)
+        while not reader.eof and _token_may_continue(reader.buffer, reader.pos, match):
+            reader.read_more(max(reader.chunk_size, len(reader.buffer) - reader.pos))
+            match = _TOKEN.match(reader.buffer, reader.pos)
+        if match is None:
+            raise reader.error("Invalid token")
+        
+        token = match.group('punct')
+        if token is None:
+            if expect == 'key' or expect == 'key_or_close':
+                if match.group('string') is None:
+                    raise reader.error("Expecting property name enclosed in double quotes")
+                expect = 'colon'
+            elif expect == 'value' or expect == 'value_or_close':
+                expect = 'comma_or_close' if stack else 'done'
+            else:
+                raise reader.error(_EXPECTED_MESSAGES[expect])
+        elif token == '{' or token == '[':
+            if expect != 'value' and expect != 'value_or_close':
+                raise reader.error(_EXPECTED_MESSAGES[expect])
+            stack.append(token)
+            expect = 'key_or_close' if token == '{' else 'value_or_close'
+        elif token == '}' or token == ']':
+            if expect == 'comma_or_close':
+                closes = stack[-1] == ('{' if token == '}' else '[')
+            else:
+                closes = (expect, token) in (('key_or_close', '}'), ('value_or_close', ']'))
+            if not closes:
+                raise reader.error(_EXPECTED_MESSAGES[expect])
+            stack.pop()
+            expect = 'comma_or_close' if stack else 'done'
+        elif token == ':':
+            if expect != 'colon':
+                raise reader.error(_EXPECTED_MESSAGES[expect])
+            expect = 'value'
+        else:
+            if expect != 'comma_or_close':
+                raise reader.error(_EXPECTED_MESSAGES[expect])
+            expect = 'key' if stack[-1] == '{' else 'value'
+        
+        reader.advance(match.end() - reader.pos)
+
@@ -0,0 +1,167 @@
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Callable, Iterable
+from azure.core.exceptions import (
+    HttpResponseError, ServiceRequestError, ServiceResponseError
+)
+from .helpers import load_settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Throttling and transient server errors worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Options for SDK clients whose calls go through a RetryPolicy: the SDK's
+# own retries would multiply the attempts and hide them from the stats
+SDK_CLIENT_OPTIONS = {'retry_total': 0}
+
+class RetryPolicy:
+    """Retry sync and async Azure calls with exponential backoff and jitter
+    
+    Honors ``Retry-After`` headers sent with throttling responses and keeps
+    per-operation counters of calls, retries and give-ups. SDK clients whose
+    calls it wraps should be built with ``SDK_CLIENT_OPTIONS``.
+    """
+    
+    def __init__(self, max_retries: int = 3, retry_delay: float = 2.0,
+                 max_delay: float = 60.0, jitter: float = 0.5,
+                 retryable_status_codes: Optional[Iterable[int]] = None):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        # Fraction of each delay that is randomized
+        self.jitter = jitter
+        self.retryable_status_codes = set(retryable_status_codes or RETRYABLE_STATUS_CODES)
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None) -> 'RetryPolicy':
+        """Create a policy from indexing_settings.max_retries/retry_delay"""
+        if settings is None:
+            settings = load_settings()
+        indexing_settings = settings.get('indexing_settings', {})
+        
+        return cls(
+            max_retries=int(indexing_settings.get('max_retries', 3)),
+            retry_delay=float(indexing_settings.get('retry_delay', 2))
+        )
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """Check whether an error is transient"""
+        if isinstance(error, HttpResponseError):
+            return error.status_code in self.retryable_status_codes
+        return isinstance(error, (ServiceRequestError, ServiceResponseError,
+                                  ConnectionError, TimeoutError, asyncio.TimeoutError))
+    
+    def get_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Delay before the next attempt, preferring the server's Retry-After"""
+        retry_after = self._get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        
+        delay = min(self.retry_delay * (2 ** attempt), self.max_delay)
+        return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+    
+    def call(self, operation: str, func: Callable, *args, **kwargs) -> Any:
+        """Call ``func`` and retry transient failures"""
+        attempt = 0
+        while True:
+            try:
+                result = func(*args, **kwargs)
+                self._count(operation, 'successes')
+                return result
+            except Exception as e:
+                if not self._should_retry(operation, attempt, e):
+                    raise
+                delay = self.get_delay(attempt, e)
+                logger.warning(
+                    f"Retrying {operation} in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries}): {e}"
+                )
+                time.sleep(delay)
+                attempt += 1
+    
+    async def call_async(self, operation: str, func: Callable, *args, **kwargs) -> Any:
+        """Await ``func(*args, **kwargs)`` and retry transient failures"""
+        attempt = 0
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+                self._count(operation, 'successes')
+                return result
+            except Exception as e:
+                if not self._should_retry(operation, attempt, e):
+                    raise
+                delay = self.get_delay(attempt, e)
+                logger.warning(
+                    f"Retrying {operation} in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries}): {e}"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-operation counters of successes, retries and give-ups"""
+        with self._lock:
+            return {operation: dict(counters) for operation, counters in self._stats.items()}
+    
+    def reset_stats(self) -> None:
+        """Clear all counters"""
+        with self._lock:
+            self._stats = {}
+    
+    def _should_retry(self, operation: str, attempt: int, error: Exception) -> bool:
+        """Count the failure and decide whether another attempt is allowed"""
+        if not self.is_retryable(error):
+            self._count(operation, 'failures')
+            return False
+        if attempt >= self.max_retries:
+            self._count(operation, 'give_ups')
+            logger.error(f"Giving up on {operation} after {attempt + 1} attempts: {error}")
+            return False
+        self._count(operation, 'retries')
+        return True
+    
+    def _count(self, operation: str, counter: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(operation, {
+                'successes': 0, 'retries': 0, 'give_ups': 0, 'failures': 0
+            })
+            counters[counter] += 1
+    
+    @staticmethod
+    def _get_retry_after(error: Optional[Exception]) -> Optional[float]:
+        """Parse Retry-After (seconds or HTTP date) from an error response"""
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if not headers:
+            return None
+        
+        for header in ('retry-after-ms', 'x-ms-retry-after-ms'):
+            value = headers.get(header)
+            if value:
+                try:
+                    return float(value) / 1000
+                except ValueError:
+                    pass
+        
+        value = headers.get('Retry-After')
+        if not value:
+            return None
+        
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
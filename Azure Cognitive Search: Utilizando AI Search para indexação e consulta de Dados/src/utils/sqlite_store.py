@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import threading
+from typing import Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SQLiteStore:
+    """Base of the thread-safe SQLite stores (manifest, indexes and caches)
+    
+    Opens ``db_path``, creating its directory, and runs the ``SCHEMA``
+    statements of the subclass. Use ``":memory:"`` for a store that lives
+    only as long as the process. Writes are committed in batches of
+    ``commit_interval``; ``flush`` and ``close`` commit the rest.
+    Subclasses hold ``_lock`` around every use of ``_connection``.
+    """
+    
+    # CREATE statements run when the store is opened
+    SCHEMA: Sequence[str] = ()
+    
+    def __init__(self, db_path: str, commit_interval: int = 100):
+        if db_path != ':memory:':
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+        
+        self.db_path = db_path
+        self.commit_interval = commit_interval
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        for statement in self.SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+    
+    def flush(self) -> None:
+        """Commit pending writes"""
+        with self._lock:
+            self._before_commit()
+            self._commit()
+    
+    def close(self) -> None:
+        """Commit pending writes and close the database"""
+        with self._lock:
+            self._before_commit()
+            self._commit()
+            self._connection.close()
+    
+    def __enter__(self) -> 'SQLiteStore':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _write(self, statement: str, params: tuple) -> None:
+        """Execute a write and commit every ``commit_interval`` writes"""
+        with self._lock:
+            self._connection.execute(statement, params)
+            self._count_writes()
+    
+    def _count_writes(self, count: int = 1) -> None:
+        """Commit once ``commit_interval`` writes are pending; the caller holds the lock"""
+        self._pending_writes += count
+        if self._pending_writes >= self.commit_interval:
+            self._commit()
+    
+    def _commit(self) -> None:
+        """Commit; the caller holds the lock"""
+        self._connection.commit()
+        self._pending_writes = 0
+    
+    def _before_commit(self) -> None:
+        """Write state buffered in memory before ``flush`` and ``close``
+        commit; the caller holds the lock"""
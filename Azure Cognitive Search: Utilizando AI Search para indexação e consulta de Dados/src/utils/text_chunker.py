@@ -0,0 +1,181 @@
+import re
+from typing import Iterator, List, Optional, Tuple, TextIO
+import logging
+
+logger = logging.getLogger(__name__)
+
+BOUNDARIES = ('sentence', 'word', 'none')
+UNITS = ('chars', 'tokens')
+
+# Words and individual punctuation marks; a close, dependency-free
+# approximation of model tokenizers
+DEFAULT_TOKEN_PATTERN = r'\w+|[^\w\s]'
+
+_SPACES = re.compile(r'\s+')
+_LEADING_SPACES = re.compile(r'\s*')
+# Sentence-ending punctuation plus closing quotes or brackets, before a space
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*(?=\s)')
+_SENTENCE_PUNCTUATION = '.!?'
+
+class TextChunker:
+    """Split text into overlapping chunks by character offsets
+    
+    Chunks are produced as ``(start, end)`` offsets into the source text, so
+    nothing is copied until a caller slices the chunks it needs. Cuts prefer
+    the last sentence end, then the last word boundary, in the second half of
+    each window; overlaps start at a word boundary. With ``unit='tokens'``,
+    ``chunk_size`` and ``overlap`` count tokens matched by ``token_pattern``.
+    """
+    
+    def __init__(self, chunk_size: int = 4000, overlap: int = 200,
+                 boundary: str = 'sentence', unit: str = 'chars',
+                 token_pattern: str = DEFAULT_TOKEN_PATTERN):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be at least 0 and smaller than chunk_size")
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"Unsupported boundary: {boundary}")
+        if unit not in UNITS:
+            raise ValueError(f"Unsupported unit: {unit}")
+        
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.boundary = boundary
+        self.unit = unit
+        self.token_pattern = re.compile(token_pattern)
+    
+    def iter_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield the ``(start, end)`` offsets of each chunk of ``text``"""
+        start = 0
+        while True:
+            span = self._next_span(text, start, final=True)
+            if span is None:
+                return
+            chunk_start, chunk_end, start = span
+            yield chunk_start, chunk_end
+    
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """Yield each chunk of ``text`` as a string"""
+        for start, end in self.iter_spans(text):
+            yield text[start:end]
+    
+    def chunk(self, text: str) -> List[str]:
+        """Split ``text`` into a list of chunks"""
+        return list(self.iter_chunks(text))
+    
+    def iter_stream(self, stream: TextIO,
+                    read_size: int = 1024 * 1024) -> Iterator[Tuple[int, int, str]]:
+        """Chunk a text stream in bounded memory
+        
+        Yields ``(start, end, text)`` with offsets relative to the start of
+        the stream. Only the unconsumed tail of the stream plus one read is
+        held in memory; the chunks are the same as for the whole text.
+        """
+        buffer = ''
+        # Stream offset of buffer[0]
+        offset = 0
+        start = 0
+        final = False
+        
+        while True:
+            span = self._next_span(buffer, start, final)
+            if span is None:
+                if final:
+                    return
+                block = stream.read(read_size)
+                if not block:
+                    final = True
+                buffer = buffer[start:] + block
+                offset += start
+                start = 0
+                continue
+            
+            chunk_start, chunk_end, start = span
+            yield offset + chunk_start, offset + chunk_end, buffer[chunk_start:chunk_end]
+    
+    def _next_span(self, text: str, start: int,
+                   final: bool) -> Optional[Tuple[int, int, int]]:
+        """Get ``(chunk_start, chunk_end, next_start)`` of the chunk at ``start``
+        
+        Returns None when no chunk is left or, unless ``final``, when the
+        chunk could still change with more text after the end of ``text``.
+        """
+        if self.unit == 'tokens':
+            return self._next_token_span(text, start, final)
+        
+        start = _LEADING_SPACES.match(text, start).end()
+        text_length = len(text)
+        if start >= text_length:
+            return None
+        
+        limit = start + self.chunk_size
+        if limit >= text_length:
+            return (start, text_length, text_length) if final else None
+        
+        end = self._find_break(text, start, limit)
+        return start, end, self._overlap_start(text, start, end)
+    
+    def _find_break(self, text: str, start: int, limit: int) -> int:
+        """Offset to cut the window ``[start, limit)`` at"""
+        if self.boundary == 'none':
+            return limit
+        
+        # Boundaries in the first half would make chunks too small
+        lowest = start + self.chunk_size // 2
+        if self.boundary == 'sentence':
+            # Scan back from the limit so only the tail of the window is read
+            high = limit
+            while True:
+                mark = max(text.rfind(char, lowest, high) for char in _SENTENCE_PUNCTUATION)
+                if mark < 0:
+                    break
+                match = _SENTENCE_END.match(text, mark, limit + 1)
+                if match:
+                    return match.end()
+                high = mark
+        
+        # A space at ``limit`` itself means the window ends on a word boundary
+        space = max(text.rfind(' ', lowest, limit + 1),
+                    text.rfind('\n', lowest, limit + 1),
+                    text.rfind('\t', lowest, limit + 1))
+        return space if space > start else limit
+    
+    def _overlap_start(self, text: str, start: int, end: int) -> int:
+        """Start of the next chunk: ``overlap`` back from ``end``, at a word"""
+        if self.overlap == 0:
+            return end
+        
+        next_start = max(end - self.overlap, start)
+        if self.boundary != 'none':
+            space = _SPACES.search(text, next_start, end)
+            next_start = space.end() if space else next_start
+        
+        # Always move forward, even when the overlap holds no whole word
+        return next_start if start < next_start < end else end
+    
+    def _next_token_span(self, text: str, start: int,
+                         final: bool) -> Optional[Tuple[int, int, int]]:
+        """Token-counting counterpart of ``_next_span``"""
+        tokens = []
+        for match in self.token_pattern.finditer(text, start):
+            tokens.append(match.span())
+            if len(tokens) > self.chunk_size:
+                break
+        
+        if len(tokens) <= self.chunk_size:
+            # The remaining tokens form the last chunk
+            if not tokens or not final:
+                return None
+            return tokens[0][0], tokens[-1][1], len(text)
+        
+        count = self.chunk_size
+        if self.boundary == 'sentence':
+            for index in range(self.chunk_size - 1, self.chunk_size // 2 - 1, -1):
+                token_start, token_end = tokens[index]
+                if text[token_end - 1] in _SENTENCE_PUNCTUATION:
+                    count = index + 1
+                    break
+        
+        kept = min(self.overlap, count - 1)
+        return tokens[0][0], tokens[count - 1][1], tokens[count - kept][0]
@@ -0,0 +1,53 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Characters below 32 that clean_text drops; tab and newline are kept
+_CONTROL_CHARS = [chr(code) for code in range(32) if chr(code) not in '\n\t']
+_CONTROL_TABLE = str.maketrans('', '', ''.join(_CONTROL_CHARS))
+_CONTROL_RUNS = re.compile('[%s]+' % re.escape(''.join(_CONTROL_CHARS)))
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and drop control characters
+    
+    Same output as the original ``clean_text``: whitespace runs (as split by
+    ``str.split``) become single spaces first, then control characters are
+    removed, so a control character between two spaces leaves both spaces.
+    """
+    if not text:
+        return ""
+    
+    text = ' '.join(text.split())
+    
+    # One memchr-style scan per character beats a regex search on clean text
+    if not any(map(text.__contains__, _CONTROL_CHARS)):
+        return text
+    
+    # translate is fastest on ASCII; the regex wins on wider strings
+    if text.isascii():
+        text = text.translate(_CONTROL_TABLE)
+    else:
+        text = _CONTROL_RUNS.sub('', text)
+    
+    return text.strip()
+
+def normalize_texts(texts: Iterable[str], max_workers: Optional[int] = 1,
+                    batch_size: Optional[int] = None) -> List[str]:
+    """Normalize many texts, optionally across a process pool
+    
+    ``max_workers=1`` normalizes in this process; ``None`` uses one worker per
+    CPU. Shipping text to workers costs about as much as normalizing it, so a
+    pool only pays off for large batches on many cores.
+    """
+    texts = list(texts)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(texts) <= 1:
+        return [normalize_text(text) for text in texts]
+    
+    batch_size = batch_size or max(1, len(texts) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(normalize_text, texts, chunksize=batch_size))
@@ -0,0 +1,60 @@
+import os
+import json
+from typing import Dict, List, Optional
+from .sqlite_store import SQLiteStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ValidationCache(SQLiteStore):
+    """Content validation results keyed by (path, size, mtime)
+    
+    A file whose size and modification time are unchanged since it was last
+    validated reuses the stored errors instead of being read again. Use
+    ``":memory:"`` for a cache that lives only as long as the process.
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS validations (
+            file_path TEXT PRIMARY KEY,
+            file_size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            errors TEXT NOT NULL
+        )
+        """,
+    )
+    
+    def __init__(self, db_path: str = ':memory:', commit_interval: int = 100):
+        super().__init__(db_path, commit_interval)
+        self._stats = {'hits': 0, 'misses': 0}
+    
+    def get(self, file_path: str, file_size: int, mtime_ns: int) -> Optional[List[str]]:
+        """Get the stored content errors if the file is unchanged"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT file_size, mtime_ns, errors FROM validations WHERE file_path = ?",
+                (os.path.abspath(file_path),)
+            ).fetchone()
+            
+            if row is None or row[0] != file_size or row[1] != mtime_ns:
+                self._stats['misses'] += 1
+                return None
+            
+            self._stats['hits'] += 1
+        
+        return json.loads(row[2])
+    
+    def put(self, file_path: str, file_size: int, mtime_ns: int,
+            errors: List[str]) -> None:
+        """Store the content errors found for a file"""
+        self._write(
+            "INSERT OR REPLACE INTO validations "
+            "(file_path, file_size, mtime_ns, errors) VALUES (?, ?, ?, ?)",
+            (os.path.abspath(file_path), file_size, mtime_ns, json.dumps(errors))
+        )
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Hit and miss counters"""
+        with self._lock:
+            return dict(self._stats)
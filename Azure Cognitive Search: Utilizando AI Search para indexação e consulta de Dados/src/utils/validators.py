@@ -1,38 +1,182 @@
 import os
+import csv
+import time
 import mimetypes
-from typing import Dict, Any, List, Optional, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union, Iterable, Tuple
 import json
 import logging
+from .json_stream import validate_json_stream
+from .validation_cache import ValidationCache
 
 logger = logging.getLogger(__name__)
 
+# Formats whose content is parsed during validation
+CONTENT_CHECKED_FORMATS = ('json', 'csv')
+
+# A path, an os.DirEntry from scandir, or a (path, os.stat_result) pair
+ValidationEntry = Union[str, os.PathLike, os.DirEntry, Tuple[str, os.stat_result]]
+
+@lru_cache(maxsize=256)
+def _guess_mime_type(extension: str) -> Optional[str]:
+    """MIME type of a file extension, looked up once per extension"""
+    mime_type, _ = mimetypes.guess_type(f"file{extension}")
+    return mime_type
+
 class DocumentValidator:
     """Validate documents before processing"""
     
     def __init__(self, max_file_size_mb: int = 16, 
-                 supported_formats: Optional[List[str]] = None):
+                 supported_formats: Optional[List[str]] = None,
+                 cache: Optional[ValidationCache] = None):
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
         self.supported_formats = supported_formats or [
             'pdf', 'docx', 'doc', 'txt', 'json', 'csv', 'xlsx', 'pptx'
         ]
+        # Content check results of unchanged files are reused from the cache
+        self.cache = cache
     
-    def validate_document(self, file_path: str) -> Dict[str, Any]:
-        """Comprehensive document validation"""
-        errors = []
-        warnings = []
+    def validate_document(self, file_path: str, check_content: bool = True,
+                          stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Comprehensive document validation
         
-        # Check if file exists
-        if not os.path.exists(file_path):
-            errors.append(f"File does not exist: {file_path}")
-            return {
-                'is_valid': False,
-                'errors': errors,
-                'warnings': warnings,
-                'file_path': file_path
+        With ``check_content=False`` only stat-based checks run and the file is
+        not opened, for callers that read the content once themselves. A
+        ``stat`` already obtained by the caller (e.g. from ``os.scandir``) is
+        reused instead of statting the file again.
+        """
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return self._missing_file_result(file_path)
+        
+        result, needs_content_check = self._validate_stat(file_path, stat)
+        
+        # Content validation based on file type
+        if check_content and needs_content_check:
+            self._add_errors(
+                result, self._validate_content(file_path, result['file_format'], stat)
+            )
+        
+        return result
+    
+    def validate_many(self, entries: Iterable[ValidationEntry],
+                      max_workers: Optional[int] = None, check_content: bool = True,
+                      use_processes: bool = False) -> Dict[str, Any]:
+        """Validate many files, checking content in a worker pool
+        
+        ``entries`` may be paths, ``os.DirEntry`` objects or
+        ``(path, os.stat_result)`` pairs; stats already known are not fetched
+        again. Stat checks run inline, and JSON/CSV content checks not served
+        by the cache run in a thread pool, or a process pool with
+        ``use_processes=True`` for CPU-bound checks of many large files.
+        
+        Returns ``{'results': [...], 'timing': {...}}`` with one result per
+        entry in input order, as ``validate_document`` would return it.
+        """
+        start = time.perf_counter()
+        results = []
+        # (result index, file path, file format, stat) of pending content checks
+        content_checks = []
+        
+        for entry in entries:
+            file_path, stat = self._resolve_entry(entry)
+            if stat is None:
+                results.append(self._missing_file_result(file_path))
+                continue
+            
+            result, needs_content_check = self._validate_stat(file_path, stat)
+            results.append(result)
+            if not (check_content and needs_content_check):
+                continue
+            
+            cached = None
+            if self.cache is not None:
+                cached = self.cache.get(file_path, stat.st_size, stat.st_mtime_ns)
+            if cached is not None:
+                self._add_errors(result, cached)
+            else:
+                content_checks.append((len(results) - 1, file_path, result['file_format'], stat))
+        
+        stat_seconds = time.perf_counter() - start
+        content_start = time.perf_counter()
+        
+        if content_checks:
+            executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with executor_class(max_workers=max_workers) as executor:
+                futures = {}
+                for check in content_checks:
+                    _, file_path, file_format, _ = check
+                    futures[executor.submit(self._check_content, file_path, file_format)] = check
+                
+                for future in as_completed(futures):
+                    index, file_path, _, stat = futures[future]
+                    try:
+                        content_errors = future.result()
+                    except Exception as e:
+                        content_errors = [f"Error validating content: {str(e)}"]
+                    
+                    self._add_errors(results[index], content_errors)
+                    if self.cache is not None:
+                        self.cache.put(file_path, stat.st_size, stat.st_mtime_ns, content_errors)
+        
+        content_seconds = time.perf_counter() - content_start
+        total_seconds = time.perf_counter() - start
+        
+        return {
+            'results': results,
+            'timing': {
+                'files': len(results),
+                'content_checks': len(content_checks),
+                'stat_seconds': stat_seconds,
+                'content_seconds': content_seconds,
+                'total_seconds': total_seconds,
+                'files_per_second': len(results) / total_seconds if total_seconds > 0 else 0
             }
+        }
+    
+    @staticmethod
+    def _resolve_entry(entry: ValidationEntry) -> Tuple[str, Optional[os.stat_result]]:
+        """Get the path and stat of an entry, or None if it cannot be statted"""
+        try:
+            if isinstance(entry, os.DirEntry):
+                # Cached on the entry, and free on Windows
+                return entry.path, entry.stat()
+            if isinstance(entry, tuple):
+                return os.fspath(entry[0]), entry[1]
+            file_path = os.fspath(entry)
+            return file_path, os.stat(file_path)
+        except OSError:
+            return os.fspath(entry[0] if isinstance(entry, tuple) else entry), None
+    
+    @staticmethod
+    def _missing_file_result(file_path: str) -> Dict[str, Any]:
+        return {
+            'is_valid': False,
+            'errors': [f"File does not exist: {file_path}"],
+            'warnings': [],
+            'file_path': file_path
+        }
+    
+    @staticmethod
+    def _add_errors(result: Dict[str, Any], errors: List[str]) -> None:
+        result['errors'].extend(errors)
+        result['is_valid'] = len(result['errors']) == 0
+    
+    def _validate_stat(self, file_path: str,
+                       stat: os.stat_result) -> Tuple[Dict[str, Any], bool]:
+        """Run the checks that need no file content
+        
+        Returns the result and whether a content check applies to the file.
+        """
+        errors = []
+        warnings = []
         
         # Check file size
-        file_size = os.path.getsize(file_path)
+        file_size = stat.st_size
         if file_size > self.max_file_size_bytes:
             errors.append(
                 f"File size ({file_size / 1024 / 1024:.1f} MB) exceeds "
@@ -43,7 +187,8 @@ class DocumentValidator:
             errors.append("File is empty")
         
         # Check file format
-        file_ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+        extension = os.path.splitext(file_path)[1]
+        file_ext = extension.lower().lstrip('.')
         if file_ext not in self.supported_formats:
             errors.append(
                 f"Unsupported file format: .{file_ext}. "
@@ -51,23 +196,16 @@ class DocumentValidator:
             )
         
         # Check file permissions
-        if not os.access(file_path, os.R_OK):
+        is_readable = os.access(file_path, os.R_OK)
+        if not is_readable:
             errors.append("File is not readable")
         
         # MIME type validation
-        mime_type, _ = mimetypes.guess_type(file_path)
+        mime_type = _guess_mime_type(extension)
         if not mime_type:
             warnings.append("Could not determine MIME type")
         
-        # Content validation based on file type
-        if file_ext == 'json':
-            json_errors = self._validate_json_file(file_path)
-            errors.extend(json_errors)
-        elif file_ext == 'csv':
-            csv_errors = self._validate_csv_file(file_path)
-            errors.extend(csv_errors)
-        
-        return {
+        result = {
             'is_valid': len(errors) == 0,
             'errors': errors,
             'warnings': warnings,
@@ -76,14 +214,41 @@ class DocumentValidator:
             'file_format': file_ext,
             'mime_type': mime_type
         }
+        return result, is_readable and file_ext in CONTENT_CHECKED_FORMATS
     
-    def _validate_json_file(self, file_path: str) -> List[str]:
-        """Validate JSON file structure"""
+    def _validate_content(self, file_path: str, file_ext: str,
+                          stat: os.stat_result) -> List[str]:
+        """Run the content check of a file, reusing cached results"""
+        if self.cache is not None:
+            cached = self.cache.get(file_path, stat.st_size, stat.st_mtime_ns)
+            if cached is not None:
+                return cached
+        
+        content_errors = self._check_content(file_path, file_ext)
+        
+        if self.cache is not None:
+            self.cache.put(file_path, stat.st_size, stat.st_mtime_ns, content_errors)
+        return content_errors
+    
+    @staticmethod
+    def _check_content(file_path: str, file_ext: str) -> List[str]:
+        """Content check of a JSON or CSV file; static so process pools can run it"""
+        if file_ext == 'json':
+            return DocumentValidator._validate_json_file(file_path)
+        return DocumentValidator._validate_csv_file(file_path)
+    
+    @staticmethod
+    def _validate_json_file(file_path: str) -> List[str]:
+        """Validate JSON file structure
+        
+        Syntax is checked incrementally, so memory stays bounded regardless
+        of file size and no Python objects are built for the document.
+        """
         errors = []
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                json.load(f)
+                validate_json_stream(f)
         except json.JSONDecodeError as e:
             errors.append(f"Invalid JSON format: {str(e)}")
         except UnicodeDecodeError as e:
@@ -93,13 +258,17 @@ class DocumentValidator:
         
         return errors
     
-    def _validate_csv_file(self, file_path: str) -> List[str]:
-        """Validate CSV file structure"""
+    @staticmethod
+    def _validate_csv_file(file_path: str) -> List[str]:
+        """Validate CSV file structure
+        
+        Every row is parsed, so encoding and quoting errors anywhere in the
+        file are found, while only one row is held in memory at a time.
+        """
         errors = []
         
         try:
-            import csv
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
                 # Try to detect dialect
                 sample = f.read(1024)
                 f.seek(0)
@@ -111,14 +280,14 @@ class DocumentValidator:
                     dialect = csv.excel
                 
                 reader = csv.reader(f, dialect)
-                row_count = 0
-                for row in reader:
-                    row_count += 1
-                    if row_count > 100:  # Check first 100 rows
-                        break
-                
-                if row_count == 0:
-                    errors.append("CSV file appears to be empty")
+                try:
+                    if next(reader, None) is None:
+                        errors.append("CSV file appears to be empty")
+                    else:
+                        # Consume the remaining rows at C speed without keeping them
+                        deque(reader, maxlen=0)
+                except csv.Error as e:
+                    errors.append(f"Malformed CSV at line {reader.line_num}: {str(e)}")
                     
         except UnicodeDecodeError as e:
             errors.append(f"Text encoding error in CSV: {str(e)}")
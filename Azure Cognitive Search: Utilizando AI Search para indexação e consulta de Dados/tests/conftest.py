@@ -0,0 +1,13 @@
+import os
+import sys
+import importlib
+
+import pytest
+
+# Tests import the project as ``src.<package>.<module>``, like the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+@pytest.fixture
+def data_ingestion():
+    """The ingestion module, whose file name is not a valid identifier"""
+    return importlib.import_module('src.ingestion.data-Ingestion')
@@ -0,0 +1,297 @@
+import os
+import json
+import shutil
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
+from azure.core.exceptions import HttpResponseError, ResourceExistsError, ResourceNotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LocalBlobClient:
+    """Filesystem-backed stand-in for azure.storage.blob.BlobClient"""
+    
+    def __init__(self, root_path: str, container_name: str, blob_name: str):
+        self.container_name = container_name
+        self.blob_name = blob_name
+        self.container_path = os.path.join(root_path, container_name)
+        self.blob_path = os.path.join(self.container_path, blob_name)
+        self.metadata_path = os.path.join(
+            self.container_path, '.metadata', blob_name + '.json'
+        )
+        self.blocks_path = os.path.join(self.container_path, '.blocks', blob_name)
+        self.url = f"file://{os.path.abspath(self.blob_path)}"
+    
+    def upload_blob(self, data: Any, metadata: Optional[Dict[str, Any]] = None,
+                   overwrite: bool = False, **kwargs) -> Dict[str, Any]:
+        """Write blob content to disk"""
+        if not os.path.isdir(self.container_path):
+            raise ResourceNotFoundError(f"Container not found: {self.container_name}")
+        if not overwrite and os.path.exists(self.blob_path):
+            raise ResourceExistsError(f"Blob already exists: {self.blob_name}")
+        
+        os.makedirs(os.path.dirname(self.blob_path), exist_ok=True)
+        with open(self.blob_path, 'wb') as f:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f, 1024 * 1024)
+        
+        if metadata is not None:
+            self.set_blob_metadata(metadata)
+        
+        return {'blob_name': self.blob_name}
+    
+    def set_blob_metadata(self, metadata: Optional[Dict[str, Any]] = None,
+                         **kwargs) -> Dict[str, Any]:
+        """Store blob metadata next to the blob"""
+        os.makedirs(os.path.dirname(self.metadata_path), exist_ok=True)
+        with open(self.metadata_path, 'w', encoding='utf-8') as f:
+            json.dump({k: str(v) for k, v in (metadata or {}).items()}, f)
+        return {'blob_name': self.blob_name}
+    
+    def stage_block(self, block_id: str, data: Any, length: Optional[int] = None,
+                   **kwargs) -> Dict[str, Any]:
+        """Stage an uncommitted block"""
+        if not os.path.isdir(self.container_path):
+            raise ResourceNotFoundError(f"Container not found: {self.container_name}")
+        
+        os.makedirs(self.blocks_path, exist_ok=True)
+        with open(os.path.join(self.blocks_path, block_id), 'wb') as f:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f, 1024 * 1024)
+        
+        return {'block_id': block_id}
+    
+    def commit_block_list(self, block_list: List[Any],
+                         metadata: Optional[Dict[str, Any]] = None,
+                         **kwargs) -> Dict[str, Any]:
+        """Assemble staged blocks into the blob and drop the staging area"""
+        os.makedirs(os.path.dirname(self.blob_path), exist_ok=True)
+        with open(self.blob_path, 'wb') as out:
+            for block in block_list:
+                block_id = getattr(block, 'id', block)
+                block_file = os.path.join(self.blocks_path, block_id)
+                if not os.path.exists(block_file):
+                    raise ResourceNotFoundError(f"Block not staged: {block_id}")
+                with open(block_file, 'rb') as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+        
+        shutil.rmtree(self.blocks_path, ignore_errors=True)
+        
+        if metadata is not None:
+            self.set_blob_metadata(metadata)
+        
+        return {'blob_name': self.blob_name}
+    
+    def start_copy_from_url(self, source_url: str,
+                           metadata: Optional[Dict[str, Any]] = None,
+                           **kwargs) -> Dict[str, Any]:
+        """Copy another local blob, addressed by its file:// url"""
+        source_path = source_url[len('file://'):] if source_url.startswith('file://') else source_url
+        if not os.path.exists(source_path):
+            raise ResourceNotFoundError(f"Source blob not found: {source_url}")
+        
+        os.makedirs(os.path.dirname(self.blob_path), exist_ok=True)
+        shutil.copyfile(source_path, self.blob_path)
+        
+        if metadata is not None:
+            self.set_blob_metadata(metadata)
+        
+        return {'copy_status': 'success'}
+    
+    def get_blob_properties(self, **kwargs) -> Dict[str, Any]:
+        """Return size and metadata of the stored blob"""
+        if not os.path.exists(self.blob_path):
+            raise ResourceNotFoundError(f"Blob not found: {self.blob_name}")
+        
+        metadata = {}
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        
+        return {
+            'name': self.blob_name,
+            'size': os.path.getsize(self.blob_path),
+            'metadata': metadata
+        }
+
+class LocalContainerClient:
+    """Filesystem-backed stand-in for azure.storage.blob.ContainerClient"""
+    
+    def __init__(self, root_path: str, container_name: str):
+        self.root_path = root_path
+        self.container_name = container_name
+        self.container_path = os.path.join(root_path, container_name)
+    
+    def create_container(self, **kwargs) -> None:
+        """Create the container directory"""
+        if os.path.isdir(self.container_path):
+            raise ResourceExistsError(f"Container already exists: {self.container_name}")
+        os.makedirs(self.container_path)
+    
+    def get_blob_client(self, blob: str) -> LocalBlobClient:
+        """Get a client for a blob in this container"""
+        return LocalBlobClient(self.root_path, self.container_name, blob)
+    
+    def list_blobs(self, include: Optional[List[str]] = None, **kwargs):
+        """Yield blob properties (name, size, metadata) for stored blobs"""
+        for root, dirs, files in os.walk(self.container_path):
+            # Skip the metadata and block staging areas
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for file in files:
+                blob_name = os.path.relpath(os.path.join(root, file), self.container_path)
+                properties = self.get_blob_client(blob_name).get_blob_properties()
+                yield SimpleNamespace(
+                    name=blob_name,
+                    size=properties['size'],
+                    metadata=properties['metadata'] if include and 'metadata' in include else None
+                )
+
+class LocalBlobServiceClient:
+    """Filesystem-backed stand-in for azure.storage.blob.BlobServiceClient
+    
+    Stores containers as directories under ``root_path`` so ingestion code can
+    be exercised without a storage account.
+    """
+    
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        os.makedirs(root_path, exist_ok=True)
+    
+    def get_container_client(self, container: str) -> LocalContainerClient:
+        """Get a client for a container"""
+        return LocalContainerClient(self.root_path, container)
+    
+    def get_blob_client(self, container: str, blob: str) -> LocalBlobClient:
+        """Get a client for a blob"""
+        return LocalBlobClient(self.root_path, container, blob)
+    
+    def __enter__(self) -> 'LocalBlobServiceClient':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+class LocalThrottle:
+    """Simulated service limits for the async local clients
+    
+    Requests take ``latency`` seconds plus ``latency_per_request`` for each
+    request in flight, like a loaded endpoint. Once more than ``capacity``
+    requests are in flight, new ones fail at once with an
+    ``HttpResponseError`` carrying ``status_code`` (503 by default, as Blob
+    Storage answers "server busy"; 429 is the other throttling status).
+    """
+    
+    def __init__(self, capacity: int = 8, status_code: int = 503,
+                 latency: float = 0.01, latency_per_request: float = 0.0):
+        self.capacity = capacity
+        self.status_code = status_code
+        self.latency = latency
+        self.latency_per_request = latency_per_request
+        self._in_flight = 0
+        self._stats = {'requests': 0, 'throttled': 0, 'max_in_flight': 0}
+    
+    async def request(self) -> None:
+        """Stand for one service round trip, or raise when over capacity"""
+        self._stats['requests'] += 1
+        if self._in_flight >= self.capacity:
+            self._stats['throttled'] += 1
+            error = HttpResponseError(
+                message=f"Server busy: {self._in_flight} requests in flight, capacity {self.capacity}"
+            )
+            error.status_code = self.status_code
+            raise error
+        
+        self._in_flight += 1
+        self._stats['max_in_flight'] = max(self._stats['max_in_flight'], self._in_flight)
+        try:
+            await asyncio.sleep(self.latency + self.latency_per_request * self._in_flight)
+        finally:
+            self._in_flight -= 1
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Requests seen, requests throttled and peak concurrency"""
+        return dict(self._stats, in_flight=self._in_flight)
+
+class AsyncLocalBlobClient:
+    """Async stand-in for azure.storage.blob.aio.BlobClient"""
+    
+    def __init__(self, blob_client: LocalBlobClient,
+                 throttle: Optional[LocalThrottle] = None):
+        self._blob_client = blob_client
+        self._throttle = throttle
+        self.blob_name = blob_client.blob_name
+        self.url = blob_client.url
+    
+    async def upload_blob(self, data: Any, **kwargs) -> Dict[str, Any]:
+        if self._throttle:
+            await self._throttle.request()
+        return self._blob_client.upload_blob(data, **kwargs)
+    
+    async def stage_block(self, block_id: str, data: Any, **kwargs) -> Dict[str, Any]:
+        if self._throttle:
+            await self._throttle.request()
+        return self._blob_client.stage_block(block_id, data, **kwargs)
+    
+    async def commit_block_list(self, block_list: List[Any], **kwargs) -> Dict[str, Any]:
+        if self._throttle:
+            await self._throttle.request()
+        return self._blob_client.commit_block_list(block_list, **kwargs)
+    
+    async def set_blob_metadata(self, metadata: Optional[Dict[str, Any]] = None,
+                               **kwargs) -> Dict[str, Any]:
+        return self._blob_client.set_blob_metadata(metadata, **kwargs)
+    
+    async def get_blob_properties(self, **kwargs) -> Dict[str, Any]:
+        return self._blob_client.get_blob_properties(**kwargs)
+
+class AsyncLocalContainerClient:
+    """Async stand-in for azure.storage.blob.aio.ContainerClient"""
+    
+    def __init__(self, container_client: LocalContainerClient,
+                 throttle: Optional[LocalThrottle] = None):
+        self._container_client = container_client
+        self._throttle = throttle
+    
+    async def create_container(self, **kwargs) -> None:
+        self._container_client.create_container(**kwargs)
+    
+    def get_blob_client(self, blob: str) -> AsyncLocalBlobClient:
+        return AsyncLocalBlobClient(
+            self._container_client.get_blob_client(blob), self._throttle
+        )
+
+class AsyncLocalBlobServiceClient:
+    """Async stand-in for azure.storage.blob.aio.BlobServiceClient
+    
+    With a ``LocalThrottle``, blob writes are delayed and throttled like a
+    busy storage account, to exercise retries and adaptive concurrency.
+    """
+    
+    def __init__(self, root_path: str, throttle: Optional[LocalThrottle] = None):
+        self._service_client = LocalBlobServiceClient(root_path)
+        self.root_path = root_path
+        self.throttle = throttle
+    
+    def get_container_client(self, container: str) -> AsyncLocalContainerClient:
+        return AsyncLocalContainerClient(
+            self._service_client.get_container_client(container), self.throttle
+        )
+    
+    def get_blob_client(self, container: str, blob: str) -> AsyncLocalBlobClient:
+        return AsyncLocalBlobClient(
+            self._service_client.get_blob_client(container, blob), self.throttle
+        )
+    
+    async def close(self) -> None:
+        pass
+    
+    async def __aenter__(self) -> 'AsyncLocalBlobServiceClient':
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
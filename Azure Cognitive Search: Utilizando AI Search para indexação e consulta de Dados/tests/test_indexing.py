@@ -0,0 +1,233 @@
+import io
+import re
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.indexing.embeddings import EmbeddingPipeline, HashEmbeddingProvider
+from src.indexing.index_writer import IndexWriter
+from src.utils.text_chunker import TextChunker
+from src.utils.entity_extractor import ENTITY_PATTERNS, EntityExtractor
+from src.utils.retry import RetryPolicy
+
+class _PartialSearchClient:
+    """Stand-in for SearchClient answering with partial 207 responses
+    
+    Keys in ``first_status`` fail with that status the first time they are
+    sent and succeed afterwards; keys in ``always_status`` always fail.
+    """
+    
+    def __init__(self, first_status=None, always_status=None):
+        self.first_status = dict(first_status or {})
+        self.always_status = dict(always_status or {})
+        self.sent = []
+        self._lock = threading.Lock()
+    
+    def merge_or_upload_documents(self, documents):
+        with self._lock:
+            self.sent.append([document['id'] for document in documents])
+            results = []
+            for document in documents:
+                key = document['id']
+                status = self.always_status.get(key) or self.first_status.pop(key, None)
+                results.append(SimpleNamespace(
+                    succeeded=status is None, key=key, status_code=status or 200,
+                    error_message=f"status {status}" if status else None
+                ))
+            return results
+
+def _writer(client, **options):
+    return IndexWriter(
+        'service', 'key', 'docs', search_client=client, settings={},
+        flush_interval=None, retry_policy=RetryPolicy(max_retries=2, retry_delay=0.0),
+        **options
+    )
+
+def _documents(count):
+    return [{'id': str(index), 'content': f"document {index}"} for index in range(count)]
+
+def test_partial_batch_resends_only_retryable_documents():
+    client = _PartialSearchClient(first_status={'1': 503, '3': 409, '5': 422}, always_status={'7': 400})
+    
+    with _writer(client, batch_size=10) as writer:
+        writer.add_documents(_documents(10))
+    stats = writer.get_stats()
+    
+    assert client.sent == [[str(index) for index in range(10)], ['1', '3', '5']]
+    assert stats['documents_indexed'] == 9
+    assert stats['documents_retried'] == 3
+    assert stats['documents_failed'] == 1
+    assert stats['batches_sent'] == 2
+    assert writer.get_failures() == [{'key': '7', 'status_code': 400, 'error': 'status 400'}]
+
+def test_retryable_documents_fail_after_max_retries():
+    client = _PartialSearchClient(always_status={'2': 503})
+    
+    with _writer(client, batch_size=5) as writer:
+        writer.add_documents(_documents(5))
+    
+    # The first send and two retries of the throttled document
+    assert client.sent[1:] == [['2'], ['2']]
+    assert writer.get_stats()['documents_retried'] == 2
+    assert writer.get_failures() == [{'key': '2', 'status_code': 503, 'error': 'status 503'}]
+
+def test_flush_sends_partial_batches():
+    client = _PartialSearchClient()
+    writer = _writer(client, batch_size=4, max_workers=2)
+    
+    writer.add_documents(_documents(10))
+    stats = writer.flush()
+    writer.close()
+    
+    assert sorted(len(batch) for batch in client.sent) == [2, 4, 4]
+    assert stats['documents_indexed'] == 10 and stats['buffered'] == 0 and stats['in_flight'] == 0
+
+def test_flush_waits_for_a_batch_the_timer_is_still_submitting():
+    client = _PartialSearchClient()
+    writer = IndexWriter(
+        'service', 'key', 'docs', search_client=client, settings={}, batch_size=10,
+        flush_interval=0.05, retry_policy=RetryPolicy(max_retries=0)
+    )
+    submit = writer._executor.submit
+    
+    def slow_submit(*args):
+        time.sleep(0.3)
+        return submit(*args)
+    
+    writer._executor.submit = slow_submit
+    writer.add_documents(_documents(3))
+    while writer.get_stats()['buffered']:
+        time.sleep(0.01)
+    
+    # The timer thread holds the batch while flush runs
+    stats = writer.flush()
+    writer.close()
+    
+    assert client.sent == [['0', '1', '2']]
+    assert stats['documents_indexed'] == 3
+
+@pytest.mark.parametrize('text', [
+    'mail bob@example.org or call 555-123-4567 today',
+    'see http://example.com/a@b.co/555.123.4567 and https://x.io?q=1',
+    'a.5551234567@y.com and 555-123-4567@x.com',
+    'overrun a@b.http://example.com/path 555-123-4567',
+    'pipe http://x/a@b.c|d.e@f.gh and http://x.com/a@b.co\u00e9 5551234567',
+])
+def test_entity_extractor_matches_findall_of_each_pattern(text):
+    entities = EntityExtractor().extract(text)
+    
+    assert entities == {
+        entity_type: re.findall(pattern, text) for entity_type, pattern in ENTITY_PATTERNS.items()
+    }
+    offsets = [offset for _, _, offset in EntityExtractor().iter_entities(text)]
+    assert offsets == sorted(offsets)
+
+def test_entity_stream_finds_entities_cut_by_chunk_boundaries():
+    text = 'call 555-123-4567 or write bob@example.org at http://example.com/x '
+    chunks = [text[index:index + 7] for index in range(0, len(text), 7)]
+    
+    found = list(EntityExtractor().iter_stream(chunks))
+    
+    assert found == list(EntityExtractor().iter_entities(text))
+    assert all(text[offset:offset + len(value)] == value for _, value, offset in found)
+
+def _long_document():
+    sentences = ['Azure search indexes documents.', 'Vectors rank passages.', 'Chunks keep context.']
+    return {'id': 'doc', 'title': 'Guide', 'content': ' '.join(sentences * 4)}
+
+def test_embedding_pipeline_mean_pools_chunks_into_one_document():
+    pipeline = EmbeddingPipeline(HashEmbeddingProvider(64), chunker=TextChunker(chunk_size=60, overlap=0))
+    
+    document, empty = pipeline.process_documents([_long_document(), {'id': 'empty'}])
+    
+    assert document['id'] == 'doc' and len(document['content_vector']) == 64
+    assert empty == {'id': 'empty'}
+    assert pipeline.get_stats()['chunks'] > 1
+
+def test_embedding_pipeline_without_pooling_indexes_each_chunk():
+    chunker = TextChunker(chunk_size=60, overlap=0)
+    pipeline = EmbeddingPipeline(HashEmbeddingProvider(64), chunker=chunker, pooling=None)
+    source = _long_document()
+    
+    documents = pipeline.process_documents([dict(source), {'id': 'empty'}])
+    chunks = chunker.chunk(source['content'])
+    
+    assert [document['id'] for document in documents] == [f"doc-{index}" for index in range(len(chunks))] + ['empty']
+    assert [document['content'] for document in documents[:-1]] == chunks
+    assert all(document['parent_id'] == 'doc' and document['title'] == 'Guide' for document in documents[:-1])
+    assert [document['content_vector'] for document in documents[:-1]] == pipeline.embed_texts(chunks)
+    assert documents[-1] == {'id': 'empty'}
+
+def test_embedding_pipeline_rejects_unknown_pooling():
+    with pytest.raises(ValueError):
+        EmbeddingPipeline(HashEmbeddingProvider(8), pooling='max')
+
+def _prose(sentences):
+    words = ['index', 'query', 'vector', 'chunk', 'semantic', 'ranking', 'blob', 'skill']
+    return ' '.join(
+        ' '.join(words[(index + offset) % len(words)] for offset in range(index % 7 + 3)).capitalize() + '.'
+        for index in range(sentences)
+    )
+
+@pytest.mark.parametrize('options', [
+    {'chunk_size': 80, 'overlap': 20},
+    {'chunk_size': 80, 'overlap': 0, 'boundary': 'word'},
+    {'chunk_size': 64, 'overlap': 10, 'boundary': 'none'},
+    {'chunk_size': 12, 'overlap': 3, 'unit': 'tokens'},
+])
+def test_text_chunker_stream_matches_whole_text(options):
+    text = _prose(40)
+    chunker = TextChunker(**options)
+    spans = list(chunker.iter_spans(text))
+    
+    streamed = list(chunker.iter_stream(io.StringIO(text), read_size=17))
+    
+    assert [(start, end) for start, end, _ in streamed] == spans
+    assert [chunk for _, _, chunk in streamed] == chunker.chunk(text)
+    assert all(text[start:end] == chunk for start, end, chunk in streamed)
+    # Chunks start in order and reach the end of the text
+    assert [start for start, _ in spans] == sorted(start for start, _ in spans)
+    assert spans[-1][1] == len(text)
+
+def test_text_chunker_cuts_at_sentence_ends_within_chunk_size():
+    text = _prose(40)
+    chunker = TextChunker(chunk_size=160, overlap=20)
+    spans = list(chunker.iter_spans(text))
+    
+    assert len(spans) > 1
+    assert all(end - start <= 160 for start, end in spans)
+    assert all(text[end - 1] == '.' for _, end in spans)
+    # Overlapping chunks start at a word
+    assert all(start == 0 or text[start - 1] == ' ' for start, _ in spans)
+
+def test_text_chunker_counts_tokens():
+    text = _prose(30)
+    chunker = TextChunker(chunk_size=10, overlap=2, boundary='none', unit='tokens')
+    
+    chunks = chunker.chunk(text)
+    
+    token_counts = [len(re.findall(r'\w+|[^\w\s]', chunk)) for chunk in chunks]
+    assert all(count == 10 for count in token_counts[:-1]) and token_counts[-1] <= 10
+
+@pytest.mark.parametrize('options', [
+    {'chunk_size': 0},
+    {'chunk_size': 10, 'overlap': 10},
+    {'boundary': 'paragraph'},
+    {'unit': 'bytes'},
+])
+def test_text_chunker_rejects_invalid_options(options):
+    with pytest.raises(ValueError):
+        TextChunker(**options)
+
+def test_chunk_text_terminates_when_overlap_passes_the_break_point():
+    from src.utils.helpers import chunk_text
+    
+    text = 'a' * 30 + ' ' + 'b' * 60
+    
+    chunks = chunk_text(text, chunk_size=40, overlap=35)
+    
+    assert chunks[0] == 'a' * 30
+    assert chunks[-1].endswith('b' * 10)
+    assert len(chunks) < 10
@@ -0,0 +1,967 @@
+import io
+import os
+import json
+import random
+import time
+import threading
+
+import pytest
+
+from src.utils.json_stream import iter_json_documents, validate_json_stream
+from src.utils.retry import RetryPolicy
+
+def _chunked_values(text, chunk_size):
+    return list(iter_json_documents(io.StringIO(text), chunk_size=chunk_size))
+
+@pytest.mark.parametrize('number', ['-12.75', '7e5', '3.5E-2', '1234567', '0.5'])
+def test_json_number_split_at_every_chunk_edge(number):
+    text = f'[1, {number}, "x"]'
+    expected = json.loads(text)
+    
+    for chunk_size in range(1, len(text) + 1):
+        assert _chunked_values(text, chunk_size) == expected, chunk_size
+
+def test_json_float_array_across_default_chunk_size():
+    rng = random.Random(11)
+    values = [rng.uniform(-1e6, 1e6) for _ in range(20000)]
+    text = json.dumps(values)
+    
+    assert _chunked_values(text, 64 * 1024) == values
+    validate_json_stream(io.StringIO(text))
+
+@pytest.mark.parametrize('text', ['{"a": NaN}', '[Infinity, -Infinity, 1]', 'NaN', '-Infinity', '{"a": nan}', '[-Inf]'])
+def test_json_validation_matches_json_load_at_every_chunk_size(text):
+    try:
+        json.loads(text)
+        expected_valid = True
+    except json.JSONDecodeError:
+        expected_valid = False
+    
+    for chunk_size in (1, 2, 3, 5, 65536):
+        try:
+            validate_json_stream(io.StringIO(text), chunk_size=chunk_size)
+            valid = True
+        except json.JSONDecodeError:
+            valid = False
+        assert valid == expected_valid, chunk_size
+
+def test_json_lines_yield_each_value():
+    text = '{"a": 1}\n{"a": 2.5}\n3\n'
+    assert _chunked_values(text, 4) == [{'a': 1}, {'a': 2.5}, 3]
+
+def _write_validation_corpus(directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'good.json').write_text('{"id": 1, "tags": ["a", "b"]}', encoding='utf-8')
+    (directory / 'bad.json').write_text('{"id": 1,', encoding='utf-8')
+    (directory / 'rows.csv').write_text('id,name\n1,alpha\n2,beta\n', encoding='utf-8')
+    (directory / 'notes.txt').write_text('plain text\n', encoding='utf-8')
+    (directory / 'image.bmp').write_bytes(b'BM')
+    return sorted(str(path) for path in directory.iterdir())
+
+@pytest.mark.parametrize('use_processes', [False, True])
+def test_validate_many_matches_validate_document_without_restatting(tmp_path, monkeypatch, use_processes):
+    from src.utils import validators
+    from src.utils.validators import DocumentValidator
+    
+    paths = _write_validation_corpus(tmp_path)
+    validator = DocumentValidator()
+    expected = [validator.validate_document(path) for path in paths]
+    expected.append(validator.validate_document(str(tmp_path / 'missing.json')))
+    
+    with os.scandir(tmp_path) as it:
+        entries = sorted(it, key=lambda entry: entry.path)
+    entries[0] = (entries[0].path, os.stat(entries[0].path))
+    entries.append(str(tmp_path / 'missing.json'))
+    stat_calls = []
+    stat = os.stat
+    
+    def counting_stat(path, *args, **kwargs):
+        stat_calls.append(path)
+        return stat(path, *args, **kwargs)
+    
+    monkeypatch.setattr(validators.os, 'stat', counting_stat)
+    
+    batch = validator.validate_many(entries, max_workers=2, use_processes=use_processes)
+    
+    assert batch['results'] == expected
+    assert [r['is_valid'] for r in batch['results']] == [False, True, False, True, True, False]
+    # Only the plain path is statted; scandir entries and pairs reuse their stat
+    assert stat_calls == [str(tmp_path / 'missing.json')]
+    timing = batch['timing']
+    assert timing['files'] == 6 and timing['content_checks'] == 3
+    assert timing['total_seconds'] >= timing['stat_seconds'] and timing['files_per_second'] > 0
+
+def test_validate_many_serves_unchanged_files_from_the_cache(tmp_path):
+    from src.utils.validation_cache import ValidationCache
+    from src.utils.validators import DocumentValidator
+    
+    paths = _write_validation_corpus(tmp_path / 'corpus')
+    validator = DocumentValidator(cache=ValidationCache(str(tmp_path / 'validation.db')))
+    
+    first = validator.validate_many(paths)
+    second = validator.validate_many(paths)
+    validator.cache.close()
+    
+    assert second['results'] == first['results']
+    assert first['timing']['content_checks'] == 3 and second['timing']['content_checks'] == 0
+
+def test_parse_structured_file_streams_to_sink_and_spool(tmp_path):
+    from src.ingestion.structured_parsers import parse_structured_file, read_structured_documents
+    
+    source = tmp_path / 'rows.csv'
+    source.write_text('id,price,active\n1,2.5,true\n2,,false\n3,007,true\n', encoding='utf-8')
+    received = []
+    
+    result = parse_structured_file(
+        str(source), rows_per_document=2, sink=received.append,
+        output_path=str(tmp_path / 'out' / 'rows.jsonl')
+    )
+    
+    assert result['success']
+    assert 'content' not in result and 'documents' not in result
+    assert (result['document_count'], result['record_count']) == (2, 3)
+    assert received[0]['records'] == [
+        {'id': 1, 'price': 2.5, 'active': True},
+        {'id': 2, 'price': None, 'active': False}
+    ]
+    assert received[1]['records'] == [{'id': 3, 'price': '007', 'active': True}]
+    assert list(read_structured_documents(result['documents_path'])) == received
+
+def test_process_structured_files_in_pool_returns_summaries(tmp_path):
+    from src.ingestion.document_processor import DocumentProcessor
+    from src.ingestion.structured_parsers import read_structured_documents
+    
+    source = tmp_path / 'items.json'
+    source.write_text(json.dumps([{'n': i, 'x': i / 3} for i in range(500)]), encoding='utf-8')
+    processor = DocumentProcessor(
+        'https://example.cognitiveservices.azure.com', 'key', retry_policy=RetryPolicy()
+    )
+    processor.rows_per_document = 100
+    processor.structured_output_dir = str(tmp_path / 'spool')
+    
+    [result] = processor.process_structured_files(
+        [str(source)], max_workers=1, process_pool_threshold_mb=0
+    )
+    
+    assert result['success'] and result['record_count'] == 500
+    documents = list(read_structured_documents(result['documents_path']))
+    assert [len(document['records']) for document in documents] == [100] * 5
+    assert documents[4]['records'][-1] == {'n': 499, 'x': 499 / 3}
+
+def test_structured_documents_keep_the_content_result_shape(tmp_path):
+    from src.ingestion.document_processor import DocumentProcessor
+    from src.ingestion.structured_parsers import spool_structured_file, read_structured_documents
+    
+    source = tmp_path / 'rows.csv'
+    source.write_text('id,name\n1,alpha\n2,beta\n', encoding='utf-8')
+    processor = DocumentProcessor(
+        'https://example.cognitiveservices.azure.com', 'key', retry_policy=RetryPolicy()
+    )
+    
+    result = processor.process_document(str(source))
+    assert result['success'] and result['content'] == "id: 1\nname: alpha\n\nid: 2\nname: beta"
+    assert 'documents_path' not in result
+    
+    with spool_structured_file(str(source), spool_dir=str(tmp_path)) as summary:
+        documents = list(read_structured_documents(summary['documents_path']))
+        assert [document['records'] for document in documents] == [
+            [{'id': 1, 'name': 'alpha'}], [{'id': 2, 'name': 'beta'}]
+        ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['rows.csv']
+
+def _make_ingestion(data_ingestion, tmp_path, settings=None, **options):
+    from local_blob import LocalBlobServiceClient
+    
+    return data_ingestion.DocumentIngestion(
+        '', 'documents',
+        blob_service_client=LocalBlobServiceClient(str(tmp_path / 'storage')),
+        settings=settings or {}, retry_policy=RetryPolicy(max_retries=0), **options
+    )
+
+def _write_corpus(directory, count):
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = directory / f"doc{index}.txt"
+        path.write_text(f"document {index}\n" * 20, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+def test_parallel_batch_returns_every_result_like_the_sequential_one(data_ingestion, tmp_path):
+    _write_corpus(tmp_path / 'corpus', 25)
+    
+    sequential = _make_ingestion(data_ingestion, tmp_path / 'sequential')
+    expected = sequential.process_documents_batch(str(tmp_path / 'corpus'))
+    ingestion = _make_ingestion(
+        data_ingestion, tmp_path / 'parallel', settings={'indexing_settings': {'parallel_threads': 3}}
+    )
+    results = ingestion.process_documents_batch(str(tmp_path / 'corpus'), parallel=True)
+    
+    assert ingestion.parallel_threads == 3
+    assert sorted(r['file_path'] for r in results) == sorted(r['file_path'] for r in expected)
+    assert all(r['success'] for r in results)
+    assert sorted(path.name for path in (tmp_path / 'parallel' / 'storage' / 'documents').glob('*.txt')) == \
+        sorted(f"doc{index}.txt" for index in range(25))
+    stats = ingestion.get_ingestion_stats(results)
+    assert stats['total_files'] == 25 and stats['successful'] == 25 and stats['success_rate'] == 100
+    assert stats['stages']['upload']['count'] == 25
+
+def test_parallel_batch_keeps_a_bounded_window_of_pending_files(data_ingestion, tmp_path):
+    _write_corpus(tmp_path / 'corpus', 40)
+    ingestion = _make_ingestion(data_ingestion, tmp_path)
+    release = threading.Event()
+    lock = threading.Lock()
+    running = []
+    scanned = []
+    ingest_document = ingestion.ingest_document
+    iter_entries = ingestion._iter_document_entries
+    
+    def blocked_ingest(file_path, stat=None):
+        with lock:
+            running.append(file_path)
+        release.wait(5)
+        return ingest_document(file_path, stat)
+    
+    def counted_entries(directory_path):
+        for entry in iter_entries(directory_path):
+            scanned.append(entry.path)
+            yield entry
+    
+    ingestion.ingest_document = blocked_ingest
+    ingestion._iter_document_entries = counted_entries
+    results = []
+    batch = threading.Thread(target=lambda: results.extend(
+        ingestion.process_documents_batch(str(tmp_path / 'corpus'), parallel=True, max_workers=3)
+    ))
+    batch.start()
+    time.sleep(0.3)
+    
+    # Three files run and three more wait; the walk stops one entry later
+    assert len(running) == 3
+    assert len(scanned) == 7
+    release.set()
+    batch.join(5)
+    
+    assert len(results) == 40 and all(r['success'] for r in results)
+
+def test_parallel_batch_reports_worker_errors_as_failed_results(data_ingestion, tmp_path):
+    paths = _write_corpus(tmp_path / 'corpus', 6)
+    ingestion = _make_ingestion(data_ingestion, tmp_path)
+    ingest_document = ingestion.ingest_document
+    
+    def failing_ingest(file_path, stat=None):
+        if file_path == str(paths[2]):
+            raise RuntimeError("worker crashed")
+        return ingest_document(file_path, stat)
+    
+    ingestion.ingest_document = failing_ingest
+    results = {r['file_path']: r for r in ingestion.process_documents_batch(
+        str(tmp_path / 'corpus'), parallel=True, max_workers=2
+    )}
+    
+    assert len(results) == 6
+    assert results[str(paths[2])] == {
+        'success': False, 'file_path': str(paths[2]), 'error': 'worker crashed'
+    }
+    assert all(r['success'] for path, r in results.items() if path != str(paths[2]))
+    assert ingestion.get_ingestion_stats(list(results.values()))['failed'] == 1
+
+def test_stage_timer_accumulates_stages_even_when_they_raise():
+    from src.utils.metrics import StageTimer
+    
+    timer = StageTimer()
+    with timer('upload'):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with timer('upload'):
+            raise RuntimeError("lost connection")
+    with timer('validate'):
+        pass
+    
+    assert set(timer.timings) == {'upload', 'validate'}
+    assert timer.timings['upload'] >= 0.01
+    assert timer.merge({'upload': 1.0, 'dedup': 0.5})['dedup'] == 0.5
+    assert timer.timings['upload'] >= 1.01
+
+def test_summarize_timings_reports_percentiles_and_throughput():
+    from src.utils.metrics import percentile, summarize_timings
+    
+    results = [{'file_size': 1000, 'timings': {'upload': seconds}} for seconds in (0.1, 0.2, 0.3, 0.4, 1.0)]
+    results.append({'file_size': 50, 'success': False})
+    
+    upload = summarize_timings(results)['upload']
+    
+    assert upload['count'] == 5 and upload['total_seconds'] == 2.0 and upload['max'] == 1.0
+    assert upload['p50'] == 0.3
+    assert upload['p95'] == round(percentile([0.1, 0.2, 0.3, 0.4, 1.0], 0.95), 6) == 0.88
+    assert upload['p99'] == 0.976
+    assert upload['files_per_second'] == 2.5
+    assert upload['bytes_per_second'] == 2500.0
+    assert percentile([], 0.5) == 0.0
+
+def test_ingestion_results_carry_stage_timings(data_ingestion, tmp_path):
+    paths = _write_corpus(tmp_path / 'corpus', 3)
+    ingestion = _make_ingestion(data_ingestion, tmp_path)
+    
+    results = [ingestion.upload_document(str(path)) for path in paths]
+    results.append(dict(results[0], resumed=True))
+    stats = ingestion.get_ingestion_stats(results)
+    
+    assert all({'validate', 'upload'} <= set(result['timings']) for result in results)
+    # Resumed results were timed by an earlier run
+    assert stats['stages']['upload']['count'] == 3
+    assert stats['stages']['upload']['bytes_per_second'] > 0
+    assert set(stats['stages']['validate']) >= {'p50', 'p95', 'p99', 'files_per_second', 'bytes_per_second'}
+
+def test_manifest_skips_unchanged_files(data_ingestion, tmp_path):
+    paths = _write_corpus(tmp_path / 'corpus', 3)
+    manifest_path = str(tmp_path / 'manifest.db')
+    
+    first = _make_ingestion(data_ingestion, tmp_path, manifest_path=manifest_path)
+    assert not any(r.get('skipped') for r in first.process_documents_batch(str(tmp_path / 'corpus')))
+    
+    # Touched but identical, and rewritten with new content
+    stat = os.stat(paths[0])
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    paths[1].write_text('new content\n', encoding='utf-8')
+    
+    second = _make_ingestion(data_ingestion, tmp_path, manifest_path=manifest_path)
+    results = {r['file_path']: r for r in second.process_documents_batch(str(tmp_path / 'corpus'))}
+    assert results[str(paths[0])]['skip_reason'] == 'content_unchanged'
+    assert results[str(paths[1])]['success'] and not results[str(paths[1])].get('skipped')
+    assert results[str(paths[2])]['skip_reason'] == 'unchanged'
+    
+    # The touched file's new stat was recorded, so it is not hashed again
+    third = _make_ingestion(data_ingestion, tmp_path, manifest_path=manifest_path)
+    results = third.process_documents_batch(str(tmp_path / 'corpus'))
+    assert [r.get('skip_reason') for r in results] == ['unchanged'] * 3
+
+def test_aimd_limiter_converges_below_throttle_capacity(tmp_path):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from src.utils.concurrency import AdaptiveConcurrencyLimiter
+    from local_blob import AsyncLocalBlobServiceClient, LocalThrottle
+    
+    paths = [str(path) for path in _write_corpus(tmp_path / 'corpus', 300)]
+    throttle = LocalThrottle(capacity=12, latency=0.005)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=64)
+    uploader = AsyncBlobUploader(
+        '', 'documents',
+        blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage'), throttle=throttle),
+        retry_policy=RetryPolicy(max_retries=8, retry_delay=0.01, max_delay=0.1),
+        concurrency_limiter=limiter
+    )
+    
+    results = asyncio.run(uploader.upload_files_async(paths))
+    stats = limiter.get_stats()
+    
+    assert all(r['success'] for r in results)
+    assert stats['increases'] > 0 and stats['decreases'] > 0
+    # Probing past capacity is what triggers the cuts; it never runs away
+    assert 12 <= stats['max_limit_reached'] <= 24
+    assert stats['in_flight'] == 0 and stats['waiting'] == 0
+    assert throttle.get_stats()['in_flight'] == 0
+
+async def _saturated_window(limiter, seconds, size_bytes=0):
+    """Fill every slot of the limiter, then release them all"""
+    epochs = [await limiter.acquire() for _ in range(limiter.limit)]
+    for epoch in epochs:
+        limiter.release(epoch, seconds, size_bytes)
+
+def test_aimd_limiter_recovers_after_a_lasting_latency_shift():
+    import asyncio
+    from src.utils.concurrency import AdaptiveConcurrencyLimiter
+    
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=16)
+        for _ in range(10):
+            await _saturated_window(limiter, 0.01)
+        for _ in range(60):
+            await _saturated_window(limiter, 0.05)
+        return limiter
+    
+    limiter = asyncio.run(run())
+    stats = limiter.get_stats()
+    assert stats['decreases'] > 0
+    assert stats['limit'] == 16
+    assert stats['decisions'][-1]['action'] == 'increase'
+
+def test_aimd_limiter_keeps_small_and_large_request_baselines_apart():
+    import asyncio
+    from src.utils.concurrency import AdaptiveConcurrencyLimiter
+    
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8)
+        for _ in range(20):
+            # Round trips dominate small files; 8 MB files are slower per MB
+            await _saturated_window(limiter, 0.01, 100 * 1024)
+            await _saturated_window(limiter, 0.3, 8 * 1024 * 1024)
+        return limiter.get_stats()
+    
+    stats = asyncio.run(run())
+    assert stats['latency_spikes'] == 0 and stats['decreases'] == 0
+    assert set(stats['baseline_seconds_per_mb']) == {'<=1MB', '<=8MB'}
+
+def test_aimd_limiter_frees_slots_of_cancelled_waiters():
+    import asyncio
+    from src.utils.concurrency import AdaptiveConcurrencyLimiter
+    
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=4)
+        holder = await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        
+        # The slot is handed to the waiter, which is cancelled before it runs
+        limiter.release(holder, 0.0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        
+        async with limiter.track():
+            assert limiter.get_stats()['in_flight'] == 1
+        return limiter.get_stats()
+    
+    stats = asyncio.run(run())
+    assert stats['in_flight'] == 0 and stats['waiting'] == 0
+
+def test_dedup_forgets_content_of_overwritten_blobs(data_ingestion, tmp_path):
+    ingestion = _make_ingestion(data_ingestion, tmp_path, dedup_index_path=str(tmp_path / 'dedup.db'))
+    path = tmp_path / 'a.txt'
+    path.write_text('first version\n', encoding='utf-8')
+    assert not ingestion.upload_document(str(path)).get('deduplicated')
+    
+    path.write_text('second version\n', encoding='utf-8')
+    assert not ingestion.upload_document(str(path)).get('deduplicated')
+    
+    # Blob a.txt now holds the second version, so the first one is new again
+    copy = tmp_path / 'copy.txt'
+    copy.write_text('first version\n', encoding='utf-8')
+    result = ingestion.upload_document(str(copy))
+    assert result['success'] and not result.get('deduplicated')
+    assert ingestion.upload_document(str(path), blob_name='b.txt')['duplicate_of'] == 'a.txt'
+    ingestion.dedup_index.close()
+
+def test_parallel_identical_files_upload_once(data_ingestion, tmp_path):
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    for index in range(8):
+        (corpus / f"same{index}.txt").write_text('identical content\n' * 100, encoding='utf-8')
+    
+    ingestion = _make_ingestion(data_ingestion, tmp_path, dedup_index_path=str(tmp_path / 'dedup.db'))
+    upload = ingestion._upload_file_blob
+    
+    def slow_upload(*args):
+        # Keeps the first upload in flight while the others look the hash up
+        time.sleep(0.05)
+        upload(*args)
+    
+    ingestion._upload_file_blob = slow_upload
+    results = ingestion.process_documents_batch(str(corpus), parallel=True, max_workers=8)
+    
+    assert all(r['success'] for r in results)
+    assert sum(1 for r in results if not r.get('deduplicated')) == 1
+    ingestion.dedup_index.close()
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_hash_algorithm_setting_selects_the_file_hash(data_ingestion, tmp_path, streaming):
+    import hashlib
+    from local_blob import LocalBlobServiceClient
+    
+    [path] = _write_corpus(tmp_path / 'corpus', 1)
+    ingestion = data_ingestion.DocumentIngestion(
+        '', 'documents',
+        blob_service_client=LocalBlobServiceClient(str(tmp_path / 'storage')),
+        settings={'document_processing': {'hash_algorithm': 'blake2b'}},
+        retry_policy=RetryPolicy(max_retries=0), streaming_upload=streaming
+    )
+    
+    result = ingestion.upload_document(str(path))
+    
+    assert result['success']
+    assert result['file_hash'] == hashlib.blake2b(path.read_bytes()).hexdigest()
+
+def test_streaming_upload_still_rejects_malformed_content(data_ingestion, tmp_path):
+    (tmp_path / 'bad.json').write_text('{"title": "unterminated"', encoding='utf-8')
+    (tmp_path / 'good.json').write_text('{"title": "complete"}', encoding='utf-8')
+    ingestion = _make_ingestion(data_ingestion, tmp_path, streaming_upload=True)
+    
+    rejected = ingestion.upload_document(str(tmp_path / 'bad.json'))
+    assert not rejected['success'] and 'Invalid JSON format' in rejected['error'][0]
+    
+    uploaded = ingestion.upload_document(str(tmp_path / 'good.json'))
+    assert uploaded['success'] and uploaded['file_hash']
+
+def test_existing_container_is_not_a_failure(data_ingestion, tmp_path):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from local_blob import AsyncLocalBlobServiceClient
+    
+    _make_ingestion(data_ingestion, tmp_path)
+    again = _make_ingestion(data_ingestion, tmp_path)
+    assert again.retry_policy.get_stats()['create_container'] == {
+        'successes': 1, 'retries': 0, 'give_ups': 0, 'failures': 0
+    }
+    
+    uploader = AsyncBlobUploader(
+        '', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage')),
+        retry_policy=RetryPolicy(max_retries=0)
+    )
+    asyncio.run(uploader.upload_files_async([]))
+    assert uploader.retry_policy.get_stats()['create_container']['failures'] == 0
+
+def test_upload_stream_pulls_paths_only_as_workers_free_up(tmp_path):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from local_blob import AsyncLocalBlobServiceClient
+    
+    paths = [str(path) for path in _write_corpus(tmp_path / 'corpus', 3)]
+    pulled = []
+    
+    def endless_paths():
+        while True:
+            for path in paths:
+                pulled.append(path)
+                yield path
+    
+    uploader = AsyncBlobUploader(
+        '', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage')),
+        retry_policy=RetryPolicy(max_retries=0)
+    )
+    
+    async def run():
+        results = []
+        stream = uploader.upload_stream(endless_paths(), num_workers=2, queue_size=4)
+        async for result in stream:
+            results.append(result)
+            if len(results) == 50:
+                break
+        await stream.aclose()
+        return results
+    
+    results = asyncio.run(run())
+    
+    assert all(r['success'] for r in results)
+    # Both queues full, one path per worker and one held by the producer
+    assert len(pulled) <= 50 + 4 + 4 + 2 + 1
+
+def test_upload_stream_takes_async_iterators_of_dir_entries(tmp_path):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from local_blob import AsyncLocalBlobServiceClient
+    
+    _write_corpus(tmp_path / 'corpus', 12)
+    uploader = AsyncBlobUploader(
+        '', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage')),
+        retry_policy=RetryPolicy(max_retries=0)
+    )
+    
+    async def entries():
+        with os.scandir(tmp_path / 'corpus') as it:
+            for entry in it:
+                yield entry
+    
+    async def run():
+        return [result async for result in uploader.upload_stream(entries(), num_workers=3)]
+    
+    results = asyncio.run(run())
+    
+    assert sorted(r['blob_name'] for r in results) == sorted(f"doc{index}.txt" for index in range(12))
+    assert all(r['success'] for r in results)
+
+def test_upload_stream_raises_producer_errors_after_the_uploads(tmp_path):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from local_blob import AsyncLocalBlobServiceClient
+    
+    paths = [str(path) for path in _write_corpus(tmp_path / 'corpus', 3)]
+    
+    def broken_paths():
+        yield from paths
+        raise OSError("directory vanished")
+    
+    uploader = AsyncBlobUploader(
+        '', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage')),
+        retry_policy=RetryPolicy(max_retries=0)
+    )
+    results = []
+    
+    async def run():
+        async for result in uploader.upload_stream(broken_paths(), num_workers=2):
+            results.append(result)
+    
+    with pytest.raises(OSError, match="directory vanished"):
+        asyncio.run(run())
+    assert sorted(r['file_path'] for r in results) == sorted(paths)
+
+def test_large_file_blocks_are_staged_by_a_fixed_set_of_workers(tmp_path, monkeypatch):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from local_blob import AsyncLocalBlobClient, AsyncLocalBlobServiceClient
+    
+    path = tmp_path / 'large.bin'
+    data = bytes(random.Random(0).getrandbits(8) for _ in range(20 * 1024 + 100))
+    path.write_bytes(data)
+    stage_block = AsyncLocalBlobClient.stage_block
+    task_counts = []
+    
+    async def counting_stage_block(self, block_id, data, **kwargs):
+        task_counts.append(len(asyncio.all_tasks()))
+        await asyncio.sleep(0.001)
+        return await stage_block(self, block_id, data, **kwargs)
+    
+    monkeypatch.setattr(AsyncLocalBlobClient, 'stage_block', counting_stage_block)
+    uploader = AsyncBlobUploader(
+        '', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage')),
+        large_file_threshold_mb=0, block_size_mb=1 / 1024, max_block_concurrency=3,
+        retry_policy=RetryPolicy(max_retries=0)
+    )
+    
+    [result] = asyncio.run(uploader.upload_files_async([str(path)]))
+    
+    assert result['success'] and result['block_count'] == 21
+    assert len(task_counts) == 21
+    # The main task, the file's upload task and three block workers
+    assert max(task_counts) <= 5
+    assert (tmp_path / 'storage' / 'documents' / 'large.bin').read_bytes() == data
+
+def test_failed_block_is_retried_without_restaging_the_others(tmp_path, monkeypatch):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader
+    from local_blob import AsyncLocalBlobClient, AsyncLocalBlobServiceClient
+    
+    path = tmp_path / 'large.bin'
+    data = bytes(random.Random(1).getrandbits(8) for _ in range(6 * 1024))
+    path.write_bytes(data)
+    stage_block = AsyncLocalBlobClient.stage_block
+    staged = []
+    
+    async def flaky_stage_block(self, block_id, data, **kwargs):
+        staged.append(block_id)
+        if block_id == '00000003' and staged.count(block_id) == 1:
+            raise ConnectionError("connection reset")
+        return await stage_block(self, block_id, data, **kwargs)
+    
+    monkeypatch.setattr(AsyncLocalBlobClient, 'stage_block', flaky_stage_block)
+    retry_policy = RetryPolicy(max_retries=2, retry_delay=0.0)
+    uploader = AsyncBlobUploader(
+        '', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage')),
+        large_file_threshold_mb=0, block_size_mb=1 / 1024, max_block_concurrency=2,
+        retry_policy=retry_policy
+    )
+    
+    [result] = asyncio.run(uploader.upload_files_async([str(path)]))
+    
+    assert result['success'] and result['block_count'] == 6
+    assert result['throughput_mbps'] > 0 and result['elapsed_seconds'] > 0
+    assert sorted(staged) == sorted([f"{index:08d}" for index in range(6)] + ['00000003'])
+    assert retry_policy.get_stats()['stage_block'] == {'successes': 6, 'retries': 1, 'failures': 0, 'give_ups': 0}
+    assert (tmp_path / 'storage' / 'documents' / 'large.bin').read_bytes() == data
+
+def test_persistent_uploader_close_cancels_pending_uploads(tmp_path):
+    import concurrent.futures
+    from src.ingestion.blob_uploader import PersistentBlobUploader
+    from local_blob import AsyncLocalBlobServiceClient, LocalThrottle
+    
+    [path] = _write_corpus(tmp_path / 'corpus', 1)
+    client = AsyncLocalBlobServiceClient(str(tmp_path / 'storage'), throttle=LocalThrottle(latency=30))
+    uploader = PersistentBlobUploader('', 'documents', blob_service_client=client)
+    
+    future = uploader.submit_file(str(path))
+    thread = uploader._thread
+    start = time.perf_counter()
+    uploader.close()
+    
+    with pytest.raises(concurrent.futures.CancelledError):
+        future.result(timeout=5)
+    assert time.perf_counter() - start < 5 and not thread.is_alive()
+
+def test_unclosed_persistent_uploader_is_released_on_collection(tmp_path):
+    import gc
+    from src.ingestion.blob_uploader import BlobUploader
+    from local_blob import AsyncLocalBlobServiceClient
+    
+    uploader = BlobUploader('', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path)))
+    assert uploader.upload_files([]) == []
+    thread = uploader.persistent_uploader._thread
+    
+    del uploader
+    gc.collect()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+def test_blob_uploader_keeps_its_async_uploader(tmp_path):
+    import asyncio
+    from src.ingestion.blob_uploader import AsyncBlobUploader, BlobUploader
+    from local_blob import AsyncLocalBlobServiceClient
+    
+    [path] = _write_corpus(tmp_path / 'corpus', 1)
+    with BlobUploader('', 'documents', blob_service_client=AsyncLocalBlobServiceClient(str(tmp_path / 'storage'))) as uploader:
+        assert isinstance(uploader.async_uploader, AsyncBlobUploader)
+        [result] = asyncio.run(uploader.async_uploader.upload_files_async([str(path)]))
+    assert result['success']
+
+def _analysis(*pages, tables=()):
+    from types import SimpleNamespace
+    
+    return SimpleNamespace(content=''.join(pages), tables=list(tables), pages=[
+        SimpleNamespace(page_number=number, lines=[SimpleNamespace(content=line) for line in text.split()])
+        for number, text in enumerate(pages, 1)
+    ])
+
+class _SlowAnalysisClient:
+    """Stand-in for DocumentAnalysisClient whose pollers take ``delay`` seconds"""
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+    
+    def begin_analyze_document(self, model_id, document):
+        name = os.path.basename(document.name)
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return _SlowPoller(self, name)
+
+class _SlowPoller:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+    
+    def result(self):
+        time.sleep(self.client.delay)
+        with self.client._lock:
+            self.client.in_flight -= 1
+        return _analysis(f"{self.name} text")
+
+def _write_pdfs(directory, count):
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = directory / f"report{index}.pdf"
+        path.write_bytes(b'%PDF-1.4 stand-in')
+        paths.append(str(path))
+    return paths
+
+def test_process_documents_keeps_max_in_flight_analyses(tmp_path):
+    from src.ingestion.document_processor import DocumentProcessor
+    
+    paths = _write_pdfs(tmp_path, 8)
+    processor = DocumentProcessor(
+        'https://example.cognitiveservices.azure.com', 'key', retry_policy=RetryPolicy(max_retries=0)
+    )
+    processor.document_client = _SlowAnalysisClient(delay=0.1)
+    
+    start = time.perf_counter()
+    results = processor.process_documents(paths, max_in_flight=4)
+    elapsed = time.perf_counter() - start
+    
+    assert processor.document_client.max_in_flight == 4
+    assert elapsed < 0.6
+    assert sorted(r['file_path'] for r in results) == sorted(paths)
+    for result in results:
+        name = os.path.basename(result['file_path'])
+        assert result['success'] and result['content'] == f"{name}\ntext\n"
+        assert result['tables'] == [] and result['page_count'] == 1
+
+def test_async_process_documents_keeps_max_in_flight_analyses(tmp_path):
+    import asyncio
+    from src.ingestion.document_processor import AsyncDocumentProcessor
+    
+    paths = _write_pdfs(tmp_path, 8)
+    state = {'in_flight': 0, 'max_in_flight': 0}
+    
+    class Poller:
+        def __init__(self, name):
+            self.name = name
+        
+        async def result(self):
+            await asyncio.sleep(0.05)
+            state['in_flight'] -= 1
+            return _analysis(f"{self.name} text")
+    
+    class Client:
+        async def begin_analyze_document(self, model_id, document):
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            return Poller(os.path.basename(document.name))
+        
+        async def close(self):
+            pass
+    
+    async def run():
+        processor = AsyncDocumentProcessor(
+            'https://example.cognitiveservices.azure.com', 'key', retry_policy=RetryPolicy(max_retries=0)
+        )
+        await processor.document_client.close()
+        processor.document_client = Client()
+        async with processor:
+            return await processor.process_documents(paths, max_in_flight=3)
+    
+    results = asyncio.run(run())
+    
+    assert state['max_in_flight'] == 3
+    assert sorted(r['file_path'] for r in results) == sorted(paths)
+    assert all(r['success'] and r['page_count'] == 1 for r in results)
+
+def test_pdf_pages_stream_with_offsets_into_the_assembled_text(tmp_path):
+    from types import SimpleNamespace
+    from src.ingestion.document_processor import DocumentProcessor, assemble_page_text
+    
+    [path] = _write_pdfs(tmp_path, 1)
+    table = SimpleNamespace(
+        bounding_regions=[SimpleNamespace(page_number=2)],
+        cells=[SimpleNamespace(content='cell', row_index=0, column_index=1)]
+    )
+    analysis = _analysis('first page', 'second', 'third page here', tables=[table])
+    processor = DocumentProcessor(
+        'https://example.cognitiveservices.azure.com', 'key', retry_policy=RetryPolicy(max_retries=0)
+    )
+    processor._analyze_document = lambda file_path, model_id: analysis
+    
+    pages = list(processor.iter_pdf_pages(path))
+    text = assemble_page_text(pages)
+    
+    assert [page['page_number'] for page in pages] == [1, 2, 3]
+    assert [page['tables'] for page in pages] == [[], [[{'content': 'cell', 'row_index': 0, 'column_index': 1}]], []]
+    assert all(text[page['char_start']:page['char_end']] == page['text'] for page in pages)
+    assert pages[-1]['char_end'] == len(text)
+    assert processor.process_document(path)['content'] == text == "first\npage\nsecond\nthird\npage\nhere\n"
+
+def test_async_processor_keeps_cache_work_off_the_loop(tmp_path):
+    import asyncio
+    from types import SimpleNamespace
+    from src.ingestion.document_processor import AsyncDocumentProcessor
+    from src.ingestion.extraction_cache import ExtractionCache
+    
+    threads = []
+    
+    class RecordingCache(ExtractionCache):
+        def get(self, *args):
+            threads.append(threading.get_ident())
+            return super().get(*args)
+        
+        def put(self, *args):
+            threads.append(threading.get_ident())
+            return super().put(*args)
+    
+    source = tmp_path / 'report.pdf'
+    source.write_bytes(b'%PDF-1.4 stand-in')
+    analysis = SimpleNamespace(tables=[], pages=[
+        SimpleNamespace(page_number=1, lines=[SimpleNamespace(content='first'), SimpleNamespace(content='page')]),
+        SimpleNamespace(page_number=2, lines=[SimpleNamespace(content='second')])
+    ])
+    
+    async def run():
+        processor = AsyncDocumentProcessor(
+            'https://example.cognitiveservices.azure.com', 'key',
+            retry_policy=RetryPolicy(), cache=RecordingCache(str(tmp_path / 'cache.db'))
+        )
+        
+        async def analyze(file_path, model_id):
+            return analysis
+        
+        processor._analyze_document = analyze
+        first = await processor.process_document(str(source))
+        second = await processor.process_document(str(source))
+        await processor.close()
+        processor.cache.close()
+        return threading.get_ident(), first, second
+    
+    loop_thread, first, second = asyncio.run(run())
+    assert first['content'] == second['content'] == "first\npage\nsecond\n"
+    assert len(threads) == 3 and loop_thread not in threads
+
+def test_journal_resumes_only_unchanged_completed_files(data_ingestion, tmp_path):
+    paths = _write_corpus(tmp_path / 'corpus', 3)
+    journal_path = str(tmp_path / 'journal.jsonl')
+    
+    first = _make_ingestion(data_ingestion, tmp_path, journal_path=journal_path)
+    assert all(r['success'] and not r.get('resumed')
+               for r in first.process_documents_batch(str(tmp_path / 'corpus')))
+    first.journal.close()
+    
+    # Same size, later mtime: the journal must not vouch for it any more
+    paths[0].write_text(paths[0].read_text(encoding='utf-8').upper(), encoding='utf-8')
+    stat = os.stat(paths[0])
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    
+    second = _make_ingestion(data_ingestion, tmp_path, journal_path=journal_path)
+    results = {r['file_path']: r for r in second.process_documents_batch(str(tmp_path / 'corpus'), parallel=True)}
+    assert not results[str(paths[0])].get('resumed')
+    assert results[str(paths[1])]['resumed'] and results[str(paths[2])]['resumed']
+    assert second.get_ingestion_stats(list(results.values()))['resumed'] == 2
+    
+    second.finish_run()
+    assert second.journal.get_stats()['files'] == 0
+    assert not any(r.get('resumed') for r in second.process_documents_batch(str(tmp_path / 'corpus')))
+    second.journal.close()
+    
+    third = _make_ingestion(data_ingestion, tmp_path, journal_path=journal_path)
+    assert third.journal.get_stats()['files'] == 3
+    third.journal.close()
+
+def test_extraction_cache_hits_refresh_lru_without_committing(tmp_path):
+    from src.ingestion.extraction_cache import ExtractionCache
+    
+    # Random text compresses poorly, so two entries fit the limit but not three
+    value = {'success': True, 'content': random.Random(9).randbytes(600).hex()}
+    with ExtractionCache(str(tmp_path / 'cache.db'), max_size_mb=2000 / (1024 * 1024),
+                         commit_interval=1000) as cache:
+        cache.put('a', 'model', value)
+        cache.put('b', 'model', value)
+        
+        commits = []
+        cache._connection.set_trace_callback(
+            lambda statement: commits.append(statement) if statement == 'COMMIT' else None
+        )
+        assert cache.get('a', 'model') == value
+        assert commits == []
+        
+        # The buffered hit on "a" makes "b" the least recently used entry
+        cache.put('c', 'model', value)
+        assert cache.get('b', 'model') is None
+        assert cache.get('a', 'model') == value
+
+def _original_clean_text(text):
+    """clean_text as it was before text_normalizer"""
+    if not text:
+        return ""
+    
+    text = ' '.join(text.split())
+    text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
+    return text.strip()
+
+def _messy_texts(count, seed=7):
+    rng = random.Random(seed)
+    alphabet = 'ab Zé€\t\n\r\x00\x01\x07\x0b\x0c\x1b\x1f\x85   .,'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+@pytest.mark.parametrize('text', [
+    '', '   ', 'plain text', ' a \x00 b ', '\x01\x02lead', 'trail\x1f',
+    'tab\tand\nnewline', 'café \x07 naïve', 'wide     space\x1b',
+])
+def test_normalize_text_matches_the_original_clean_text(text):
+    from src.utils.helpers import clean_text
+    from src.utils.text_normalizer import normalize_text
+    
+    assert normalize_text(text) == _original_clean_text(text)
+    assert clean_text(text) == _original_clean_text(text)
+
+def test_normalize_text_matches_the_original_on_random_texts():
+    from src.utils.text_normalizer import normalize_text
+    
+    for text in _messy_texts(2000):
+        assert normalize_text(text) == _original_clean_text(text), repr(text)
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_normalize_texts_keeps_order_in_batches(max_workers):
+    from src.utils.text_normalizer import normalize_texts
+    
+    texts = _messy_texts(200, seed=11)
+    
+    assert normalize_texts(iter(texts), max_workers=max_workers, batch_size=16) == [
+        _original_clean_text(text) for text in texts
+    ]
@@ -0,0 +1,373 @@
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.search.query_builder import QueryBuilder
+from src.search.result_cache import SearchResultCache, filter_field_names
+from src.search.search_engine import IntelligentSearch, AsyncIntelligentSearch
+from src.indexing.index_writer import IndexWriter
+from src.utils.retry import RetryPolicy
+
+class _AcceptingSearchClient:
+    """Stand-in for SearchClient that indexes every document"""
+    
+    def merge_or_upload_documents(self, documents):
+        return [
+            SimpleNamespace(succeeded=True, key=document['id'], status_code=200, error_message=None)
+            for document in documents
+        ]
+
+class _SlowAsyncSearchClient:
+    """Stand-in for the aio SearchClient that counts searches"""
+    
+    def __init__(self):
+        self.searches = 0
+    
+    async def search(self, **search_params):
+        self.searches += 1
+        await asyncio.sleep(0.01)
+        return _AsyncResults([{'id': '1'}, {'id': '2'}])
+
+class _AsyncResults:
+    def __init__(self, items):
+        self.items = items
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for item in self.items:
+            yield item
+    
+    async def get_count(self):
+        return len(self.items)
+
+def _fill(cache, index_name='docs'):
+    cache.put('simple', {'documents': [1]}, index_name)
+    cache.put('count', 42, index_name)
+    cache.put('category', {'documents': [2]}, index_name, "category eq 'news'")
+    cache.put('language', {'documents': [3]}, index_name, "language eq 'pt'")
+    cache.put('other-index', {'documents': [4]}, 'other')
+
+def test_key_is_canonical_across_builder_order():
+    first = QueryBuilder().add_term('azure').add_filter('category', 'eq', 'news').add_sort('date', 'desc')
+    second = QueryBuilder().add_sort('date', 'desc').add_filter('category', 'eq', 'news').add_term('azure')
+    
+    def key(builder, skip):
+        return SearchResultCache.make_key('docs', 'search', {**builder.build_search_params(), 'top': 10, 'skip': skip})
+    
+    assert key(first, 0) == key(second, 0)
+    assert key(first, 0) != key(first, 10)
+
+def test_get_returns_fresh_copies_and_counts_hits():
+    cache = SearchResultCache()
+    cache.put('k', {'documents': [{'id': '1'}]}, 'docs')
+    
+    cache.get('k')['documents'].clear()
+    assert cache.get('k') == {'documents': [{'id': '1'}]}
+    assert cache.get('missing') is None
+    
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['bytes'] > 0
+
+def test_entries_expire_after_their_ttl():
+    cache = SearchResultCache(default_ttl=60)
+    cache.put('short', {'a': 1}, 'docs', ttl=0.05)
+    cache.put('long', {'a': 2}, 'docs')
+    
+    time.sleep(0.1)
+    assert cache.get('short') is None
+    assert cache.get('long') == {'a': 2}
+    assert cache.get_stats()['expired'] == 1
+
+def test_least_recently_used_entries_are_evicted_over_max_bytes():
+    value = {'text': 'x' * 100}
+    entry_size = len('{"text":"' + 'x' * 100 + '"}') + 1
+    cache = SearchResultCache(max_bytes=3 * entry_size)
+    for key in 'abc':
+        cache.put(key, value, 'docs')
+    
+    cache.get('a')
+    cache.put('d', value, 'docs')
+    
+    assert cache.get('b') is None
+    assert all(cache.get(key) == value for key in 'acd')
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1 and stats['bytes'] <= stats['max_bytes']
+
+def test_oversized_and_non_json_values_are_not_cached():
+    cache = SearchResultCache(max_bytes=64)
+    assert not cache.put('big', {'text': 'x' * 100}, 'docs')
+    assert not cache.put('object', {'value': object()}, 'docs')
+    assert cache.get_stats()['uncacheable'] == 2
+
+def test_invalidate_index():
+    cache = SearchResultCache()
+    _fill(cache)
+    
+    assert cache.invalidate('docs') == 4
+    assert cache.get('other-index') is not None
+
+def test_field_invalidation_also_drops_unfiltered_entries():
+    cache = SearchResultCache()
+    _fill(cache)
+    
+    assert cache.invalidate('docs', ['category']) == 3
+    assert cache.get('language') is not None
+    assert cache.get('simple') is None and cache.get('count') is None
+
+def test_index_writer_invalidates_after_indexing():
+    cache = SearchResultCache()
+    _fill(cache)
+    
+    with IndexWriter('service', 'key', 'docs', search_client=_AcceptingSearchClient(),
+                     settings={}, flush_interval=None, retry_policy=RetryPolicy(max_retries=0),
+                     result_cache=cache, invalidate_fields=['category']) as writer:
+        writer.add_document({'id': '1', 'category': 'news'})
+    
+    assert cache.get('category') is None and cache.get('simple') is None
+    assert cache.get('language') is not None and cache.get('other-index') is not None
+
+def test_filter_field_names():
+    fields = filter_field_names(
+        "category eq 'it''s' and tags/any(t: t eq 'a') and search.ismatch('foo', 'title,content')"
+    )
+    assert {'category', 'tags', 'title', 'content'} <= fields
+    assert 'foo' not in fields and 'a' not in fields
+
+def test_concurrent_identical_async_searches_reach_the_service_once():
+    cache = SearchResultCache()
+    search = AsyncIntelligentSearch('service', 'key', 'docs', retry_policy=RetryPolicy(), result_cache=cache)
+    search.search_client = _SlowAsyncSearchClient()
+    
+    async def run():
+        return await asyncio.gather(*(search.simple_search('azure') for _ in range(50)))
+    
+    results = asyncio.run(run())
+    assert search.search_client.searches == 1
+    assert all(result['success'] and result['total_count'] == 2 for result in results)
+    assert cache.get_stats()['misses'] == 1
+    assert cache.get_stats()['coalesced'] == 49
+    
+    results[0]['documents'].clear()
+    assert len(results[1]['documents']) == 2
+
+def test_coalesced_callers_share_errors_which_are_not_cached():
+    cache = SearchResultCache()
+    calls = []
+    
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError('service unavailable')
+    
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_compute_async('k', failing, 'docs') for _ in range(5)),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get('k') is None
+
+def test_cancelled_computation_is_taken_over_by_a_waiter():
+    cache = SearchResultCache()
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return len(calls)
+    
+    async def run():
+        leader = asyncio.ensure_future(cache.get_or_compute_async('k', compute, 'docs'))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.get_or_compute_async('k', compute, 'docs'))
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+    
+    assert asyncio.run(run()) == 2
+    assert cache.get('k') == 2
+
+def test_values_computed_across_an_invalidation_are_not_stored():
+    cache = SearchResultCache()
+    
+    def compute():
+        cache.invalidate('docs')
+        return {'documents': []}
+    
+    assert cache.get_or_compute('k', compute, 'docs') == {'documents': []}
+    assert cache.get('k') is None
+
+def test_concurrent_threads_compute_once():
+    cache = SearchResultCache()
+    calls = []
+    barrier = threading.Barrier(8)
+    
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'documents': [1]}
+    
+    def search():
+        barrier.wait()
+        results.append(cache.get_or_compute('k', compute, 'docs'))
+    
+    results = []
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert results == [{'documents': [1]}] * 8
+    assert cache.get_stats()['coalesced'] == 7
+
+def test_search_clients_leave_retries_to_the_retry_policy():
+    search = IntelligentSearch('service', 'key', 'docs', retry_policy=RetryPolicy())
+    pipeline = search.search_client._client._pipeline
+    sdk_retries = [
+        getattr(policy, '_policy', policy).total_retries
+        for policy in pipeline._impl_policies
+        if hasattr(getattr(policy, '_policy', policy), 'total_retries')
+    ]
+    assert sdk_retries == [0]
+
+class _CountingSearchClient:
+    """Stand-in for SearchClient that counts searches"""
+    
+    def __init__(self):
+        self.searches = 0
+    
+    def search(self, **search_params):
+        self.searches += 1
+        return _Results([{'id': '1'}])
+
+class _Results(list):
+    def get_count(self):
+        return len(self)
+
+def test_semantic_search_is_cached_on_a_digest_of_the_vector(monkeypatch):
+    cache = SearchResultCache()
+    search = IntelligentSearch('service', 'key', 'docs', retry_policy=RetryPolicy(), result_cache=cache)
+    search.search_client = _CountingSearchClient()
+    keyed = []
+    make_key = cache.make_key
+    
+    def recording_make_key(index_name, operation, search_params):
+        keyed.append(search_params)
+        return make_key(index_name, operation, search_params)
+    
+    monkeypatch.setattr(cache, 'make_key', recording_make_key)
+    vector = [0.125 * index for index in range(1536)]
+    
+    assert search.semantic_search('azure', vector)['success']
+    assert search.semantic_search('azure', list(vector))['success']
+    assert search.semantic_search('azure', vector[:-1] + [0.5])['success']
+    
+    assert search.search_client.searches == 2
+    assert all(isinstance(params['vector'], str) and len(params['vector']) == 32 for params in keyed)
+
+_DOCUMENTS = [
+    {'id': '1', 'title': 'Azure', 'category': 'news', '@search.score': 2.5},
+    {'id': '2', 'title': 'Search', 'category': 'docs', '@search.score': 1.5},
+]
+
+class _FacetedResults(_Results):
+    def get_facets(self):
+        return {'category': [{'value': 'news', 'count': 1}, {'value': 'docs', 'count': 1}]}
+
+class _FakeSearchClient:
+    """Stand-in for SearchClient serving ``_DOCUMENTS``"""
+    
+    def __init__(self, error=None):
+        self.error = error
+    
+    def _answer(self, value):
+        if self.error is not None:
+            raise self.error
+        return value
+    
+    def search(self, **search_params):
+        return self._answer(_FacetedResults(dict(document) for document in _DOCUMENTS))
+    
+    def suggest(self, search_text, suggester_name, top):
+        return self._answer([{'@@search.text': document['title']} for document in _DOCUMENTS][:top])
+    
+    def autocomplete(self, search_text, suggester_name, autocomplete_mode):
+        return self._answer([{'text': f"{search_text}ure"}, {'text': f"{search_text}ure search"}])
+    
+    def get_document(self, key):
+        return self._answer(next(document for document in _DOCUMENTS if document['id'] == key))
+
+class _FakeAsyncSearchClient:
+    """aio counterpart of ``_FakeSearchClient``"""
+    
+    def __init__(self, error=None):
+        self._client = _FakeSearchClient(error)
+    
+    async def search(self, **search_params):
+        results = self._client.search(**search_params)
+        pager = _AsyncResults(list(results))
+        
+        async def get_facets():
+            return results.get_facets()
+        
+        pager.get_facets = get_facets
+        return pager
+    
+    async def suggest(self, **params):
+        return self._client.suggest(**params)
+    
+    async def autocomplete(self, **params):
+        return self._client.autocomplete(**params)
+    
+    async def get_document(self, key):
+        return self._client.get_document(key)
+    
+    async def close(self):
+        pass
+
+_SEARCH_CALLS = [
+    ('simple_search', ('azure',), {'top': 10}),
+    ('advanced_search', ('azure',), {'filters': "category eq 'news'", 'facets': ['category'], 'top': 1}),
+    ('semantic_search', ('azure', [0.5, 0.25]), {}),
+    ('suggest', ('az',), {'top': 1}),
+    ('autocomplete', ('az',), {}),
+    ('get_document', ('2',), {}),
+    ('count_documents', (), {'filters': "category eq 'news'"}),
+]
+
+def _search_pair(error=None):
+    retry_policy = RetryPolicy(max_retries=0, retry_delay=0.0)
+    search = IntelligentSearch('service', 'key', 'docs', retry_policy=retry_policy)
+    search.search_client = _FakeSearchClient(error)
+    async_search = AsyncIntelligentSearch('service', 'key', 'docs', retry_policy=retry_policy)
+    async_search.search_client = _FakeAsyncSearchClient(error)
+    return search, async_search
+
+@pytest.mark.parametrize('method, args, kwargs', _SEARCH_CALLS)
+@pytest.mark.parametrize('error', [None, ValueError("service unavailable")])
+def test_async_search_returns_the_same_results_as_the_sync_search(method, args, kwargs, error):
+    search, async_search = _search_pair(error)
+    
+    async def run():
+        async with async_search:
+            return await getattr(async_search, method)(*args, **kwargs)
+    
+    expected = getattr(search, method)(*args, **kwargs)
+    
+    assert asyncio.run(run()) == expected
+    if error is None:
+        assert expected not in ({}, [], None, 0)
+        assert not isinstance(expected, dict) or expected.get('success', True)